@@ -1,29 +1,64 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+import asyncio
+import os
 import time
 import hashlib
 import json
+from typing import Any, AsyncIterator, Dict, Optional
 
-from contracts.request import GenerateRequest
-from contracts.response import GenerateResponse, TokenUsage
-from classifier.features import extract_features
-from routing.decision import decide_model_tier
+from contracts.request import GenerateRequest, BatchGenerateRequest
+from contracts.response import GenerateResponse, StreamSummary, TokenUsage, BatchItemResult
+from classifier.features import FeatureVector, extract_features, normalize_text
+from classifier.analysis import PromptAnalysis, analyze_prompt
+from routing.decision import (
+    TIER_ORDER,
+    decide_model_tier,
+    classifier_input,
+    enforce_backend_health,
+    enforce_latency_budget,
+)
+from routing.latency import tracker as latency_tracker
+from routing import memo as routing_memo
+from routing.memo import RoutingMemo
+from config import config_generation
 from classifier.predict import Classifier
+from classifier.model import ClassifierPrediction
+from classifier import batching
 from classifier.stub import StubClassifier
 from classifier.real import RealClassifier
 
-from inference.small import execute_small
-from inference.medium import execute_medium
-from inference.api import execute_api
+from inference.small import execute_small, stream_small, probe_small
+from inference.medium import execute_medium, stream_medium, probe_medium
+from inference.api import execute_api, stream_api
+from inference.streaming import StreamUsage
+from inference import admission, breaker, cascade, hedging
+from inference.admission import Overloaded
+from inference.breaker import CircuitOpen
+from inference.scheduler import current_class
+from inference.cascade import CASCADE_TIER, CascadeOutcome
 
-from cache.redis import get as cache_get, set as cache_set
+from cache.redis import get as cache_get, mget as cache_mget, set as cache_set
+from cache.memory import get as l1_get, set as l1_set
+from cache import codec, semantic, singleflight
+from cache.digest import ContextDigest, digest_context
 from metrics.prometheus import (
     REQUEST_COUNT,
     ROUTING_DECISIONS,
     INFERENCE_LATENCY,
+    TIME_TO_FIRST_TOKEN,
     TOKEN_USAGE,
     COST_TOTAL,
+    COST_OVERRUNS,
+    COST_PREDICTION_RATIO,
+    CIRCUIT_FAILOVERS,
     CACHE_HITS,
     CACHE_MISSES,
+    CACHE_LAYER_HITS,
+    CACHE_LAYER_MISSES,
+    CACHE_BYTES_SAVED,
+    CACHE_DECODE_LATENCY,
+    COALESCED_REQUESTS,
 )
 
 router = APIRouter()
@@ -34,28 +69,65 @@ except Exception as e:
     print("⚠️ Falling back to StubClassifier:", e)
     _classifier = Classifier(StubClassifier())
 
-def normalize_text(text: str) -> str:
-    """
-    Canonical text normalization for cache keys.
-    - lowercase
-    - trim
-    - collapse whitespace
-    """
-    return " ".join(text.strip().lower().split())
+# Optional micro-batching of classifier calls across concurrent requests
+_batcher = batching.from_env(_classifier)
+
+# Memoized routing decisions for repeated requests
+_memo = routing_memo.from_env()
+
+_EXECUTORS = {
+    "small": execute_small,
+    "medium": execute_medium,
+    "api": execute_api,
+}
+
+_STREAMERS = {
+    "small": stream_small,
+    "medium": stream_medium,
+    "api": stream_api,
+}
+
+# Per-backend circuit breakers; open backends fail fast and are routed around
+_breakers = breaker.from_env({
+    "small": probe_small,
+    "medium": probe_medium,
+    "api": None,
+})
+if _breakers is not None:
+    _EXECUTORS = _breakers.wrap_executors(_EXECUTORS)
+    _STREAMERS = _breakers.wrap_streamers(_STREAMERS)
+
+# Opt-in per-tier admission control: adaptive concurrency limits and bounded queues
+_admission = admission.from_env(latency_tracker)
+if _admission is not None:
+    _EXECUTORS = _admission.wrap_executors(_EXECUTORS)
+    _STREAMERS = _admission.wrap_streamers(_STREAMERS)
+
+_singleflight = singleflight.from_env()
 
+# Opt-in hedging of slow calls to the next tier, triggered at the tier's observed p95
+_hedging = hedging.from_env(latency_tracker)
+
+# Opt-in speculative cascade: cautious escalations try the small tier first
+_cascade = cascade.from_env(latency_tracker)
+
+# Opt-in near-duplicate answer reuse, embedding prompts with the classifier's vectorizer
+_semantic = semantic.from_env(_classifier.text_vectorizer())
+
+# Cached answers are replayed to streaming clients in chunks of this size
+REPLAY_CHUNK_CHARS = 2048
+
+# Max concurrent backend calls per tier within one /generate/batch request
+BATCH_TIER_CONCURRENCY = int(os.environ.get("BATCH_TIER_CONCURRENCY", "8"))
 
 def _cache_key(
     model_tier: str,
     prompt: str,
-    context: list[str],
+    context: ContextDigest,
     constraints: dict,
 ) -> str:
     normalized_prompt = normalize_text(prompt)
 
-    normalized_context = "\n".join(
-        normalize_text(c) for c in context
-    )
-
     # Normalize constraints explicitly
     normalized_constraints = json.dumps(
         {
@@ -66,9 +138,12 @@ def _cache_key(
         sort_keys=True,
     )
 
-    raw_key = f"{model_tier}:{normalized_prompt}:{normalized_context}:{normalized_constraints}"
+    # Context enters as its Merkle root, so unchanged chunks are never rehashed
+    h = hashlib.sha256(f"{model_tier}:{normalized_prompt}:".encode("utf-8"))
+    h.update(context.root)
+    h.update(f":{normalized_constraints}".encode("utf-8"))
 
-    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+    return h.hexdigest()
 
 
 def _cache_ttl(model_tier: str) -> int:
@@ -79,16 +154,224 @@ def _cache_ttl(model_tier: str) -> int:
     return 300  # api
 
 
-@router.post("/generate", response_model=GenerateResponse)
-def generate(request: GenerateRequest) -> GenerateResponse:
+def _decode_l2(cache_key: str, model_tier: str, cached: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """Decode a Redis value and refill L1 with it; None if absent or corrupt."""
+    if not cached:
+        return None
+
+    decode_start = time.perf_counter()
+    try:
+        payload = codec.decode(cached)
+    except Exception:
+        return None
+
+    CACHE_DECODE_LATENCY.labels(
+        encoding="binary" if codec.is_envelope(cached) else "json"
+    ).observe(time.perf_counter() - decode_start)
+
+    l1_set(cache_key, payload, size=len(cached), ttl=_cache_ttl(payload.get("model_tier", model_tier)))
+    return payload
+
+
+def _record_cache_result(model_tier: str, layer: Optional[str]) -> None:
+    if layer == "l1":
+        CACHE_LAYER_HITS.labels(layer="l1", model_tier=model_tier).inc()
+        CACHE_HITS.labels(model_tier=model_tier).inc()
+        return
+
+    CACHE_LAYER_MISSES.labels(layer="l1", model_tier=model_tier).inc()
+
+    if layer == "l2":
+        CACHE_LAYER_HITS.labels(layer="l2", model_tier=model_tier).inc()
+        CACHE_HITS.labels(model_tier=model_tier).inc()
+        return
+
+    CACHE_LAYER_MISSES.labels(layer="l2", model_tier=model_tier).inc()
+    CACHE_MISSES.labels(model_tier=model_tier).inc()
+
+
+async def _cache_lookup(
+    cache_key: str,
+    model_tier: str,
+    record_metrics: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch and decode a cached completion, recording the hit or miss.
+
+    The in-process L1 is consulted first and holds decoded payloads; Redis
+    is the L2 and refills L1 on hit. Streaming and non-streaming requests
+    share this lookup and the same keys, so both count towards one hit rate.
+    Coalescing followers poll with `record_metrics=False`.
+    """
+    payload = l1_get(cache_key)
+    layer = "l1"
+
+    if payload is None:
+        payload = _decode_l2(cache_key, model_tier, await cache_get(cache_key))
+        layer = "l2" if payload is not None else None
+
+    if record_metrics:
+        _record_cache_result(model_tier, layer)
+    return payload
+
+
+async def _cache_lookup_many(
+    cache_keys: list[str],
+    model_tiers: list[str],
+) -> list[Optional[Dict[str, Any]]]:
+    """Batch variant of _cache_lookup: L1 per key, then one MGET for the rest."""
+    payloads = [l1_get(key) for key in cache_keys]
+    layers = ["l1" if p is not None else None for p in payloads]
+
+    missing = [i for i, p in enumerate(payloads) if p is None]
+    fetched = await cache_mget([cache_keys[i] for i in missing])
+
+    for i, cached in zip(missing, fetched):
+        payloads[i] = _decode_l2(cache_keys[i], model_tiers[i], cached)
+        if payloads[i] is not None:
+            layers[i] = "l2"
+
+    for tier, layer in zip(model_tiers, layers):
+        _record_cache_result(tier, layer)
+
+    return payloads
+
+
+async def _cache_store(
+    cache_key: str,
+    model_tier: str,
+    response_text: str,
+    input_tokens: int,
+    output_tokens: int,
+    cost: float,
+    served_by: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Write an answer under the routed tier's cache key.
+
+    Answers served by another tier (hedge backups, cascades) carry that
+    tier as `model_tier`, so cache hits report the model, tokens and cost
+    that actually produced them, and expire with that tier's TTL.
+    """
+    payload = {
+        "response": response_text,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": cost,
+    }
+    if served_by is not None and served_by != model_tier:
+        payload["model_tier"] = served_by
+
+    ttl = _cache_ttl(served_by or model_tier)
+
+    try:
+        encoded = codec.encode(payload)
+        if codec.is_envelope(encoded):
+            CACHE_BYTES_SAVED.labels(model_tier=model_tier).inc(
+                max(len(json.dumps(payload)) - len(encoded), 0)
+            )
+
+        l1_set(cache_key, payload, size=len(encoded), ttl=ttl)
+        await cache_set(cache_key, encoded, ttl=ttl)
+    except Exception:
+        pass
+
+    return payload
+
+
+def _semantic_lookup(
+    request: GenerateRequest,
+    model_tier: str,
+    digest: ContextDigest,
+) -> Optional[Dict[str, Any]]:
+    if _semantic is None or not _semantic.applies(model_tier, request.constraints.risk_level):
+        return None
+
+    # Answers are only reused for the same tier and the same context
+    return _semantic.lookup(request.prompt, (model_tier, digest.root))
+
+
+def _semantic_store(
+    request: GenerateRequest,
+    model_tier: str,
+    digest: ContextDigest,
+    payload: Dict[str, Any],
+) -> None:
+    if _semantic is None or not _semantic.applies(model_tier, request.constraints.risk_level):
+        return
+
+    _semantic.cache.add(request.prompt, (model_tier, digest.root), payload)
+
+
+def _extract(
+    request: GenerateRequest,
+    digest: ContextDigest,
+) -> tuple[FeatureVector, PromptAnalysis]:
+    # One text pass per request, shared by feature extraction and routing;
+    # context token counts come from the chunk digests
+    analysis = analyze_prompt(
+        request.prompt,
+        request.context or [],
+        chunk_tokens=digest.chunk_tokens,
+    )
+
     features = extract_features(
         prompt=request.prompt,
         context=request.context or [],
         constraints=request.constraints.model_dump(),
+        analysis=analysis,
+    )
+    return features, analysis
+
+
+def _memo_key(request: GenerateRequest, digest: ContextDigest) -> str:
+    return RoutingMemo.key(
+        request.prompt,
+        digest,
+        request.constraints.risk_level,
+        _cost_budget(request),
     )
 
-    start_time = time.time()
 
+def _latency_budget(request: GenerateRequest) -> Optional[int]:
+    # Only a client-set max_latency_ms is a budget; the field default is not
+    if "max_latency_ms" in request.constraints.model_fields_set:
+        return request.constraints.max_latency_ms
+    return None
+
+
+def _cost_budget(request: GenerateRequest) -> Optional[float]:
+    # Only a client-set max_cost_usd is a budget; the field default is not
+    if "max_cost_usd" in request.constraints.model_fields_set:
+        return request.constraints.max_cost_usd
+    return None
+
+
+def _routing_fingerprint() -> tuple:
+    # Memoized decisions are only valid for the config and model that made them
+    return (config_generation(), _classifier.model_version())
+
+
+def _memo_get(
+    request: GenerateRequest,
+    digest: ContextDigest,
+) -> Optional[tuple[str, Dict[str, Any]]]:
+    if _memo is None:
+        return None
+
+    return _memo.get(
+        _memo_key(request, digest),
+        _routing_fingerprint(),
+    )
+
+
+def _decide(
+    request: GenerateRequest,
+    digest: ContextDigest,
+    features: FeatureVector,
+    analysis: PromptAnalysis,
+    prediction: Optional[ClassifierPrediction] = None,
+) -> tuple[str, Dict[str, Any]]:
     model_tier, decision_explanation = decide_model_tier(
         features=features.model_dump(),
         prompt=request.prompt,
@@ -96,9 +379,67 @@ def generate(request: GenerateRequest) -> GenerateResponse:
         context_token_count=features.context_length,
         risk_level=request.constraints.risk_level,
         max_latency_ms=request.constraints.max_latency_ms,
+        max_cost_usd=_cost_budget(request),
         classifier=_classifier,
+        prediction=prediction,
+        analysis=analysis,
     )
 
+    if _memo is not None:
+        _memo.put(
+            _memo_key(request, digest),
+            _routing_fingerprint(),
+            model_tier,
+            decision_explanation,
+        )
+
+    return model_tier, decision_explanation
+
+
+def _apply_budgets(
+    request: GenerateRequest,
+    routed: tuple[str, Dict[str, Any]],
+) -> tuple[str, Dict[str, Any]]:
+    """
+    Adjust a (possibly memoized) routing decision to live backend state.
+
+    Kept out of the routing memo because predicted latencies and backend
+    health change with every completed request. The latency budget only
+    applies when the client set `max_latency_ms`; the default is not a budget.
+    """
+    model_tier, decision_explanation = routed
+
+    max_latency_ms = _latency_budget(request)
+    if max_latency_ms is not None:
+        model_tier = enforce_latency_budget(
+            proposed_tier=model_tier,
+            max_latency_ms=max_latency_ms,
+            explanation=decision_explanation,
+            tracker=latency_tracker,
+        )
+
+    failover_tier = _failover_tier(model_tier, decision_explanation)
+    return failover_tier or model_tier, decision_explanation
+
+
+def _failover_tier(model_tier: str, decision_explanation: Dict[str, Any]) -> Optional[str]:
+    """Healthy tier to use instead of one with an open circuit, if any."""
+    if _breakers is None:
+        return None
+
+    healthy_tier = enforce_backend_health(
+        proposed_tier=model_tier,
+        explanation=decision_explanation,
+        breakers=_breakers,
+    )
+    if healthy_tier == model_tier:
+        return None
+
+    CIRCUIT_FAILOVERS.labels(from_tier=model_tier, to_tier=healthy_tier).inc()
+    return healthy_tier
+
+
+def _record_route(decision_explanation: Dict[str, Any]) -> None:
     # Record routing decision source (static / classifier / fallback)
     if decision_explanation.get("static_rule"):
         ROUTING_DECISIONS.labels(decision_type="static").inc()
@@ -107,93 +448,581 @@ def generate(request: GenerateRequest) -> GenerateResponse:
     elif decision_explanation.get("fallback"):
         ROUTING_DECISIONS.labels(decision_type="fallback").inc()
 
+
+async def _route(
+    request: GenerateRequest,
+    digest: ContextDigest,
+) -> tuple[str, Dict[str, Any]]:
+    """
+    Decide the tier for one request, reusing a memoized decision if present.
+
+    On a memo miss the features are extracted and, when micro-batching is
+    enabled, the classifier prediction is fetched through the batcher so
+    concurrent requests share one predict_proba call.
+    """
+    routed = _memo_get(request, digest)
+
+    if routed is None:
+        features, analysis = _extract(request, digest)
+
+        prediction = None
+        if _batcher is not None:
+            prediction = await _batcher.predict(
+                classifier_input(features.model_dump(), request.prompt)
+            )
+
+        routed = _decide(request, digest, features, analysis, prediction)
+
+    routed = _apply_budgets(request, routed)
+    _record_route(routed[1])
+    return routed
+
+
+def _record_inference(
+    model_tier: str,
+    latency: Optional[float],
+    input_tokens: int,
+    output_tokens: int,
+    cost: float,
+) -> None:
+    # Failed calls (no latency) are counted, but how fast a backend fails
+    # says nothing about how fast it answers
+    try:
+        REQUEST_COUNT.labels(model_tier=model_tier).inc()
+        if latency is not None:
+            INFERENCE_LATENCY.labels(model_tier=model_tier).observe(latency)
+            latency_tracker.observe(model_tier, latency)
+        _record_usage(model_tier, input_tokens, output_tokens, cost)
+    except Exception:
+        pass
+
+
+def _record_usage(model_tier: str, input_tokens: int, output_tokens: int, cost: float) -> None:
+    TOKEN_USAGE.labels(model_tier=model_tier, direction="input").inc(input_tokens)
+    TOKEN_USAGE.labels(model_tier=model_tier, direction="output").inc(output_tokens)
+    COST_TOTAL.labels(model_tier=model_tier).inc(cost)
+
+
+def _record_cascade(
+    outcome: CascadeOutcome,
+    start_time: float,
+    input_tokens: int,
+    output_tokens: int,
+    cost: float,
+    failed: bool = False,
+) -> None:
+    # An aborted small attempt still used tokens, but it served nothing; the
+    # serving tier is timed from the escalation so its p95 stays its own
+    if outcome.aborted is not None:
+        _record_usage(
+            CASCADE_TIER, outcome.aborted.input_tokens, outcome.aborted.output_tokens, outcome.aborted.cost
+        )
+
+    started = outcome.escalated_at or start_time
+    latency = None if failed else time.time() - started
+    _record_inference(outcome.served_by, latency, input_tokens, output_tokens, cost)
+
+
+def _schedule_as(request: GenerateRequest, batch: bool = False) -> None:
+    # Backend calls of this request wait in the scheduler queue under this class
+    if _admission is not None:
+        current_class.set(
+            _admission.scheduler.classify(
+                request.constraints.risk_level,
+                _latency_budget(request),
+                request.tenant,
+                batch=batch,
+            )
+        )
+
+
+def _cascade_outcome(
+    request: GenerateRequest,
+    model_tier: str,
+    decision_explanation: Dict[str, Any],
+) -> Optional[CascadeOutcome]:
+    if _cascade is None or not _cascade.applies(
+        model_tier,
+        decision_explanation,
+        request.constraints.risk_level,
+        request.constraints.max_latency_ms,
+    ):
+        return None
+    return CascadeOutcome(target_tier=model_tier)
+
+
+def _within_cost_budget(model_tier: str, decision_explanation: Dict[str, Any]) -> bool:
+    cost = decision_explanation.get("cost")
+    return cost is None or cost["predicted_usd"][model_tier] <= cost["budget_usd"]
+
+
+def _healthy_or_larger(model_tier: Optional[str]) -> Optional[str]:
+    """`model_tier`, or the next larger tier whose circuit is not open."""
+    while model_tier is not None and _breakers is not None and not _breakers.healthy(model_tier):
+        index = TIER_ORDER.index(model_tier)
+        model_tier = TIER_ORDER[index + 1] if index + 1 < len(TIER_ORDER) else None
+    return model_tier
+
+
+def _hedge_backup(model_tier: str, decision_explanation: Dict[str, Any]) -> Optional[str]:
+    if _hedging is None:
+        return None
+
+    # A backup on an open circuit would fail at once and look fast
+    backup_tier = _healthy_or_larger(_hedging.backup_for(model_tier))
+
+    # Never hedge onto a tier the request's cost budget ruled out
+    if backup_tier is not None and not _within_cost_budget(backup_tier, decision_explanation):
+        return None
+
+    return backup_tier
+
+
+def _overflow_tier(
+    shed: Overloaded,
+    decision_explanation: Dict[str, Any],
+) -> Optional[str]:
+    """Tier to reroute a shed request to, recording the reroute; None to reject."""
+    if _admission is None:
+        return None
+
+    overflow_tier = _healthy_or_larger(_admission.overflow_tier(shed.model_tier))
+    if overflow_tier is None or not _within_cost_budget(overflow_tier, decision_explanation):
+        return None
+
+    decision_explanation["admission"] = {
+        "shed": shed.model_tier,
+        "reason": shed.reason,
+        "rerouted_to": overflow_tier,
+    }
+    return overflow_tier
+
+
+def _record_cost_estimate(
+    model_tier: str,
+    decision_explanation: Dict[str, Any],
+    cost: float,
+) -> None:
+    # Compare the actual cost with the prediction the cost budget was checked against
+    predicted = decision_explanation.get("cost", {}).get("predicted_usd", {}).get(model_tier)
+    if not predicted:
+        return
+
+    COST_PREDICTION_RATIO.labels(model_tier=model_tier).observe(cost / predicted)
+    if cost > predicted:
+        COST_OVERRUNS.labels(model_tier=model_tier).inc()
+
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate(request: GenerateRequest) -> GenerateResponse:
+    start_time = time.time()
+    _schedule_as(request)
+
+    digest = digest_context(request.context)
+    model_tier, decision_explanation = await _route(request, digest)
+
     cache_key = _cache_key(
         model_tier,
         request.prompt,
-        request.context or [],
+        digest,
         request.constraints.model_dump(),
     )
 
-    payload = None
-    cached = cache_get(cache_key)
+    payload = await _cache_lookup(cache_key, model_tier)
+
+    if payload is None:
+        payload = _semantic_lookup(request, model_tier, digest)
+
+    if payload is not None:
+        REQUEST_COUNT.labels(model_tier=model_tier).inc()
+        return _to_response(payload, model_tier, cache_hit=True)
+
+    payload, role = await _infer_shared(
+        request, model_tier, decision_explanation, cache_key, start_time
+    )
+
+    if role == "leader":
+        _semantic_store(request, model_tier, digest, payload)
+
+    return _to_response(
+        payload,
+        model_tier,
+        cache_hit=role != "leader",
+        debug=decision_explanation if request.debug else None,
+    )
+
+
+def _to_response(
+    payload: Dict[str, Any],
+    model_tier: str,
+    cache_hit: bool,
+    debug: Optional[Dict[str, Any]] = None,
+) -> GenerateResponse:
+    return GenerateResponse(
+        response=payload["response"],
+        # Hedged and cascaded answers carry the tier that actually served them
+        model_used=payload.get("model_tier", model_tier),
+        tokens_used=TokenUsage(
+            input=payload["input_tokens"],
+            output=payload["output_tokens"],
+        ),
+        estimated_cost_usd=payload["cost"],
+        cache_hit=cache_hit,
+        debug=debug,
+    )
+
+
+async def _infer_shared(
+    request: GenerateRequest,
+    model_tier: str,
+    decision_explanation: Dict[str, Any],
+    cache_key: str,
+    start_time: float,
+) -> tuple[Dict[str, Any], str]:
+    """
+    Run inference for a cache miss, coalesced with identical in-flight requests.
+
+    Returns the payload and the single-flight role ("leader", "local" or
+    "remote"); only the leader calls the backend and writes the cache.
+    """
+    async def execute(tier: str) -> tuple[str, int, int, float]:
+        # A hedge backup is timed from its own start, not the request's
+        started = start_time if tier == model_tier else time.time()
+        result: Optional[tuple[str, int, int, float]] = None
+        reached_backend = True
 
-    if cached:
         try:
-            payload = json.loads(cached)
-            CACHE_HITS.labels(model_tier=model_tier).inc()
-            REQUEST_COUNT.labels(model_tier=model_tier).inc()
+            result = await _EXECUTORS[tier](request.prompt, request.context or [])
+            return result
+        except (asyncio.CancelledError, Overloaded, CircuitOpen):
+            # Lost a hedge race, or never reached the backend; only calls the
+            # backend answered (or failed) are recorded
+            reached_backend = False
+            raise
+        finally:
+            if reached_backend:
+                latency = time.time() - started if result is not None else None
+                _, input_tokens, output_tokens, cost = result or ("", 0, 0, 0.0)
+                _record_inference(tier, latency, input_tokens, output_tokens, cost)
+
+    async def execute_cascade(outcome: CascadeOutcome) -> tuple[str, int, int, float]:
+        result: Optional[tuple[str, int, int, float]] = None
+        reached_backend = True
 
-            return GenerateResponse(
-                response=payload["response"],
-                model_used=model_tier,
-                tokens_used=TokenUsage(
-                    input=payload["input_tokens"],
-                    output=payload["output_tokens"],
-                ),
-                estimated_cost_usd=payload["cost"],
-                cache_hit=True,
+        try:
+            result = await _cascade.execute(
+                _STREAMERS, request.prompt, request.context or [], outcome
             )
-        except Exception:
-            CACHE_MISSES.labels(model_tier=model_tier).inc()
-            cached = None
+            return result
+        except (asyncio.CancelledError, Overloaded, CircuitOpen):
+            reached_backend = False
+            raise
+        finally:
+            decision_explanation["cascade"] = outcome.explain()
+            if reached_backend:
+                _, input_tokens, output_tokens, cost = result or ("", 0, 0, 0.0)
+                _record_cascade(
+                    outcome, start_time, input_tokens, output_tokens, cost, failed=result is None
+                )
 
-    CACHE_MISSES.labels(model_tier=model_tier).inc()
+    async def infer() -> Dict[str, Any]:
+        outcome = _cascade_outcome(request, model_tier, decision_explanation)
+        backup_tier = _hedge_backup(model_tier, decision_explanation)
 
-    response_text = ""
-    input_tokens = 0
-    output_tokens = 0
-    cost = 0.0
+        try:
+            if outcome is not None:
+                result = await execute_cascade(outcome)
+                served_by = outcome.served_by
+            elif backup_tier is None:
+                result, served_by = await execute(model_tier), model_tier
+            else:
+                result, served_by = await _hedging.run(model_tier, backup_tier, execute)
+                if served_by != model_tier:
+                    decision_explanation["hedged_to"] = served_by
+        except Overloaded as shed:
+            overflow_tier = _overflow_tier(shed, decision_explanation)
+            if overflow_tier is None:
+                raise
+            result, served_by = await execute(overflow_tier), overflow_tier
+        except CircuitOpen as open_circuit:
+            # The circuit opened after routing; fail over now instead of erroring
+            failover_tier = _failover_tier(open_circuit.model_tier, decision_explanation)
+            if failover_tier is None:
+                raise
+            result, served_by = await execute(failover_tier), failover_tier
 
-    try:
-        if model_tier == "small":
-            response_text, input_tokens, output_tokens, cost = execute_small(
-                request.prompt, request.context or []
-            )
-        elif model_tier == "medium":
-            response_text, input_tokens, output_tokens, cost = execute_medium(
-                request.prompt, request.context or []
+        response_text, input_tokens, output_tokens, cost = result
+        _record_cost_estimate(served_by, decision_explanation, cost)
+
+        # Cache only successful inference
+        return await _cache_store(
+            cache_key, model_tier, response_text, input_tokens, output_tokens, cost, served_by
+        )
+
+    async def peek() -> Optional[Dict[str, Any]]:
+        return await _cache_lookup(cache_key, model_tier, record_metrics=False)
+
+    # Identical concurrent requests share one backend call
+    payload, role = await _singleflight.run(cache_key, infer, peek)
+
+    if role != "leader":
+        COALESCED_REQUESTS.labels(model_tier=model_tier, scope=role).inc()
+        REQUEST_COUNT.labels(model_tier=model_tier).inc()
+
+    return payload, role
+
+
+@router.post("/generate/batch")
+async def generate_batch(batch: BatchGenerateRequest) -> StreamingResponse:
+    """
+    Route and answer many prompts in one call.
+
+    Requests without a memoized routing decision have their features
+    extracted and are classified together in a single classifier call, all
+    cache keys are fetched with one MGET, and misses are dispatched per tier
+    with at most BATCH_TIER_CONCURRENCY backend calls in flight per tier.
+    Results are streamed back as NDJSON BatchItemResult lines in input
+    order, each as soon as it and every earlier item are done.
+    """
+    requests = batch.requests
+
+    digests = [digest_context(request.context) for request in requests]
+
+    routes = [_memo_get(request, digest) for request, digest in zip(requests, digests)]
+    pending = [i for i, routed in enumerate(routes) if routed is None]
+
+    extracted = [_extract(requests[i], digests[i]) for i in pending]
+    predictions = _classifier.predict_batch(
+        [
+            classifier_input(f.model_dump(), requests[i].prompt)
+            for i, (f, _) in zip(pending, extracted)
+        ]
+    ) if pending else []
+
+    for i, (f, analysis), prediction in zip(pending, extracted, predictions):
+        routes[i] = _decide(requests[i], digests[i], f, analysis, prediction)
+
+    routes = [_apply_budgets(request, routed) for request, routed in zip(requests, routes)]
+
+    for _, decision_explanation in routes:
+        _record_route(decision_explanation)
+
+    model_tiers = [tier for tier, _ in routes]
+
+    cache_keys = [
+        _cache_key(
+            tier,
+            request.prompt,
+            digest,
+            request.constraints.model_dump(),
+        )
+        for request, digest, tier in zip(requests, digests, model_tiers)
+    ]
+
+    cached = await _cache_lookup_many(cache_keys, model_tiers)
+
+    limits = {tier: asyncio.Semaphore(BATCH_TIER_CONCURRENCY) for tier in _EXECUTORS}
+
+    async def resolve(index: int) -> BatchItemResult:
+        request = requests[index]
+        model_tier, decision_explanation = routes[index]
+        _schedule_as(request, batch=True)
+
+        if cached[index] is not None:
+            REQUEST_COUNT.labels(model_tier=model_tier).inc()
+            return BatchItemResult(
+                index=index,
+                result=_to_response(cached[index], model_tier, cache_hit=True),
             )
-        else:
-            response_text, input_tokens, output_tokens, cost = execute_api(
-                request.prompt, request.context or []
+
+        async with limits[model_tier]:
+            payload, role = await _infer_shared(
+                request, model_tier, decision_explanation, cache_keys[index], time.time()
             )
-    finally:
-        latency = time.time() - start_time
 
+        return BatchItemResult(
+            index=index,
+            result=_to_response(
+                payload,
+                model_tier,
+                cache_hit=role != "leader",
+                debug=decision_explanation if request.debug else None,
+            ),
+        )
+
+    tasks = [asyncio.ensure_future(resolve(i)) for i in range(len(requests))]
+
+    async def lines() -> AsyncIterator[str]:
         try:
-            REQUEST_COUNT.labels(model_tier=model_tier).inc()
-            INFERENCE_LATENCY.labels(model_tier=model_tier).observe(latency)
-            TOKEN_USAGE.labels(model_tier=model_tier, direction="input").inc(input_tokens)
-            TOKEN_USAGE.labels(model_tier=model_tier, direction="output").inc(output_tokens)
-            COST_TOTAL.labels(model_tier=model_tier).inc(cost)
-        except Exception:
-            pass
+            for index, task in enumerate(tasks):
+                try:
+                    item = await task
+                except Exception as e:
+                    item = BatchItemResult(index=index, error=str(e))
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop dispatching the rest of the batch
+            for task in tasks:
+                task.cancel()
 
-    # Cache only successful inference
-    try:
-        cache_set(
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate/stream")
+async def generate_stream(request: GenerateRequest) -> StreamingResponse:
+    """
+    Server-sent-event variant of /generate.
+
+    Emits one `token` event per text delta from the backend, then a final
+    `done` event carrying a StreamSummary (model, token usage and cost).
+    Backend failures after the stream has started are reported as an
+    `error` event, since the HTTP status has already been sent.
+
+    Completed streams are written to the same cache as /generate; aborted
+    or failed streams are not. Cache hits are replayed immediately.
+    """
+    start_time = time.time()
+
+    digest = digest_context(request.context)
+    model_tier, decision_explanation = await _route(request, digest)
+
+    cache_key = _cache_key(
+        model_tier,
+        request.prompt,
+        digest,
+        request.constraints.model_dump(),
+    )
+
+    payload = await _cache_lookup(cache_key, model_tier)
+
+    if payload is None:
+        payload = _semantic_lookup(request, model_tier, digest)
+
+    if payload is not None:
+        REQUEST_COUNT.labels(model_tier=model_tier).inc()
+        return StreamingResponse(
+            _replay_cached(payload, model_tier),
+            media_type="text/event-stream",
+        )
+
+    stream_tier = model_tier
+    outcome = _cascade_outcome(request, model_tier, decision_explanation)
+
+    # Shed before the response starts, while a 429 can still be sent
+    if outcome is None and _admission is not None and _admission.saturated(model_tier):
+        shed = _admission.overloaded(model_tier)
+        stream_tier = _overflow_tier(shed, decision_explanation)
+        if stream_tier is None:
+            raise shed
+
+    # Routing already failed over where it could; fail fast with a 503
+    if outcome is None and _breakers is not None and not _breakers.healthy(stream_tier):
+        raise _breakers.open_circuit(stream_tier)
+
+    if outcome is None:
+        stream = _STREAMERS[stream_tier](request.prompt, request.context or [])
+    else:
+        stream = _cascade.stream(_STREAMERS, request.prompt, request.context or [], outcome)
+
+    def served_by() -> str:
+        return outcome.served_by if outcome is not None else stream_tier
+
+    async def events() -> AsyncIterator[str]:
+        _schedule_as(request)
+        usage = StreamUsage()
+        parts: list[str] = []
+        first_token = True
+        reached_backend = True
+        failed = False
+
+        try:
+            async for item in stream:
+                if isinstance(item, StreamUsage):
+                    usage = item
+                    continue
+
+                if first_token:
+                    TIME_TO_FIRST_TOKEN.labels(model_tier=served_by()).observe(
+                        time.time() - start_time
+                    )
+                    first_token = False
+
+                parts.append(item)
+                yield _sse("token", {"text": item})
+        except RuntimeError as e:
+            # Shed or circuit-open streams never reached the backend
+            reached_backend = not isinstance(e, (Overloaded, CircuitOpen))
+            failed = True
+            yield _sse("error", {"detail": str(e)})
+            return
+        finally:
+            if outcome is not None:
+                decision_explanation["cascade"] = outcome.explain()
+                if reached_backend:
+                    _record_cascade(
+                        outcome,
+                        start_time,
+                        usage.input_tokens,
+                        usage.output_tokens,
+                        usage.cost,
+                        failed=failed,
+                    )
+            elif reached_backend:
+                _record_inference(
+                    stream_tier,
+                    None if failed else time.time() - start_time,
+                    usage.input_tokens,
+                    usage.output_tokens,
+                    usage.cost,
+                )
+
+        # Only reached when the stream ended normally
+        _record_cost_estimate(served_by(), decision_explanation, usage.cost)
+
+        payload = await _cache_store(
             cache_key,
-            json.dumps(
-                {
-                    "response": response_text,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "cost": cost,
-                }
+            model_tier,
+            "".join(parts),
+            usage.input_tokens,
+            usage.output_tokens,
+            usage.cost,
+            served_by(),
+        )
+        _semantic_store(request, model_tier, digest, payload)
+
+        summary = StreamSummary(
+            model_used=served_by(),
+            tokens_used=TokenUsage(
+                input=usage.input_tokens,
+                output=usage.output_tokens,
             ),
-            ttl=_cache_ttl(model_tier),
+            estimated_cost_usd=usage.cost,
+            cache_hit=False,
+            debug=decision_explanation if request.debug else None,
         )
-    except Exception:
-        pass
+        yield _sse("done", summary.model_dump(mode="json"))
 
-    return GenerateResponse(
-        response=response_text,
-        model_used=model_tier,
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def _replay_cached(payload: Dict[str, Any], model_tier: str) -> AsyncIterator[str]:
+    text = payload["response"]
+
+    # Short answers go out as a single frame, long ones in fixed-size chunks
+    for i in range(0, len(text), REPLAY_CHUNK_CHARS):
+        yield _sse("token", {"text": text[i:i + REPLAY_CHUNK_CHARS]})
+
+    summary = StreamSummary(
+        model_used=payload.get("model_tier", model_tier),
         tokens_used=TokenUsage(
-            input=input_tokens,
-            output=output_tokens,
+            input=payload["input_tokens"],
+            output=payload["output_tokens"],
         ),
-        estimated_cost_usd=cost,
-        cache_hit=False,
-        debug=decision_explanation if request.debug else None,
+        estimated_cost_usd=payload["cost"],
+        cache_hit=True,
     )
+    yield _sse("done", summary.model_dump(mode="json"))
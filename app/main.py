@@ -1,6 +1,12 @@
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from app.api import router as api_router
 from config import load_config
+from cache.redis import close as close_cache
+from inference.ollama import init_backends, close_backends, pool_stats
+from inference.api import close_client as close_api_client
+from inference.admission import Overloaded
+from inference.breaker import CircuitOpen
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -22,6 +28,32 @@ app.add_middleware(
 @app.on_event("startup")
 def startup_event():
     load_config("config")
+    init_backends()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_cache()
+    await close_backends()
+    await close_api_client()
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
+
+
+@app.exception_handler(CircuitOpen)
+async def circuit_open_handler(request: Request, exc: CircuitOpen):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
 
 
 @app.get("/metrics")
@@ -31,6 +63,10 @@ def metrics():
         media_type=CONTENT_TYPE_LATEST,
     )
 
+@app.get("/pools")
+def pools():
+    return {"ollama": pool_stats()}
+
 @app.get("/")
 def read_root():
     return {"message": "LLM Router API", "status": "running"}
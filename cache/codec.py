@@ -0,0 +1,121 @@
+"""
+Binary envelope for cached responses.
+
+Layout (network byte order):
+
+    magic     2 bytes   b"\\x00\\xc5" (JSON values can never start with NUL)
+    version   1 byte
+    flags     1 byte    bit 0: body is zlib-compressed
+    input     uint32    input tokens
+    output    uint32    output tokens
+    cost      float64   cost in USD
+    tier      1+n bytes version 2 only: length-prefixed ASCII name of the tier
+                        that served the answer, when it differs from the tier
+                        the request was routed to (hedges, cascades)
+    body      rest      UTF-8 response text, compressed when large enough
+
+The fixed header replaces the JSON field names and number formatting, and
+long answers are compressed once they reach CACHE_COMPRESS_MIN_BYTES. Values
+without the magic prefix are decoded as the legacy JSON format, so entries
+written before the rollout keep being served until they expire.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, Union
+
+MAGIC = b"\x00\xc5"
+VERSION = 2
+
+# Entries without a serving tier are still written as version 1, which
+# workers from before version 2 can read
+_VERSION_NO_TIER = 1
+
+_FLAG_ZLIB = 0x01
+_HEADER = struct.Struct("!2sBBIId")
+
+ENCODING = os.environ.get("CACHE_ENCODING", "binary").lower()
+COMPRESS_MIN_BYTES = int(os.environ.get("CACHE_COMPRESS_MIN_BYTES", "512"))
+COMPRESS_LEVEL = int(os.environ.get("CACHE_COMPRESS_LEVEL", "6"))
+
+
+def encode(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a cached response payload.
+
+    Environment variables:
+        CACHE_ENCODING: "binary" (default) or "json" to keep writing the
+            legacy format while older workers are still reading the cache
+        CACHE_COMPRESS_MIN_BYTES: Compress bodies at least this long (default: 512)
+        CACHE_COMPRESS_LEVEL: zlib compression level (default: 6)
+    """
+    if ENCODING == "json":
+        return json.dumps(payload).encode("utf-8")
+
+    body = payload["response"].encode("utf-8")
+    flags = 0
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        # Incompressible answers are stored as-is
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= _FLAG_ZLIB
+
+    model_tier = payload.get("model_tier")
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION if model_tier is not None else _VERSION_NO_TIER,
+        flags,
+        payload["input_tokens"],
+        payload["output_tokens"],
+        payload["cost"],
+    )
+    if model_tier is None:
+        return header + body
+
+    tier = model_tier.encode("ascii")
+    return header + bytes([len(tier)]) + tier + body
+
+
+def decode(raw: Union[bytes, str]) -> Dict[str, Any]:
+    """Decode an envelope or a legacy JSON value; raises ValueError if corrupt."""
+    if isinstance(raw, str) or not raw.startswith(MAGIC):
+        return json.loads(raw)
+
+    try:
+        _, version, flags, input_tokens, output_tokens, cost = _HEADER.unpack_from(raw)
+    except struct.error as e:
+        raise ValueError(f"Truncated cache envelope: {e}")
+
+    if version not in (_VERSION_NO_TIER, VERSION):
+        raise ValueError(f"Unsupported cache envelope version: {version}")
+
+    offset = _HEADER.size
+    model_tier = None
+    if version == VERSION:
+        if len(raw) <= offset or len(raw) < offset + 1 + raw[offset]:
+            raise ValueError("Truncated cache envelope: missing tier")
+        model_tier = raw[offset + 1:offset + 1 + raw[offset]].decode("ascii")
+        offset += 1 + raw[offset]
+
+    body = raw[offset:]
+    if flags & _FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    payload = {
+        "response": body.decode("utf-8"),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": cost,
+    }
+    if model_tier is not None:
+        payload["model_tier"] = model_tier
+    return payload
+
+
+def is_envelope(raw: Union[bytes, str]) -> bool:
+    return isinstance(raw, bytes) and raw.startswith(MAGIC)
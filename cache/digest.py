@@ -0,0 +1,144 @@
+"""
+Per-chunk context digests for cache keys, routing memo keys and token counts.
+
+RAG-style clients resend the same large context chunks with many prompts.
+Each chunk is fingerprinted with a raw SHA-256 of its bytes, the digest of
+its normalized text and its token count. A bounded memo keyed by the chunk's
+length, head and tail holds all three, and a hit is confirmed by comparing
+the stored chunk (a memcmp, far cheaper than SHA-256), so repeated
+chunks are never hashed, normalized or counted again. Keys are
+then composed from the per-chunk normalized digests (Merkle-style) instead
+of hashing one joined copy of the whole context. The raw digests are
+combined the same way for keys that must tell apart chunks differing only
+in case or whitespace.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from classifier.features import normalize_text
+from classifier.tokens import whitespace_count
+from metrics.prometheus import CONTEXT_DIGEST_LOOKUPS
+
+
+@dataclass(frozen=True)
+class ContextDigest:
+    """
+    Fingerprint of a request's context.
+
+    Attributes:
+        chunk_digests: SHA-256 of each chunk's normalized text
+        chunk_tokens: Whitespace token count of each chunk
+        root: SHA-256 over the chunk digests, identifying the whole context
+            up to case and whitespace
+        raw_root: SHA-256 over the raw chunk bytes' digests, identifying
+            the exact context
+    """
+    chunk_digests: Tuple[bytes, ...]
+    chunk_tokens: Tuple[int, ...]
+    root: bytes
+    raw_root: bytes = b""
+
+
+class ChunkDigestMemo:
+    """
+    LRU memo of chunk -> (raw digest, normalized digest, token count).
+
+    Entries are keyed by a cheap pre-key (length plus the first and last
+    `edge_chars` characters) and keep the chunk itself, so a lookup confirms
+    an exact match without hashing. Chunks sharing a pre-key replace each
+    other.
+    """
+
+    def __init__(self, max_entries: int, edge_chars: int = 64):
+        self.max_entries = max_entries
+        self.edge_chars = edge_chars
+        self._entries: "OrderedDict[Tuple[int, str, str], Tuple[str, Tuple[bytes, bytes, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, chunk: str) -> Tuple[int, str, str]:
+        return len(chunk), chunk[:self.edge_chars], chunk[-self.edge_chars:]
+
+    def get(self, chunk: str) -> Optional[Tuple[bytes, bytes, int]]:
+        key = self._key(chunk)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != chunk:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, chunk: str, digests: Tuple[bytes, bytes, int]) -> None:
+        key = self._key(chunk)
+        with self._lock:
+            self._entries[key] = (chunk, digests)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _build_memo() -> Optional[ChunkDigestMemo]:
+    """
+    Environment variables:
+        CONTEXT_DIGEST_MEMO_SIZE: Max memoized context chunks (default: 4096, 0 disables)
+    """
+    max_entries = int(os.environ.get("CONTEXT_DIGEST_MEMO_SIZE", "4096"))
+    if max_entries <= 0:
+        return None
+    return ChunkDigestMemo(max_entries)
+
+
+_memo = _build_memo()
+
+
+def _digest_chunk(chunk: str) -> Tuple[bytes, bytes, int]:
+    return (
+        hashlib.sha256(chunk.encode("utf-8")).digest(),
+        hashlib.sha256(normalize_text(chunk).encode("utf-8")).digest(),
+        whitespace_count(chunk),
+    )
+
+
+def digest_chunk(chunk: str) -> Tuple[bytes, bytes, int]:
+    """(raw digest, normalized digest, token count) of one chunk, memoized by content."""
+    if _memo is None:
+        return _digest_chunk(chunk)
+
+    entry = _memo.get(chunk)
+    if entry is not None:
+        CONTEXT_DIGEST_LOOKUPS.labels(result="hit").inc()
+        return entry
+
+    CONTEXT_DIGEST_LOOKUPS.labels(result="miss").inc()
+    entry = _digest_chunk(chunk)
+    _memo.put(chunk, entry)
+    return entry
+
+
+def digest_context(context: Optional[List[str]]) -> ContextDigest:
+    """Fingerprint every chunk once and combine them into a ContextDigest."""
+    raw_digests: List[bytes] = []
+    digests: List[bytes] = []
+    tokens: List[int] = []
+
+    for chunk in context or []:
+        raw_digest, digest, count = digest_chunk(chunk)
+        raw_digests.append(raw_digest)
+        digests.append(digest)
+        tokens.append(count)
+
+    return ContextDigest(
+        chunk_digests=tuple(digests),
+        chunk_tokens=tuple(tokens),
+        root=hashlib.sha256(b"".join(digests)).digest(),
+        raw_root=hashlib.sha256(b"".join(raw_digests)).digest(),
+    )
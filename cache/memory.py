@@ -0,0 +1,97 @@
+"""
+In-process L1 response cache sitting in front of Redis.
+
+Entries are stored already decoded, so hot hits skip both the Redis round
+trip and `json.loads`. The cache is bounded by the encoded size of its
+entries and evicts in least-recently-used order; every entry also carries
+its own TTL so L1 never outlives the tier's Redis expiry policy.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Rough per-entry bookkeeping cost (key, tuple, OrderedDict node)
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+class MemoryCache:
+    """
+    Byte-bounded LRU cache with per-entry TTLs.
+
+    Sizes are supplied by the caller (the encoded payload length), which
+    keeps accounting cheap and proportional to what Redis would store.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: int) -> None:
+        size += _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes or ttl <= 0:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Process-wide L1 instance.
+# L1_CACHE_MAX_BYTES: size bound in bytes (default: 64 MiB, 0 disables L1)
+_l1 = MemoryCache(int(os.environ.get("L1_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+
+def get(key: str) -> Optional[Any]:
+    if _l1.max_bytes <= 0:
+        return None
+    return _l1.get(key)
+
+
+def set(key: str, value: Any, size: int, ttl: int) -> None:
+    if _l1.max_bytes <= 0:
+        return
+    _l1.set(key, value, size, ttl)
+
+
+def stats() -> Dict[str, int]:
+    return _l1.stats()
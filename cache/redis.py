@@ -1,5 +1,5 @@
 import os
-import redis
+import redis.asyncio as redis
 from typing import Optional
 
 _redis_client: Optional[redis.Redis] = None
@@ -16,32 +16,126 @@ def _get_client() -> Optional[redis.Redis]:
         return None
 
     try:
-        _redis_client = redis.Redis.from_url(
-            redis_url,
-            decode_responses=True
-        )
+        # Cache values are binary envelopes (see cache.codec)
+        _redis_client = redis.Redis.from_url(redis_url)
         return _redis_client
     except Exception:
         return None
 
 
-def get(key: str) -> Optional[str]:
+async def get(key: str) -> Optional[bytes]:
     client = _get_client()
     if client is None:
         return None
 
     try:
-        return client.get(key)
+        return await client.get(key)
     except Exception:
         return None
 
 
-def set(key: str, value: str, ttl: int) -> None:
+async def mget(keys: list[str]) -> list[Optional[bytes]]:
+    """Fetch many keys in one round trip; missing keys (or no Redis) give None."""
+    client = _get_client()
+    if client is None or not keys:
+        return [None] * len(keys)
+
+    try:
+        return await client.mget(keys)
+    except Exception:
+        return [None] * len(keys)
+
+
+async def set(key: str, value: bytes, ttl: int) -> None:
     client = _get_client()
     if client is None:
         return
 
     try:
-        client.setex(key, ttl, value)
+        await client.setex(key, ttl, value)
     except Exception:
         return
+
+
+async def close() -> None:
+    global _redis_client
+
+    if _redis_client is None:
+        return
+
+    try:
+        await _redis_client.aclose()
+    except Exception:
+        pass
+    _redis_client = None
+
+
+# --------------------------------------------------
+# Short-lived leases for cross-worker coordination
+# --------------------------------------------------
+_LEASE_PREFIX = "lease:"
+
+# Only the holder (matching token) may extend or drop a lease
+_REFRESH_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_lease(key: str, token: str, ttl_ms: int) -> Optional[bool]:
+    """
+    Try to take the lease for `key`.
+
+    Returns True if acquired, False if another holder has it, and None when
+    Redis is unavailable (callers should then proceed on their own).
+    """
+    client = _get_client()
+    if client is None:
+        return None
+
+    try:
+        return bool(await client.set(_LEASE_PREFIX + key, token, nx=True, px=ttl_ms))
+    except Exception:
+        return None
+
+
+async def refresh_lease(key: str, token: str, ttl_ms: int) -> None:
+    client = _get_client()
+    if client is None:
+        return
+
+    try:
+        await client.eval(_REFRESH_SCRIPT, 1, _LEASE_PREFIX + key, token, ttl_ms)
+    except Exception:
+        return
+
+
+async def release_lease(key: str, token: str) -> None:
+    client = _get_client()
+    if client is None:
+        return
+
+    try:
+        await client.eval(_RELEASE_SCRIPT, 1, _LEASE_PREFIX + key, token)
+    except Exception:
+        return
+
+
+async def lease_held(key: str) -> bool:
+    client = _get_client()
+    if client is None:
+        return False
+
+    try:
+        return bool(await client.exists(_LEASE_PREFIX + key))
+    except Exception:
+        return False
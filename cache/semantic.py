@@ -0,0 +1,268 @@
+"""
+Near-duplicate response cache keyed by prompt similarity.
+
+Exact cache keys miss on trivially reworded prompts. SemanticCache embeds
+prompts with the classifier's TF-IDF `text_vectorizer` (rows are already
+L2-normalized, so a dot product is the cosine similarity) and keeps a
+bounded in-memory index of recent responses.
+
+Search uses multi-probe random-hyperplane LSH: each vector gets `bands`
+signatures of `rows` sign bits, and only entries whose signature in some
+band equals the query's or differs in one bit (in the same partition) are
+scored exactly. With the default 16 bands x 24 rows, pairs at cosine 0.92
+are found with ~95% probability while unrelated prompts almost never
+become candidates, which keeps lookups sub-millisecond at 100k entries.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from metrics.prometheus import SEMANTIC_CACHE_LOOKUPS
+
+_RISK_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+
+@dataclass
+class _Entry:
+    terms: Dict[int, float]
+    partition: Hashable
+    signature: Tuple[int, ...]
+    payload: Dict[str, Any]
+    expires_at: float
+
+
+class SemanticCache:
+    """
+    Bounded LSH index of (prompt vector -> cached payload) per partition.
+
+    Partitions (e.g. model tier and context digest) never match each other,
+    so an answer is only reused for the same tier and the same context.
+    """
+
+    def __init__(
+        self,
+        text_vectorizer: Any,
+        *,
+        max_entries: int,
+        ttl_s: float,
+        threshold: float,
+        bands: int = 16,
+        rows: int = 24,
+        seed: int = 0,
+    ):
+        self._vectorizer = text_vectorizer
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+
+        # Scoring a single prompt through TfidfVectorizer.transform costs far
+        # more than the search itself; replay its analyzer, idf weighting
+        # and l2 normalization directly when the vectorizer allows it.
+        self._analyzer = None
+        if getattr(text_vectorizer, "norm", None) in ("l2", None):
+            self._analyzer = text_vectorizer.build_analyzer()
+            self._vocabulary = text_vectorizer.vocabulary_
+            self._idf = text_vectorizer.idf_.tolist() if text_vectorizer.use_idf else None
+            self._sublinear_tf = text_vectorizer.sublinear_tf
+            self._normalize = text_vectorizer.norm == "l2"
+
+        dim = len(text_vectorizer.vocabulary_)
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((dim, bands * rows)).astype(np.float32)
+        self._weights = (1 << np.arange(rows, dtype=np.int64))
+        self._flips = [1 << bit for bit in range(rows)]
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # partition -> one {signature: entry ids} table per band
+        self._tables: Dict[Hashable, List[Dict[int, List[int]]]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def embed(self, prompt: str) -> Dict[int, float]:
+        """Sparse TF-IDF vector of a prompt as {term index: weight}."""
+        if self._analyzer is None:
+            row = self._vectorizer.transform([prompt])
+            return dict(zip(row.indices.tolist(), row.data.tolist()))
+
+        vocabulary = self._vocabulary
+        terms: Dict[int, float] = {}
+        for token in self._analyzer(prompt):
+            index = vocabulary.get(token)
+            if index is not None:
+                terms[index] = terms.get(index, 0.0) + 1.0
+
+        if self._sublinear_tf:
+            terms = {i: 1.0 + math.log(tf) for i, tf in terms.items()}
+        if self._idf is not None:
+            idf = self._idf
+            terms = {i: tf * idf[i] for i, tf in terms.items()}
+        if self._normalize and terms:
+            norm = math.sqrt(sum(w * w for w in terms.values()))
+            terms = {i: w / norm for i, w in terms.items()}
+
+        return terms
+
+    def _signature(self, terms: Dict[int, float]) -> Tuple[int, ...]:
+        indices = np.fromiter(terms.keys(), dtype=np.int64, count=len(terms))
+        weights = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+
+        projected = weights @ self._planes[indices]
+        bits = (projected > 0).reshape(self.bands, self.rows)
+        return tuple((bits @ self._weights).tolist())
+
+    def lookup(self, prompt: str, partition: Hashable) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Best cached (payload, similarity) at or above the threshold, or None."""
+        terms = self.embed(prompt)
+        if not terms:
+            return None
+
+        signature = self._signature(terms)
+        now = time.monotonic()
+
+        with self._lock:
+            tables = self._tables.get(partition)
+            if tables is None:
+                return None
+
+            # Multi-probe: the exact band signature plus every one-bit flip
+            candidates: Set[int] = set()
+            for table, code in zip(tables, signature):
+                ids = table.get(code)
+                if ids:
+                    candidates.update(ids)
+                for flip in self._flips:
+                    ids = table.get(code ^ flip)
+                    if ids:
+                        candidates.update(ids)
+
+            best_id, best_score = None, self.threshold
+            expired: List[int] = []
+
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.expires_at <= now:
+                    expired.append(entry_id)
+                    continue
+
+                score = _dot(terms, entry.terms)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            for entry_id in expired:
+                self._remove(entry_id)
+
+            if best_id is None:
+                return None
+
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id].payload, best_score
+
+    def add(self, prompt: str, partition: Hashable, payload: Dict[str, Any]) -> None:
+        terms = self.embed(prompt)
+        if not terms:
+            return
+
+        entry = _Entry(
+            terms=terms,
+            partition=partition,
+            signature=self._signature(terms),
+            payload=payload,
+            expires_at=time.monotonic() + self.ttl_s,
+        )
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            tables = self._tables.get(partition)
+            if tables is None:
+                tables = self._tables[partition] = [{} for _ in range(self.bands)]
+
+            self._entries[entry_id] = entry
+            for table, code in zip(tables, entry.signature):
+                table.setdefault(code, []).append(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        tables = self._tables[entry.partition]
+
+        for table, code in zip(tables, entry.signature):
+            ids = table[code]
+            ids.remove(entry_id)
+            if not ids:
+                del table[code]
+
+        if not tables[0]:
+            del self._tables[entry.partition]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _dot(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+class SemanticPolicy:
+    """Which requests may read from and write to the semantic cache."""
+
+    def __init__(self, cache: SemanticCache, *, tiers: Set[str], max_risk: str):
+        self.cache = cache
+        self.tiers = tiers
+        self.max_risk = _RISK_ORDER[max_risk]
+
+    def applies(self, model_tier: str, risk_level: Any) -> bool:
+        risk = _RISK_ORDER.get(getattr(risk_level, "value", risk_level), len(_RISK_ORDER))
+        return model_tier in self.tiers and risk <= self.max_risk
+
+    def lookup(self, prompt: str, partition: Hashable) -> Optional[Dict[str, Any]]:
+        match = self.cache.lookup(prompt, partition)
+        SEMANTIC_CACHE_LOOKUPS.labels(result="hit" if match else "miss").inc()
+        return match[0] if match else None
+
+
+def from_env(text_vectorizer: Optional[Any]) -> Optional[SemanticPolicy]:
+    """
+    Build the semantic cache if enabled via environment variables.
+
+    Environment variables:
+        SEMANTIC_CACHE: Enable the similarity cache (default: false)
+        SEMANTIC_CACHE_THRESHOLD: Min cosine similarity to reuse an answer (default: 0.92)
+        SEMANTIC_CACHE_MAX_RISK: Highest risk level allowed to use it (default: low)
+        SEMANTIC_CACHE_TIERS: Comma-separated tiers indexed (default: api,medium)
+        SEMANTIC_CACHE_SIZE: Max indexed responses (default: 100000)
+        SEMANTIC_CACHE_TTL_S: Lifetime of an indexed response in seconds (default: 1800)
+    """
+    if os.environ.get("SEMANTIC_CACHE", "false").lower() not in {"1", "true", "yes"}:
+        return None
+
+    if text_vectorizer is None:
+        print("⚠️ Semantic cache disabled: classifier has no text vectorizer")
+        return None
+
+    cache = SemanticCache(
+        text_vectorizer,
+        max_entries=int(os.environ.get("SEMANTIC_CACHE_SIZE", "100000")),
+        ttl_s=float(os.environ.get("SEMANTIC_CACHE_TTL_S", "1800")),
+        threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    )
+
+    return SemanticPolicy(
+        cache,
+        tiers={t.strip() for t in os.environ.get("SEMANTIC_CACHE_TIERS", "api,medium").split(",") if t.strip()},
+        max_risk=os.environ.get("SEMANTIC_CACHE_MAX_RISK", "low").lower(),
+    )
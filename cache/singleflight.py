@@ -0,0 +1,131 @@
+"""
+Request coalescing (single-flight) for identical cache keys.
+
+Within a process, the first request for a key becomes the leader and runs
+the computation; concurrent requests for the same key await the leader's
+result. Across uvicorn workers, the leader additionally holds a short Redis
+lease, and workers that lose the lease poll the response cache for the
+leader's result instead of calling the backend themselves.
+"""
+
+import asyncio
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cache.redis import acquire_lease, refresh_lease, release_lease, lease_held
+
+
+class SingleFlight:
+    """
+    Deduplicates in-flight computations by key.
+
+    `run` returns the computed value and how it was obtained:
+        "leader": this call ran the computation
+        "local":  joined an in-flight computation in this process
+        "remote": picked up the result another worker stored in the cache
+    """
+
+    def __init__(
+        self,
+        *,
+        lease_ms: int,
+        poll_interval_ms: int,
+    ):
+        self.lease_ms = lease_ms
+        self.poll_interval_ms = poll_interval_ms
+        self._inflight: Dict[str, "asyncio.Task[Tuple[Any, str]]"] = {}
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Tuple[Any, str]:
+        """
+        Run `compute` once per key across concurrent callers.
+
+        Args:
+            key: Coalescing key (the response cache key)
+            compute: Produces the value; expected to also store it in the cache
+            lookup: Reads the value from the cache, or None if absent
+
+        The shared computation runs in its own task, so a cancelled caller
+        does not cancel the work other callers are waiting on.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            value, _ = await asyncio.shield(task)
+            return value, "local"
+
+        task = asyncio.ensure_future(self._lead(key, compute, lookup))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def _lead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Tuple[Any, str]:
+        token = uuid.uuid4().hex
+        acquired = await acquire_lease(key, token, self.lease_ms)
+
+        if acquired is False:
+            value = await self._await_remote(key, lookup)
+            if value is not None:
+                return value, "remote"
+            # Remote leader gave up or failed: compute locally
+            acquired = await acquire_lease(key, token, self.lease_ms)
+
+        if not acquired:
+            return await compute(), "leader"
+
+        heartbeat = asyncio.ensure_future(self._heartbeat(key, token))
+        try:
+            return await compute(), "leader"
+        finally:
+            heartbeat.cancel()
+            await release_lease(key, token)
+
+    async def _await_remote(
+        self,
+        key: str,
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+    ) -> Optional[Any]:
+        """Poll the cache while another worker holds the lease."""
+        while True:
+            value = await lookup()
+            if value is not None:
+                return value
+
+            if not await lease_held(key):
+                # Lease dropped: the leader may have stored just before releasing
+                return await lookup()
+
+            await asyncio.sleep(self.poll_interval_ms / 1000)
+
+    async def _heartbeat(self, key: str, token: str) -> None:
+        """Keep the lease alive for as long as the leader is computing."""
+        while True:
+            await asyncio.sleep(self.lease_ms / 3000)
+            await refresh_lease(key, token, self.lease_ms)
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+
+def from_env() -> SingleFlight:
+    """
+    Build a SingleFlight from environment variables.
+
+    Environment variables:
+        SINGLEFLIGHT_LEASE_MS: Cross-worker lease lifetime in ms (default: 10000)
+        SINGLEFLIGHT_POLL_MS: Follower cache poll interval in ms (default: 100)
+    """
+    return SingleFlight(
+        lease_ms=int(os.environ.get("SINGLEFLIGHT_LEASE_MS", "10000")),
+        poll_interval_ms=int(os.environ.get("SINGLEFLIGHT_POLL_MS", "100")),
+    )
@@ -0,0 +1,93 @@
+"""
+Single-pass prompt analysis shared by feature extraction and routing.
+
+Feature extraction, task detection, generation-weight heuristics and
+output-token estimation all need the same facts about a request: token
+counts for the prompt and each context chunk, the lowercased prompt, and
+which keyword classes appear in it. PromptAnalysis computes them once per
+request so later stages reuse them instead of re-splitting and
+re-lowercasing the same text.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from classifier.keywords import KeywordMatcher
+from classifier.tokens import get_counter
+
+
+# Default keyword classes, matched (as substrings) against the lowercased
+# prompt. Deployments override them in config/keywords.yaml.
+KEYWORD_CLASSES: Dict[str, Tuple[str, ...]] = {
+    # Task detection
+    "classification": ("classify", "label", "tag", "categorize"),
+    "reasoning": ("why", "how", "explain", "reason"),
+    # Generation weight heuristic
+    "heavy_generation": ("step by step", "in detail", "explain", "derive"),
+    "medium_generation": ("summarize", "list", "compare"),
+    # Output-length estimation
+    "detailed_output": ("explain", "step by step", "detailed", "derive", "how"),
+}
+
+
+@dataclass(frozen=True)
+class PromptAnalysis:
+    """
+    Immutable per-request text facts.
+
+    Attributes:
+        prompt_lower: Lowercased prompt
+        prompt_tokens: Whitespace token count of the prompt
+        context_chunk_tokens: Whitespace token count of each context chunk
+        context_tokens: Total whitespace token count of the context
+        keyword_classes: Names of KEYWORD_CLASSES entries found in the prompt
+    """
+    prompt_lower: str
+    prompt_tokens: int
+    context_chunk_tokens: Tuple[int, ...]
+    context_tokens: int
+    keyword_classes: FrozenSet[str]
+
+    @property
+    def total_tokens(self) -> int:
+        """Token count of prompt and context together."""
+        return self.prompt_tokens + self.context_tokens
+
+    def has(self, keyword_class: str) -> bool:
+        return keyword_class in self.keyword_classes
+
+
+def analyze_prompt(
+    prompt: str,
+    context: Optional[List[str]] = None,
+    matcher: Optional[KeywordMatcher] = None,
+    chunk_tokens: Optional[Tuple[int, ...]] = None,
+) -> PromptAnalysis:
+    """
+    Analyze a prompt and its context in one pass.
+
+    Token counts match splitting the space-joined prompt and context, since
+    joining with spaces never merges or splits whitespace-delimited tokens.
+    Context chunk counts are served from the shared token-count cache unless
+    the caller already has them (e.g. from a ContextDigest).
+    Keyword classes are found with the config's compiled KeywordMatcher in a
+    single scan of the lowercased prompt.
+    """
+    if matcher is None:
+        from config import get_config
+        matcher = get_config().keyword_matcher
+
+    counter = get_counter()
+    lower = prompt.lower()
+    if chunk_tokens is None:
+        chunk_tokens = tuple(counter.count_chunk(chunk) for chunk in context or [])
+
+    hits = matcher.match(lower)
+
+    return PromptAnalysis(
+        prompt_lower=lower,
+        prompt_tokens=counter.count(prompt),
+        context_chunk_tokens=chunk_tokens,
+        context_tokens=sum(chunk_tokens),
+        keyword_classes=hits,
+    )
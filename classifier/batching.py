@@ -0,0 +1,97 @@
+"""
+Micro-batching scheduler for classifier inference.
+
+Under concurrency, per-call sklearn/scipy overhead dominates the cost of a
+single-row predict_proba. MicroBatcher gathers predict calls that arrive
+within a short window (or until a size cap is hit) and serves them with one
+batched `Classifier.predict_batch` call.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, List, Optional, Tuple
+
+from classifier.model import ClassifierPrediction
+from classifier.predict import Classifier
+from metrics.prometheus import CLASSIFIER_BATCH_SIZE, CLASSIFIER_QUEUE_WAIT
+
+
+class MicroBatcher:
+    """
+    Async front-end for a Classifier that batches concurrent predictions.
+
+    A batch is flushed when it reaches `max_batch_size` items or when the
+    oldest queued item has waited `max_wait_ms`, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        classifier: Classifier,
+        *,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        self._classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def predict(self, features: Any) -> ClassifierPrediction:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        CLASSIFIER_BATCH_SIZE.observe(len(batch))
+        for _, _, queued_at in batch:
+            CLASSIFIER_QUEUE_WAIT.observe(now - queued_at)
+
+        try:
+            predictions = self._classifier.predict_batch([f for f, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+
+def from_env(classifier: Classifier) -> Optional[MicroBatcher]:
+    """
+    Build a MicroBatcher if enabled via environment variables.
+
+    Environment variables:
+        CLASSIFIER_MICROBATCH: Enable micro-batching (default: false)
+        CLASSIFIER_BATCH_WINDOW_MS: Max time a call waits for a batch (default: 2)
+        CLASSIFIER_MAX_BATCH_SIZE: Flush as soon as this many calls queue (default: 32)
+    """
+    if os.environ.get("CLASSIFIER_MICROBATCH", "false").lower() not in {"1", "true", "yes"}:
+        return None
+
+    return MicroBatcher(
+        classifier,
+        max_batch_size=int(os.environ.get("CLASSIFIER_MAX_BATCH_SIZE", "32")),
+        max_wait_ms=float(os.environ.get("CLASSIFIER_BATCH_WINDOW_MS", "2")),
+    )
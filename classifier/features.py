@@ -5,9 +5,12 @@ Defines the feature vector structure used by the routing classifier.
 
 from enum import Enum
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 import re
 
+from classifier.analysis import PromptAnalysis, analyze_prompt
+from classifier.tokens import whitespace_count
+
 
 class TaskType(str, Enum):
     """Valid task types for classification."""
@@ -30,25 +33,36 @@ class FeatureVector(BaseModel):
     context_length: int = Field(ge=0, description="Total context token count")
     risk_flag: bool = Field(description="Whether high-risk indicators are present")
 
+def normalize_text(text: str) -> str:
+    """
+    Canonical text normalization for cache and memo keys.
+    - lowercase
+    - trim
+    - collapse whitespace
+    """
+    return " ".join(text.strip().lower().split())
+
+
 def simple_token_count(text: str) -> int:
     """
     Deterministic token approximation based on whitespace splitting.
+
+    See classifier.tokens for per-tier tokenizer profiles.
     """
-    if not text:
-        return 0
-    return len(text.split())
+    return whitespace_count(text)
 
 
-def detect_task_type(prompt: str) -> TaskType:
+def detect_task_type(prompt: str, analysis: Optional[PromptAnalysis] = None) -> TaskType:
     """
     Detect task type using simple keyword heuristics.
     """
-    lower = prompt.lower()
+    if analysis is None:
+        analysis = analyze_prompt(prompt)
 
-    if any(k in lower for k in ["classify", "label", "tag", "categorize"]):
+    if analysis.has("classification"):
         return TaskType.CLASSIFICATION
 
-    if any(k in lower for k in ["why", "how", "explain", "reason"]):
+    if analysis.has("reasoning"):
         return TaskType.REASONING
 
     return TaskType.GENERATION
@@ -59,15 +73,18 @@ def extract_features(
     prompt: str,
     context: List[str],
     constraints: dict,
+    analysis: Optional[PromptAnalysis] = None,
 ) -> FeatureVector:
     """
     Build a deterministic FeatureVector from request input.
+
+    Pass a precomputed `analysis` to share it with the routing stages.
     """
-    context_text = " ".join(context) if context else ""
-    full_text = f"{prompt} {context_text}".strip()
+    if analysis is None:
+        analysis = analyze_prompt(prompt, context)
 
-    token_count = simple_token_count(full_text)
-    context_tokens = simple_token_count(context_text)
+    token_count = analysis.total_tokens
+    context_tokens = analysis.context_tokens
 
     constraint_density = min(len(constraints.keys()) / max(len(prompt), 1), 1.0)
 
@@ -76,7 +93,7 @@ def extract_features(
     return FeatureVector(
         token_count=token_count,
         prompt_length=len(prompt),
-        task=detect_task_type(prompt),
+        task=detect_task_type(prompt, analysis),
         constraint_density=constraint_density,
         context_length=context_tokens,
         risk_flag=risk_flag,
@@ -86,21 +103,22 @@ def estimate_output_tokens(
     prompt: str,
     context: list[str],
     predicted_task: TaskType,
+    analysis: Optional[PromptAnalysis] = None,
 ) -> int:
     """
     Rough output token estimator.
     Conservative on purpose.
     """
+    if analysis is None:
+        analysis = analyze_prompt(prompt, context)
 
     base = 50  # minimum answer size
 
     # Prompt length heuristic
-    prompt_tokens = len(prompt.split())
-    base += prompt_tokens * 1.2
+    base += analysis.prompt_tokens * 1.2
 
     # Context influence
-    context_tokens = sum(len(c.split()) for c in context)
-    base += context_tokens * 0.5
+    base += analysis.context_tokens * 0.5
 
     # Task-based scaling
     if predicted_task == TaskType.CLASSIFICATION:
@@ -110,8 +128,7 @@ def estimate_output_tokens(
         return int(base * 2)
 
     if predicted_task == TaskType.GENERATION:
-        keywords = ["explain", "step by step", "detailed", "derive", "how"]
-        if any(k in prompt.lower() for k in keywords):
+        if analysis.has("detailed_output"):
             return int(base * 4)
         return int(base * 2)
 
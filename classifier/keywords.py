@@ -0,0 +1,96 @@
+"""
+Multi-pattern keyword matcher (Aho-Corasick).
+
+Compiles a table of keyword classes into one automaton, then reports every
+class with at least one keyword occurring (as a substring) in a text in a
+single left-to-right pass, independent of how many keywords the table has.
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Mapping
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a {class_name: keywords} table.
+
+    Matching is case-sensitive; callers pass already-lowercased text and
+    lowercase keywords.
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]]):
+        self.classes: List[str] = list(table)
+        self._all = (1 << len(self.classes)) - 1
+
+        # Trie: per-state transitions, failure links and output class masks
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+
+        for index, name in enumerate(self.classes):
+            for keyword in table[name]:
+                if keyword:
+                    self._insert(keyword, 1 << index)
+
+        self._alphabet = frozenset(ch for edges in self._goto for ch in edges)
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, bit: int) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+            state = nxt
+        self._out[state] |= bit
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # A state also matches everything its suffix state matches
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def match_mask(self, text: str) -> int:
+        """Bitmask of classes (by table order) with a keyword in `text`."""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        full = self._all
+        state = 0
+        found = 0
+
+        for ch in text:
+            if ch not in alphabet:
+                state = 0
+                continue
+
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            if out[state]:
+                found |= out[state]
+                if found == full:
+                    break
+
+        return found
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Names of the classes with at least one keyword in `text`."""
+        mask = self.match_mask(text)
+        return frozenset(
+            name for index, name in enumerate(self.classes) if mask >> index & 1
+        )
@@ -3,7 +3,7 @@ Classifier model interface definition.
 Defines the protocol for classifier implementations without concrete logic.
 """
 
-from typing import Protocol
+from typing import List, Protocol
 from classifier.features import FeatureVector, TaskType
 
 
@@ -51,4 +51,16 @@ class ClassifierProtocol(Protocol):
         Returns:
             ClassifierPrediction with task and confidence
         """
+        ...
+
+    def predict_batch(self, features: List[FeatureVector]) -> List[ClassifierPrediction]:
+        """
+        Predict task type and confidence for many feature vectors at once.
+        
+        Args:
+            features: Extracted feature vectors
+            
+        Returns:
+            One ClassifierPrediction per input, in input order
+        """
         ...
\ No newline at end of file
@@ -3,6 +3,9 @@ Classifier prediction wrapper.
 Provides a unified interface for obtaining predictions from classifier implementations.
 """
 
+from typing import Any, Hashable, List, Optional
+
+from classifier.features import FeatureVector
 from classifier.model import ClassifierProtocol, ClassifierPrediction
 from classifier.vectorizer import FeatureVectorizer
 
@@ -33,4 +36,39 @@ class Classifier:
         Returns:
             ClassifierPrediction containing predicted_task and confidence
         """
-        return self._model.predict(features)
\ No newline at end of file
+        return self._model.predict(features)
+    
+    def predict_batch(self, features: List[FeatureVector]) -> List[ClassifierPrediction]:
+        """
+        Get predictions for a batch of feature vectors in one model call.
+        
+        Falls back to per-item prediction for models without batch support.
+        
+        Args:
+            features: Extracted feature vectors
+            
+        Returns:
+            One ClassifierPrediction per input, in input order
+        """
+        if hasattr(self._model, "predict_batch"):
+            return self._model.predict_batch(features)
+        return [self._model.predict(f) for f in features]
+    
+    def model_version(self) -> Hashable:
+        """
+        Identify the loaded model, for caches derived from its predictions.
+        
+        Returns:
+            A value that changes when the model instance or its artifact changes
+        """
+        return (id(self._model), getattr(self._model, "artifact_mtime", None))
+    
+    def text_vectorizer(self) -> Optional[Any]:
+        """
+        The fitted prompt text vectorizer of the underlying model, if any.
+        
+        Returns:
+            The model's TF-IDF text vectorizer, or None for models without one
+        """
+        vectorizer = getattr(self._model, "vectorizer", None)
+        return getattr(vectorizer, "text_vectorizer", None)
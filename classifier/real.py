@@ -1,9 +1,10 @@
 import joblib
 import numpy as np
 from pathlib import Path
+from typing import List
 
 from classifier.model import ClassifierProtocol, ClassifierPrediction
-from classifier.features import TaskType
+from classifier.features import FeatureVector, TaskType
 from classifier.vectorizer import FeatureVectorizer
 
 MODEL_PATH = Path(r"D:\Programming\portfolio_projects\llm_router\classifier\model.pkl")
@@ -12,6 +13,7 @@ MODEL_PATH = Path(r"D:\Programming\portfolio_projects\llm_router\classifier\mode
 class RealClassifier(ClassifierProtocol):
     def __init__(self):
         bundle = joblib.load(MODEL_PATH)
+        self.artifact_mtime = MODEL_PATH.stat().st_mtime
         self.model = bundle["model"]
         self.vectorizer = bundle["vectorizer"]
 
@@ -33,3 +35,23 @@ class RealClassifier(ClassifierProtocol):
             predicted_task=TaskType(label),
             confidence=confidence,
         )
+
+    def predict_batch(self, features: List[FeatureVector]) -> List[ClassifierPrediction]:
+        # One vectorizer transform and one predict_proba for the whole batch
+        X = self.vectorizer.transform(
+            [f.prompt for f in features],
+            [[f.context_length, f.token_count] for f in features],
+        )
+
+        probs = self.model.predict_proba(X)
+        classes = self.model.classes_
+
+        idx = np.argmax(probs, axis=1)
+
+        return [
+            ClassifierPrediction(
+                predicted_task=TaskType(classes[i]),
+                confidence=float(row[i]),
+            )
+            for row, i in zip(probs, idx)
+        ]
@@ -1,3 +1,5 @@
+from typing import List
+
 from classifier.model import ClassifierProtocol, ClassifierPrediction
 from classifier.features import FeatureVector, TaskType
 
@@ -15,3 +17,6 @@ class StubClassifier(ClassifierProtocol):
             predicted_task=TaskType.GENERATION,
             confidence=0.9,
         )
+
+    def predict_batch(self, features: List[FeatureVector]) -> List[ClassifierPrediction]:
+        return [self.predict(f) for f in features]
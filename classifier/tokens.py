@@ -0,0 +1,143 @@
+"""
+Token counting for routing and context-window checks.
+
+Ollama (llama-family SentencePiece) and Groq models tokenize differently,
+and both produce more tokens than whitespace splitting suggests. Each model
+tier can therefore pick a tokenizer profile in models.yaml:
+
+- "whitespace": exact whitespace token count (the classifier's training
+  feature, and the default for tiers without a profile)
+- "sentencepiece" / "tiktoken": BPE approximations calibrated to average
+  characters per token for those tokenizer families
+
+Both counts are computed with C-level scans (`re.finditer` and
+`str.count`) that never copy the text or materialize the list of substrings
+that `str.split` builds. Counts of context chunks go through a per-profile
+LRU cache because the same documents are resent with many prompts.
+"""
+
+import math
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+_WORD = re.compile(r"\S+")
+
+# Separators and punctuation counted separately by the BPE approximation.
+# Punctuation almost always becomes its own token.
+_WHITESPACE = (" ", "\n", "\t", "\r")
+_WHITESPACE_RUN = re.compile(r"[ \n\t\r]+")
+_PUNCTUATION = tuple(".,;:!?'\"()[]{}<>-/\\*=_#")
+
+WHITESPACE = "whitespace"
+
+
+@dataclass(frozen=True)
+class TokenizerProfile:
+    """
+    Token-count approximation for one tokenizer family.
+
+    Attributes:
+        name: Profile name referenced from models.yaml
+        chars_per_token: Average non-space, non-punctuation characters per
+            token; None means exact whitespace splitting
+    """
+    name: str
+    chars_per_token: Optional[float] = None
+
+
+PROFILES: Dict[str, TokenizerProfile] = {
+    WHITESPACE: TokenizerProfile(WHITESPACE),
+    # SentencePiece BPE with a 32k vocabulary (Llama 2, Mistral) on Ollama
+    "sentencepiece": TokenizerProfile("sentencepiece", chars_per_token=3.5),
+    # tiktoken-style BPE with a 100k+ vocabulary (GPT-4, Llama 3 on Groq)
+    "tiktoken": TokenizerProfile("tiktoken", chars_per_token=4.0),
+}
+
+
+def whitespace_count(text: str) -> int:
+    """Exact whitespace token count (the historical `simple_token_count`)."""
+    if not text:
+        return 0
+    return sum(1 for _ in _WORD.finditer(text))
+
+
+def approximate_bpe_count(text: str, chars_per_token: float) -> int:
+    """
+    Approximate BPE token count without allocating substrings.
+
+    Word pieces are estimated from the remaining characters divided by
+    `chars_per_token`, never fewer than one per whitespace-separated word;
+    each punctuation character adds one token. The result is never below
+    the whitespace token count, so switching a tier to a BPE profile can
+    only make context-window checks more conservative.
+    """
+    if not text:
+        return 0
+
+    # Indentation and blank lines are one separator per run, not per character
+    separator_runs = sum(1 for _ in _WHITESPACE_RUN.finditer(text))
+
+    separators = 0
+    for ch in _WHITESPACE:
+        separators += text.count(ch)
+
+    punctuation = 0
+    for ch in _PUNCTUATION:
+        punctuation += text.count(ch)
+
+    body = len(text) - separators - punctuation
+    if body <= 0:
+        return punctuation
+
+    # separator_runs + 1 bounds the number of whitespace-separated words
+    return max(separator_runs + 1, math.ceil(body / chars_per_token)) + punctuation
+
+
+class TokenCounter:
+    """Token counter for one profile, with an LRU cache for context chunks."""
+
+    def __init__(self, profile: TokenizerProfile, cache_size: int):
+        self.profile = profile
+
+        if profile.chars_per_token is None:
+            self.count: Callable[[str], int] = whitespace_count
+        else:
+            chars_per_token = profile.chars_per_token
+            self.count = lambda text: approximate_bpe_count(text, chars_per_token)
+
+        self.count_chunk: Callable[[str], int] = (
+            lru_cache(maxsize=cache_size)(self.count) if cache_size > 0 else self.count
+        )
+
+    def count_context(self, context: Optional[list[str]]) -> int:
+        return sum(self.count_chunk(chunk) for chunk in context or [])
+
+    def cache_info(self) -> Optional[tuple]:
+        info = getattr(self.count_chunk, "cache_info", None)
+        return info() if info is not None else None
+
+
+_counters: Dict[str, TokenCounter] = {}
+
+
+def get_counter(profile: str = WHITESPACE) -> TokenCounter:
+    """
+    Shared counter for a profile name.
+
+    Environment variables:
+        TOKEN_COUNT_CACHE_SIZE: Cached context-chunk counts per profile
+            (default: 1024, 0 disables)
+    """
+    counter = _counters.get(profile)
+    if counter is None:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown tokenizer profile: {profile}. Must be one of {set(PROFILES)}")
+        counter = TokenCounter(
+            PROFILES[profile],
+            cache_size=int(os.environ.get("TOKEN_COUNT_CACHE_SIZE", "1024")),
+        )
+        _counters[profile] = counter
+    return counter
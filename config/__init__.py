@@ -8,12 +8,35 @@ from pathlib import Path
 from typing import Any
 from pydantic import BaseModel, Field, field_validator
 
+from routing.rules import CompiledRules
+from classifier.keywords import KeywordMatcher
+from classifier.tokens import PROFILES, WHITESPACE
+
 
 class ModelConfig(BaseModel):
     """Configuration for a single model tier."""
     model_name: str
     max_context_tokens: int = Field(gt=0)
     cost_per_token: float = Field(ge=0.0)
+    tokenizer: str = WHITESPACE
+    endpoints: list[str] = Field(default_factory=list)
+
+    @field_validator('tokenizer')
+    @classmethod
+    def validate_tokenizer(cls, v: str) -> str:
+        """Ensure the tokenizer profile is known."""
+        if v not in PROFILES:
+            raise ValueError(f"Invalid tokenizer value: {v}. Must be one of {set(PROFILES)}")
+        return v
+
+    @field_validator('endpoints')
+    @classmethod
+    def validate_endpoints(cls, v: list[str]) -> list[str]:
+        """Ensure replica endpoints are absolute http(s) URLs."""
+        for url in v:
+            if not url.startswith(("http://", "https://")):
+                raise ValueError(f"Invalid endpoint: {url}. Must be an http(s) URL")
+        return v
 
 
 class ModelsConfig(BaseModel):
@@ -60,6 +83,24 @@ class RoutingConfig(BaseModel):
     rules: list[RoutingRule]
 
 
+class KeywordsConfig(BaseModel):
+    """Keyword classes for task detection and routing heuristics."""
+    classes: dict[str, list[str]]
+
+    @field_validator('classes')
+    @classmethod
+    def validate_required_classes(cls, v: dict[str, list[str]]) -> dict[str, list[str]]:
+        """Ensure every class referenced by the routing code is present, lowercased."""
+        required = {
+            'classification', 'reasoning',
+            'heavy_generation', 'medium_generation', 'detailed_output',
+        }
+        missing = required - v.keys()
+        if missing:
+            raise ValueError(f"Missing required keyword classes: {missing}")
+        return {name: [k.lower() for k in keywords] for name, keywords in v.items()}
+
+
 class Config:
     """Global configuration holder."""
     
@@ -77,6 +118,11 @@ class Config:
         self.config_dir = Path(config_dir)
         self.models = self._load_models()
         self.routing = self._load_routing()
+        self.keywords = self._load_keywords()
+        # Static rules and keyword tables are compiled once here instead of
+        # being walked per request
+        self.rule_engine = CompiledRules(self.routing.rules)
+        self.keyword_matcher = KeywordMatcher(self.keywords.classes)
     
     def _load_yaml(self, filename: str) -> dict:
         """Load and parse a YAML file."""
@@ -101,11 +147,23 @@ class Config:
         """Load and validate routing.yaml."""
         data = self._load_yaml("routing.yaml")
         return RoutingConfig(**data)
+    
+    def _load_keywords(self) -> KeywordsConfig:
+        """Load and validate keywords.yaml, falling back to the built-in table."""
+        if not (self.config_dir / "keywords.yaml").exists():
+            from classifier.analysis import KEYWORD_CLASSES
+            return KeywordsConfig(classes={k: list(v) for k, v in KEYWORD_CLASSES.items()})
+        data = self._load_yaml("keywords.yaml")
+        return KeywordsConfig(**data)
 
 
 # Singleton instance
 _config: Config | None = None
 
+# Bumped whenever a configuration is (re)loaded, so caches derived from
+# the config can tell when they are stale
+_generation: int = 0
+
 
 def load_config(config_dir: Path | str = "config") -> Config:
     """
@@ -117,12 +175,38 @@ def load_config(config_dir: Path | str = "config") -> Config:
     Returns:
         Loaded and validated Config instance
     """
-    global _config
+    global _config, _generation
     if _config is None:
         _config = Config(config_dir)
+        _generation += 1
     return _config
 
 
+def reload_config(config_dir: Path | str = "config") -> Config:
+    """
+    Force a fresh load of the configuration files.
+    
+    Args:
+        config_dir: Path to configuration directory
+        
+    Returns:
+        Newly loaded Config instance
+    """
+    global _config
+    _config = None
+    return load_config(config_dir)
+
+
+def config_generation() -> int:
+    """
+    Get a counter that changes every time configuration is loaded.
+    
+    Returns:
+        Current configuration generation
+    """
+    return _generation
+
+
 def get_config() -> Config:
     """
     Get the current configuration instance.
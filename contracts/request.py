@@ -27,4 +27,10 @@ class GenerateRequest(BaseModel):
     prompt: str = Field(..., min_length=1)
     context: list[str] = Field(default_factory=list)
     constraints: Constraints = Field(default_factory=Constraints)
-    debug: bool = False
\ No newline at end of file
+    tenant: Optional[str] = Field(default=None, max_length=128)
+    debug: bool = False
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request payload for the /generate/batch endpoint."""
+    requests: list[GenerateRequest] = Field(..., min_length=1, max_length=1000)
@@ -28,4 +28,20 @@ class GenerateResponse(BaseModel):
     tokens_used: TokenUsage = Field(default_factory=TokenUsage)
     estimated_cost_usd: float = Field(default=0.0, ge=0.0)
     cache_hit: bool = Field(default=False)
-    debug: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    debug: Optional[Dict[str, Any]] = None
+
+
+class StreamSummary(BaseModel):
+    """Final frame of a /generate/stream response, sent after the last token."""
+    model_used: Optional[ModelTier]
+    tokens_used: TokenUsage = Field(default_factory=TokenUsage)
+    estimated_cost_usd: float = Field(default=0.0, ge=0.0)
+    cache_hit: bool = Field(default=False)
+    debug: Optional[Dict[str, Any]] = None
+
+
+class BatchItemResult(BaseModel):
+    """One NDJSON line of a /generate/batch response."""
+    index: int = Field(ge=0)
+    result: Optional[GenerateResponse] = None
+    error: Optional[str] = None
@@ -8,6 +8,7 @@ export interface GenerateRequest {
     max_cost_usd: number;
     risk_level: 'low' | 'medium' | 'high';
   };
+  tenant?: string;
   debug: boolean;
 }
 
@@ -0,0 +1,319 @@
+"""
+Per-tier admission control with adaptive concurrency limits.
+
+Each controlled tier admits at most `limit` concurrent backend calls; further
+calls wait in a bounded queue, ordered by the scheduler (weighted fair
+queuing across request classes by default), and are shed with `Overloaded`
+once the queue is full or their wait times out. The API turns that into a 429 with
+Retry-After, or reroutes the request to the next tier when configured to.
+
+Limits adapt with AIMD on observed latency. Every completed call whose
+latency stays within `tolerance` x the tier's long-run latency baseline
+(while the tier is at least half utilized) raises the limit by 1/limit,
+roughly +1 per round trip. A slower call or a failure multiplies it by
+`backoff`. The limit follows what the backend can serve before queueing
+inside it starts to inflate every request's latency.
+"""
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+
+from metrics.prometheus import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_SHED,
+)
+from inference import scheduler
+from inference.breaker import CircuitOpen
+from inference.scheduler import FairQueue, FifoQueue, current_class
+from routing.decision import TIER_ORDER
+from routing.latency import LatencyTracker
+
+
+class Overloaded(RuntimeError):
+    """A tier shed a request; retry after `retry_after_s` seconds."""
+
+    def __init__(self, model_tier: str, reason: str, retry_after_s: int):
+        super().__init__(f"{model_tier} tier overloaded ({reason})")
+        self.model_tier = model_tier
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AIMDLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float,
+        tolerance: float,
+        baseline_alpha: float = 0.02,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.baseline_alpha = baseline_alpha
+
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.baseline: Optional[float] = None
+
+    @property
+    def value(self) -> int:
+        return int(self.limit)
+
+    def update(self, latency_s: float, failed: bool, in_flight: int) -> None:
+        if failed:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+
+        if self.baseline is None:
+            self.baseline = latency_s
+
+        if latency_s > self.tolerance * self.baseline:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif in_flight + 1 >= self.limit / 2:
+            # Only grow while the current limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self.baseline += self.baseline_alpha * (latency_s - self.baseline)
+
+
+class AdmissionController:
+    """Concurrency limit plus bounded wait queue for one tier."""
+
+    def __init__(
+        self,
+        model_tier: str,
+        limit: AIMDLimit,
+        *,
+        max_queue: int,
+        queue_timeout_s: float,
+        tracker: LatencyTracker,
+        queue: Optional[Union[FifoQueue, FairQueue]] = None,
+    ):
+        self.model_tier = model_tier
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.tracker = tracker
+
+        self.in_flight = 0
+        self._waiters = queue if queue is not None else FifoQueue()
+        self._publish()
+
+    def saturated(self) -> bool:
+        """True if a new request would be shed right now."""
+        return self.in_flight >= self.limit.value and len(self._waiters) >= self.max_queue
+
+    def retry_after_s(self) -> int:
+        # One predicted call duration frees a slot; default to a second
+        predicted = self.tracker.predicted_ms(self.model_tier)
+        return max(1, math.ceil(predicted / 1000)) if predicted is not None else 1
+
+    def shed(self, reason: str) -> Overloaded:
+        ADMISSION_SHED.labels(model_tier=self.model_tier, reason=reason).inc()
+        return Overloaded(self.model_tier, reason, self.retry_after_s())
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit.value and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self.shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.push(waiter, current_class.get())
+        self._publish()
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout_s)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we gave up: pass it on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            self._publish()
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise self.shed("queue_timeout")
+            raise
+
+    def release(self, latency_s: Optional[float], failed: bool) -> None:
+        """Free a slot; `latency_s` of None skips adapting the limit."""
+        self.in_flight -= 1
+        if latency_s is not None:
+            self.limit.update(latency_s, failed, self.in_flight)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit.value:
+            waiter = self._waiters.pop()
+            if waiter.done():
+                continue
+            waiter.set_result(None)
+            self.in_flight += 1
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self, adapt: bool = True) -> AsyncIterator[None]:
+        """
+        Hold one admission slot for the duration of the block.
+
+        With `adapt`, the block's latency and outcome drive the limit.
+        Cancelled blocks (e.g. lost hedges) and calls rejected by an open
+        circuit breaker never do; they did not reach the backend.
+        """
+        await self.acquire()
+
+        started = time.monotonic()
+        latency_s: Optional[float] = None
+        failed = False
+
+        try:
+            yield
+            latency_s = time.monotonic() - started
+        except (asyncio.CancelledError, CircuitOpen):
+            raise
+        except Exception:
+            latency_s = time.monotonic() - started
+            failed = True
+            raise
+        finally:
+            self.release(latency_s if adapt else None, failed)
+
+    def _publish(self) -> None:
+        ADMISSION_IN_FLIGHT.labels(model_tier=self.model_tier).set(self.in_flight)
+        ADMISSION_QUEUE_DEPTH.labels(model_tier=self.model_tier).set(len(self._waiters))
+        ADMISSION_LIMIT.labels(model_tier=self.model_tier).set(self.limit.value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit.value,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+        }
+
+
+class Admission:
+    """Admission controllers for the controlled tiers."""
+
+    def __init__(
+        self,
+        controllers: Dict[str, AdmissionController],
+        reroute: bool,
+        request_scheduler: Optional[scheduler.Scheduler] = None,
+    ):
+        self.controllers = controllers
+        self.reroute = reroute
+        self.scheduler = request_scheduler or scheduler.from_env()
+
+    def saturated(self, model_tier: str) -> bool:
+        controller = self.controllers.get(model_tier)
+        return controller is not None and controller.saturated()
+
+    def overloaded(self, model_tier: str) -> Overloaded:
+        return self.controllers[model_tier].shed("queue_full")
+
+    def overflow_tier(self, model_tier: str) -> Optional[str]:
+        """Next larger tier to reroute shed requests to, if rerouting is on."""
+        if not self.reroute or model_tier not in TIER_ORDER:
+            return None
+        index = TIER_ORDER.index(model_tier)
+        return TIER_ORDER[index + 1] if index + 1 < len(TIER_ORDER) else None
+
+    def wrap_executors(self, executors: Dict[str, Callable]) -> Dict[str, Callable]:
+        wrapped = dict(executors)
+
+        for tier, controller in self.controllers.items():
+            def make(controller: AdmissionController, executor: Callable) -> Callable:
+                async def execute(prompt, context):
+                    async with controller.slot():
+                        return await executor(prompt, context)
+                return execute
+
+            wrapped[tier] = make(controller, executors[tier])
+
+        return wrapped
+
+    def wrap_streamers(self, streamers: Dict[str, Callable]) -> Dict[str, Callable]:
+        wrapped = dict(streamers)
+
+        for tier, controller in self.controllers.items():
+            def make(controller: AdmissionController, streamer: Callable) -> Callable:
+                async def stream(prompt, context):
+                    # Stream durations depend on answer length; they hold a
+                    # slot but do not drive the limit
+                    async with controller.slot(adapt=False):
+                        async for item in streamer(prompt, context):
+                            yield item
+                return stream
+
+            wrapped[tier] = make(controller, streamers[tier])
+
+        return wrapped
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {tier: c.stats() for tier, c in self.controllers.items()}
+
+
+def from_env(tracker: LatencyTracker) -> Optional[Admission]:
+    """
+    Build per-tier admission control if enabled via environment variables.
+
+    Environment variables:
+        ADMISSION_CONTROL: Enable admission control (default: false)
+        ADMISSION_TIERS: Comma-separated tiers to control (default: small,medium)
+        ADMISSION_INITIAL_LIMIT: Starting concurrency limit per tier (default: 8)
+        ADMISSION_MIN_LIMIT: Lowest concurrency limit (default: 1)
+        ADMISSION_MAX_LIMIT: Highest concurrency limit (default: 64)
+        ADMISSION_BACKOFF: Limit multiplier on slow or failed calls (default: 0.9)
+        ADMISSION_LATENCY_TOLERANCE: Latency over this multiple of the
+            baseline counts as congestion (default: 2.0)
+        ADMISSION_QUEUE_SIZE: Max requests waiting per tier (default: 32)
+        ADMISSION_QUEUE_TIMEOUT_S: Max wait for a slot in seconds (default: 30)
+        SCHEDULER_*: Order of waiting calls, see inference.scheduler.from_env
+        ADMISSION_OVERFLOW: "reject" with 429 (default) or "reroute" to the
+            next tier
+    """
+    if os.environ.get("ADMISSION_CONTROL", "false").lower() not in {"1", "true", "yes"}:
+        return None
+
+    request_scheduler = scheduler.from_env()
+    tiers = [t.strip() for t in os.environ.get("ADMISSION_TIERS", "small,medium").split(",") if t.strip()]
+
+    controllers = {
+        tier: AdmissionController(
+            tier,
+            AIMDLimit(
+                initial=int(os.environ.get("ADMISSION_INITIAL_LIMIT", "8")),
+                min_limit=int(os.environ.get("ADMISSION_MIN_LIMIT", "1")),
+                max_limit=int(os.environ.get("ADMISSION_MAX_LIMIT", "64")),
+                backoff=float(os.environ.get("ADMISSION_BACKOFF", "0.9")),
+                tolerance=float(os.environ.get("ADMISSION_LATENCY_TOLERANCE", "2.0")),
+            ),
+            max_queue=int(os.environ.get("ADMISSION_QUEUE_SIZE", "32")),
+            queue_timeout_s=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_S", "30")),
+            tracker=tracker,
+            queue=request_scheduler.new_queue(),
+        )
+        for tier in tiers
+    }
+
+    overflow = os.environ.get("ADMISSION_OVERFLOW", "reject").lower()
+    if overflow not in {"reject", "reroute"}:
+        raise ValueError(f"Unknown ADMISSION_OVERFLOW: {overflow}. Must be 'reject' or 'reroute'")
+
+    return Admission(controllers, reroute=overflow == "reroute", request_scheduler=request_scheduler)
@@ -1,29 +1,92 @@
 import os
-from typing import List, Tuple
+import importlib.util
+from typing import AsyncIterator, List, Optional, Tuple, Union
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+from inference.pricing import actual_cost
+from inference.streaming import StreamUsage
+
 load_dotenv("D:\Programming\portfolio_projects\llm_router\.env")
 
+_client: Optional[AsyncGroq] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is used when requested and the optional `h2` package is installed."""
+    if os.environ.get("GROQ_HTTP2", "true").lower() in {"0", "false", "no"}:
+        return False
+    return importlib.util.find_spec("h2") is not None
 
-def execute_api(prompt: str, context: List[str]) -> Tuple[str, int, int, float]:
-    api_key = os.environ.get("GROQ_API_KEY")
-    model = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
 
+def get_client() -> AsyncGroq:
+    """
+    Get the process-wide Groq client, creating it on first use.
+
+    Environment variables:
+        GROQ_API_KEY: Groq API key (required)
+        GROQ_MAX_CONNECTIONS: Max pooled connections (default: 20)
+        GROQ_KEEPALIVE_EXPIRY: Idle keep-alive lifetime in seconds (default: 60)
+        GROQ_HTTP2: Use HTTP/2 when `h2` is installed (default: true)
+
+    Raises:
+        RuntimeError: If GROQ_API_KEY is not set
+    """
+    global _client
+
+    if _client is not None:
+        return _client
+
+    api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         raise RuntimeError("GROQ_API_KEY not set")
 
-    client = Groq(api_key=api_key)
+    max_connections = int(os.environ.get("GROQ_MAX_CONNECTIONS", "20"))
 
+    http_client = DefaultAsyncHttpxClient(
+        http2=_http2_enabled(),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=float(os.environ.get("GROQ_KEEPALIVE_EXPIRY", "60")),
+        ),
+    )
+
+    _client = AsyncGroq(api_key=api_key, http_client=http_client)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+
+    if _client is None:
+        return
+
+    try:
+        await _client.close()
+    except Exception:
+        pass
+    _client = None
+
+
+def _messages(prompt: str, context: List[str]) -> List[dict]:
     messages = [{"role": "user", "content": prompt}]
     for ctx in context:
         messages.append({"role": "system", "content": ctx})
+    return messages
+
+
+async def execute_api(prompt: str, context: List[str]) -> Tuple[str, int, int, float]:
+    model = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+    client = get_client()
 
     try:
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model=model,
-            messages=messages,
+            messages=_messages(prompt, context),
             stream=False,
         )
     except Exception as e:
@@ -36,7 +99,49 @@ def execute_api(prompt: str, context: List[str]) -> Tuple[str, int, int, float]:
     input_tokens = usage.prompt_tokens if usage else 0
     output_tokens = usage.completion_tokens if usage else 0
 
-    # Rough cost estimate (acceptable per spec)
-    estimated_cost = (input_tokens + output_tokens) * 0.0000005
+    return response_text, input_tokens, output_tokens, actual_cost("api", input_tokens, output_tokens)
+
+
+async def stream_api(
+    prompt: str, context: List[str]
+) -> AsyncIterator[Union[str, StreamUsage]]:
+    """
+    Stream a Groq completion as text deltas followed by a final StreamUsage.
+
+    Groq reports usage on the last chunk under `x_groq.usage`.
+    """
+    model = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+    client = get_client()
+
+    try:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=_messages(prompt, context),
+            stream=True,
+        )
+    except Exception as e:
+        raise RuntimeError(f"Groq API streaming failed: {e}")
+
+    usage = None
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+            chunk_usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+            if chunk_usage is not None:
+                usage = chunk_usage
+    except Exception as e:
+        raise RuntimeError(f"Groq API streaming failed: {e}")
+    finally:
+        await stream.close()
+
+    input_tokens = usage.prompt_tokens if usage else 0
+    output_tokens = usage.completion_tokens if usage else 0
 
-    return response_text, input_tokens, output_tokens, estimated_cost
+    yield StreamUsage(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost=actual_cost("api", input_tokens, output_tokens),
+    )
@@ -0,0 +1,256 @@
+"""
+Per-backend circuit breakers.
+
+A backend that is down makes every request wait for a connection error or a
+multi-minute read timeout. Each tier's backend gets a breaker that watches
+its recent calls:
+
+- closed: calls flow; the breaker opens once at least `min_calls` of the
+  last `window` calls were seen and the share of failures (errors,
+  timeouts, and non-streaming calls slower than `slow_call_s`) reaches
+  `failure_rate`
+- open: calls fail immediately with CircuitOpen and routing fails over to
+  the next healthy tier. Backends with a health probe are probed in the
+  background every `open_s` seconds; the others simply wait out `open_s`
+- half-open: after a successful probe (or the wait) one trial call is let
+  through; success closes the breaker, failure opens it again
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from metrics.prometheus import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+class CircuitOpen(RuntimeError):
+    """A backend's breaker is open; retry after `retry_after_s` seconds."""
+
+    def __init__(self, model_tier: str, retry_after_s: int):
+        super().__init__(f"{model_tier} backend unavailable (circuit open)")
+        self.model_tier = model_tier
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one backend."""
+
+    def __init__(
+        self,
+        model_tier: str,
+        *,
+        window: int,
+        min_calls: int,
+        failure_rate: float,
+        open_s: float,
+        slow_call_s: float,
+        probe: Optional[Probe] = None,
+    ):
+        self.model_tier = model_tier
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_s = open_s
+        self.slow_call_s = slow_call_s
+        self.probe = probe
+
+        self.state = CLOSED
+        self.reason: Optional[str] = None
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._retry_at = 0.0
+        self._trial_in_flight = False
+        self._probe_task: Optional[asyncio.Future] = None
+        self._publish()
+
+    def available(self) -> bool:
+        """True if a call would be let through right now."""
+        if self.state == OPEN and self.probe is None and time.monotonic() >= self._retry_at:
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            return not self._trial_in_flight
+        return self.state == CLOSED
+
+    def retry_after_s(self) -> int:
+        return max(1, math.ceil(self._retry_at - time.monotonic()))
+
+    def before_call(self) -> None:
+        if not self.available():
+            raise CircuitOpen(self.model_tier, self.retry_after_s())
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record(self, ok: bool, reason: str = "error") -> None:
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            if ok:
+                self._outcomes.clear()
+                self._transition(CLOSED)
+            else:
+                self._open(f"trial_{reason}")
+            return
+
+        if self.state == OPEN:
+            return
+
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+            self._open(reason)
+
+    def abandon(self) -> None:
+        """A call was cancelled before it finished; it proves nothing."""
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+
+    def _open(self, reason: str) -> None:
+        self.reason = reason
+        self._retry_at = time.monotonic() + self.open_s
+        self._outcomes.clear()
+        self._transition(OPEN)
+
+        if self.probe is not None and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.ensure_future(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        while self.state == OPEN:
+            await asyncio.sleep(max(self._retry_at - time.monotonic(), 0))
+
+            try:
+                healthy = await self.probe()
+            except Exception:
+                healthy = False
+
+            if healthy:
+                self._transition(HALF_OPEN)
+            else:
+                self._retry_at = time.monotonic() + self.open_s
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        if state == CLOSED:
+            self.reason = None
+        CIRCUIT_BREAKER_TRANSITIONS.labels(model_tier=self.model_tier, state=state).inc()
+        self._publish()
+
+    def _publish(self) -> None:
+        CIRCUIT_BREAKER_STATE.labels(model_tier=self.model_tier).set(_STATE_VALUES[self.state])
+
+    def stats(self) -> dict:
+        return {"state": self.state, "reason": self.reason}
+
+
+class Breakers:
+    """Circuit breakers for every tier's backend."""
+
+    def __init__(self, breakers: Dict[str, CircuitBreaker]):
+        self.breakers = breakers
+
+    def healthy(self, model_tier: str) -> bool:
+        breaker = self.breakers.get(model_tier)
+        return breaker is None or breaker.available()
+
+    def reason(self, model_tier: str) -> Optional[str]:
+        breaker = self.breakers.get(model_tier)
+        return breaker.reason if breaker is not None else None
+
+    def open_circuit(self, model_tier: str) -> CircuitOpen:
+        return CircuitOpen(model_tier, self.breakers[model_tier].retry_after_s())
+
+    def wrap_executors(self, executors: Dict[str, Callable]) -> Dict[str, Callable]:
+        wrapped = dict(executors)
+
+        for tier, breaker in self.breakers.items():
+            def make(breaker: CircuitBreaker, executor: Callable) -> Callable:
+                async def execute(prompt, context):
+                    breaker.before_call()
+                    started = time.monotonic()
+
+                    try:
+                        result = await executor(prompt, context)
+                    except asyncio.CancelledError:
+                        breaker.abandon()
+                        raise
+                    except Exception:
+                        breaker.record(False)
+                        raise
+
+                    slow = time.monotonic() - started > breaker.slow_call_s
+                    breaker.record(not slow, reason="slow_calls")
+                    return result
+                return execute
+
+            wrapped[tier] = make(breaker, executors[tier])
+
+        return wrapped
+
+    def wrap_streamers(self, streamers: Dict[str, Callable]) -> Dict[str, Callable]:
+        wrapped = dict(streamers)
+
+        for tier, breaker in self.breakers.items():
+            def make(breaker: CircuitBreaker, streamer: Callable) -> Callable:
+                async def stream(prompt, context):
+                    # Stream durations depend on answer length; only errors count
+                    breaker.before_call()
+
+                    try:
+                        async for item in streamer(prompt, context):
+                            yield item
+                    except (asyncio.CancelledError, GeneratorExit):
+                        breaker.abandon()
+                        raise
+                    except Exception:
+                        breaker.record(False)
+                        raise
+
+                    breaker.record(True)
+                return stream
+
+            wrapped[tier] = make(breaker, streamers[tier])
+
+        return wrapped
+
+    def stats(self) -> Dict[str, dict]:
+        return {tier: b.stats() for tier, b in self.breakers.items()}
+
+
+def from_env(tiers: Dict[str, Optional[Probe]]) -> Optional[Breakers]:
+    """
+    Build a breaker per tier ({tier: health probe or None}).
+
+    Environment variables:
+        CIRCUIT_BREAKER: Enable circuit breakers (default: true)
+        CIRCUIT_WINDOW: Recent calls considered per backend (default: 20)
+        CIRCUIT_MIN_CALLS: Calls needed before the breaker can open (default: 5)
+        CIRCUIT_FAILURE_RATE: Failure share that opens the breaker (default: 0.5)
+        CIRCUIT_OPEN_S: Seconds between health probes while open (default: 15)
+        CIRCUIT_SLOW_CALL_S: Non-streaming calls slower than this count as
+            failures (default: 120)
+    """
+    if os.environ.get("CIRCUIT_BREAKER", "true").lower() in {"0", "false", "no"}:
+        return None
+
+    return Breakers({
+        tier: CircuitBreaker(
+            tier,
+            window=int(os.environ.get("CIRCUIT_WINDOW", "20")),
+            min_calls=int(os.environ.get("CIRCUIT_MIN_CALLS", "5")),
+            failure_rate=float(os.environ.get("CIRCUIT_FAILURE_RATE", "0.5")),
+            open_s=float(os.environ.get("CIRCUIT_OPEN_S", "15")),
+            slow_call_s=float(os.environ.get("CIRCUIT_SLOW_CALL_S", "120")),
+            probe=probe,
+        )
+        for tier, probe in tiers.items()
+    })
@@ -0,0 +1,271 @@
+"""
+Speculative cascade for requests routed up only out of caution.
+
+A medium-confidence classifier prediction sends a request to a larger tier
+even when the small tier would often have answered it well. In cascade mode
+such a request is streamed from the small tier first; the opening
+`probe_tokens` tokens are held back and checked with cheap signals:
+
+- "refusal": the answer opens with a refusal or an admission of ignorance
+- "repetition": the opening repeats the same word trigrams over and over
+- "empty": the small tier finished without any text
+- "error": the small tier failed before the probe completed
+
+If any signal fires, the small stream is aborted and the request is answered
+by the tier it was routed to; otherwise the held-back text is released and
+the small tier finishes the answer. The streaming backends only expose text
+deltas, so token log-probabilities are not used.
+
+An aborted attempt's tokens and cost are kept on the outcome (estimated
+with the small tier's tokenizer profile when the stream never reported
+usage; nothing when the small tier failed before sending anything), and the routed tier's latency is timed from the escalation, so the
+aborted attempt does not inflate that tier's observed latency.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Union
+
+from classifier.keywords import KeywordMatcher
+from classifier.tokens import get_counter
+from config import get_config
+from inference.pricing import actual_cost
+from inference.streaming import StreamUsage
+from metrics.prometheus import CASCADE_REQUESTS
+from routing.latency import LatencyTracker
+
+CASCADE_TIER = "small"
+
+_RISK_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+REFUSAL_PHRASES = (
+    "i'm sorry",
+    "i am sorry",
+    "i apologize",
+    "i can't help",
+    "i cannot help",
+    "i can't assist",
+    "i cannot assist",
+    "i'm unable",
+    "i am unable",
+    "i'm not able",
+    "i am not able",
+    "as an ai",
+    "i don't know",
+    "i do not know",
+)
+
+# Refusals open the answer; later mentions are usually part of real content
+_REFUSAL_WINDOW_CHARS = 160
+
+_refusals = KeywordMatcher({"refusal": REFUSAL_PHRASES})
+
+Streamer = Callable[[str, List[str]], AsyncIterator[Union[str, StreamUsage]]]
+
+
+@dataclass
+class CascadeOutcome:
+    """How a cascaded request was served; filled in while it streams."""
+    target_tier: str
+    served_by: str = CASCADE_TIER
+    escalated: Optional[str] = None
+    escalated_at: Optional[float] = None
+    aborted: Optional[StreamUsage] = None
+
+    def explain(self) -> Dict[str, Any]:
+        explanation = {
+            "from": CASCADE_TIER,
+            "target": self.target_tier,
+            "served_by": self.served_by,
+            "escalated": self.escalated,
+        }
+        if self.aborted is not None:
+            explanation["aborted_cost_usd"] = self.aborted.cost
+        return explanation
+
+
+def assess(text: str, finished: bool, min_distinct_trigrams: float) -> Optional[str]:
+    """Reason the opening of an answer looks bad, or None if it looks fine."""
+    lowered = text.lower()
+
+    if not lowered.strip():
+        return "empty" if finished else None
+
+    if _refusals.match_mask(lowered.lstrip()[:_REFUSAL_WINDOW_CHARS]):
+        return "refusal"
+
+    words = lowered.split()
+    trigrams = list(zip(words, words[1:], words[2:]))
+    if len(trigrams) >= 8 and len(set(trigrams)) / len(trigrams) < min_distinct_trigrams:
+        return "repetition"
+
+    return None
+
+
+def _estimate_usage(prompt: str, context: List[str], opening: str) -> StreamUsage:
+    """Usage of an aborted small-tier attempt that never reported its own."""
+    counter = get_counter(get_config().models.models[CASCADE_TIER].tokenizer)
+    input_tokens = counter.count(prompt) + counter.count_context(context)
+    output_tokens = counter.count(opening)
+    return StreamUsage(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost=actual_cost(CASCADE_TIER, input_tokens, output_tokens),
+    )
+
+
+class CascadePolicy:
+    """Which requests cascade, and how the small tier's opening is probed."""
+
+    def __init__(
+        self,
+        tracker: LatencyTracker,
+        *,
+        bands: Set[str],
+        max_risk: str,
+        probe_tokens: int,
+        min_distinct_trigrams: float,
+    ):
+        self.tracker = tracker
+        self.bands = bands
+        self.max_risk = _RISK_ORDER[max_risk]
+        self.probe_tokens = probe_tokens
+        self.min_distinct_trigrams = min_distinct_trigrams
+
+    def applies(
+        self,
+        model_tier: str,
+        explanation: Dict[str, Any],
+        risk_level: Any,
+        max_latency_ms: int,
+    ) -> bool:
+        """True for cautious classifier escalations the small tier can attempt."""
+        if model_tier == CASCADE_TIER:
+            return False
+
+        band = (explanation.get("classifier") or {}).get("confidence_band")
+        if band not in self.bands:
+            return False
+
+        risk = _RISK_ORDER.get(getattr(risk_level, "value", risk_level), len(_RISK_ORDER))
+        if risk > self.max_risk:
+            return False
+
+        # Tiers forced up by the context window or latency budget stay there
+        window = explanation.get("context_window") or {}
+        if "escalated_from" in window or "escalated_from" in (explanation.get("latency") or {}):
+            return False
+        small_window = get_config().models.models[CASCADE_TIER].max_context_tokens
+        if window.get("total_tokens", 0) > small_window:
+            return False
+
+        predicted = self.tracker.predicted_ms(CASCADE_TIER)
+        return predicted is None or predicted <= max_latency_ms
+
+    async def stream(
+        self,
+        streamers: Dict[str, Streamer],
+        prompt: str,
+        context: List[str],
+        outcome: CascadeOutcome,
+    ) -> AsyncIterator[Union[str, StreamUsage]]:
+        """
+        Stream an answer from the small tier, escalating on a bad opening.
+
+        Nothing is yielded until the probe has passed or the request has
+        been escalated, so clients never see text from an aborted attempt.
+        """
+        small = streamers[CASCADE_TIER](prompt, context)
+        held: List[Union[str, StreamUsage]] = []
+        text: List[str] = []
+        tokens = 0
+        finished = False
+
+        try:
+            try:
+                async for item in small:
+                    held.append(item)
+                    if isinstance(item, StreamUsage):
+                        finished = True
+                        continue
+
+                    text.append(item)
+                    tokens += len(item.split())
+                    if tokens >= self.probe_tokens:
+                        break
+
+                outcome.escalated = assess(
+                    "".join(text), finished, self.min_distinct_trigrams
+                )
+            except RuntimeError:
+                outcome.escalated = "error"
+
+            if outcome.escalated is None:
+                CASCADE_REQUESTS.labels(target_tier=outcome.target_tier, outcome="accepted").inc()
+                for item in held:
+                    yield item
+                async for item in small:
+                    yield item
+                return
+        finally:
+            await small.aclose()
+
+        CASCADE_REQUESTS.labels(target_tier=outcome.target_tier, outcome=outcome.escalated).inc()
+
+        # A small tier that failed before sending anything (shed, circuit
+        # open, connection refused) used no tokens worth accounting
+        if held:
+            outcome.aborted = next(
+                (item for item in held if isinstance(item, StreamUsage)), None
+            ) or _estimate_usage(prompt, context, "".join(text))
+        outcome.escalated_at = time.time()
+
+        outcome.served_by = outcome.target_tier
+        async for item in streamers[outcome.target_tier](prompt, context):
+            yield item
+
+    async def execute(
+        self,
+        streamers: Dict[str, Streamer],
+        prompt: str,
+        context: List[str],
+        outcome: CascadeOutcome,
+    ) -> tuple[str, int, int, float]:
+        """Non-streaming variant of `stream`, returning the executor tuple."""
+        parts: List[str] = []
+        usage = StreamUsage()
+
+        async for item in self.stream(streamers, prompt, context, outcome):
+            if isinstance(item, StreamUsage):
+                usage = item
+            else:
+                parts.append(item)
+
+        return "".join(parts), usage.input_tokens, usage.output_tokens, usage.cost
+
+
+def from_env(tracker: LatencyTracker) -> Optional[CascadePolicy]:
+    """
+    Build the cascade policy if enabled via environment variables.
+
+    Environment variables:
+        CASCADE: Enable the speculative small-tier cascade (default: false)
+        CASCADE_BANDS: Comma-separated confidence bands that cascade
+            (default: medium_uncertainty)
+        CASCADE_MAX_RISK: Highest risk level allowed to cascade (default: medium)
+        CASCADE_PROBE_TOKENS: Opening tokens checked before releasing the
+            small tier's answer (default: 32)
+        CASCADE_MIN_DISTINCT_TRIGRAMS: Below this share of distinct word
+            trigrams the opening counts as repetitive (default: 0.5)
+    """
+    if os.environ.get("CASCADE", "false").lower() not in {"1", "true", "yes"}:
+        return None
+
+    return CascadePolicy(
+        tracker,
+        bands={b.strip() for b in os.environ.get("CASCADE_BANDS", "medium_uncertainty").split(",") if b.strip()},
+        max_risk=os.environ.get("CASCADE_MAX_RISK", "medium").lower(),
+        probe_tokens=int(os.environ.get("CASCADE_PROBE_TOKENS", "32")),
+        min_distinct_trigrams=float(os.environ.get("CASCADE_MIN_DISTINCT_TRIGRAMS", "0.5")),
+    )
@@ -0,0 +1,159 @@
+"""
+Hedged requests for tiers with a long latency tail.
+
+Ollama calls occasionally take far longer than usual (model swaps, a busy
+GPU host). With hedging enabled, a call that has not answered by its tier's
+observed p95 latency is also sent to the next larger tier; whichever answers
+first is returned and the other call is cancelled.
+
+Hedges are capped per tier by a token bucket: every request on a hedged tier
+earns `ratio` hedge tokens (up to `burst`), and each hedge spends one, so at
+most about `ratio` of a tier's requests cause extra backend load.
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from metrics.prometheus import HEDGED_REQUESTS
+from routing.decision import TIER_ORDER
+from routing.latency import LatencyTracker
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of a tier's requests."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+
+    def earn(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class HedgePolicy:
+    """When and where to hedge a call, given per-tier latency estimates."""
+
+    def __init__(
+        self,
+        tracker: LatencyTracker,
+        budgets: Dict[str, HedgeBudget],
+        min_delay_ms: float,
+    ):
+        self.tracker = tracker
+        self.budgets = budgets
+        self.min_delay_ms = min_delay_ms
+
+    def backup_for(self, model_tier: str) -> Optional[str]:
+        """Next larger tier for a hedged tier, or None if it is not hedged."""
+        if model_tier not in self.budgets or model_tier not in TIER_ORDER:
+            return None
+
+        index = TIER_ORDER.index(model_tier)
+        return TIER_ORDER[index + 1] if index + 1 < len(TIER_ORDER) else None
+
+    def delay_s(self, model_tier: str) -> Optional[float]:
+        """Seconds to wait before hedging; None while the tier has no estimate."""
+        predicted = self.tracker.predicted_ms(model_tier)
+        if predicted is None:
+            return None
+        return max(predicted, self.min_delay_ms) / 1000
+
+    async def run(
+        self,
+        primary_tier: str,
+        backup_tier: str,
+        call: Callable[[str], Awaitable[T]],
+    ) -> Tuple[T, str]:
+        """
+        Run `call(primary_tier)`, hedging to `backup_tier` if it is slow.
+
+        Returns the first successful result and the tier that produced it.
+        If both calls fail, the primary's error is raised.
+        """
+        budget = self.budgets[primary_tier]
+        budget.earn()
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(call(primary_tier))
+        tasks = {primary: primary_tier}
+
+        try:
+            delay = self.delay_s(primary_tier)
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+
+            if delay is None or primary.done():
+                return await primary, primary_tier
+
+            if not budget.try_spend():
+                HEDGED_REQUESTS.labels(model_tier=primary_tier, outcome="budget_exhausted").inc()
+                return await primary, primary_tier
+
+            backup = asyncio.ensure_future(call(backup_tier))
+            tasks[backup] = backup_tier
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        outcome = "won" if task is backup else "lost"
+                        HEDGED_REQUESTS.labels(model_tier=primary_tier, outcome=outcome).inc()
+                        return task.result(), tasks[task]
+
+            HEDGED_REQUESTS.labels(model_tier=primary_tier, outcome="failed").inc()
+            raise primary.exception()
+        finally:
+            # A cancelled primary took at least this long; keep its tail visible
+            if not primary.done():
+                self.tracker.observe(primary_tier, time.monotonic() - started)
+
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+def _parse_budgets(spec: str) -> Dict[str, float]:
+    budgets: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        tier, _, ratio = item.partition(":")
+        budgets[tier.strip()] = float(ratio) if ratio else 0.1
+    return budgets
+
+
+def from_env(tracker: LatencyTracker) -> Optional[HedgePolicy]:
+    """
+    Build the hedging policy if enabled via environment variables.
+
+    Environment variables:
+        HEDGING: Enable hedged requests (default: false)
+        HEDGE_BUDGETS: Comma-separated tier:ratio pairs; each listed tier is
+            hedged for at most `ratio` of its requests (default: small:0.1,medium:0.05)
+        HEDGE_BURST: Max hedges a tier can save up (default: 5)
+        HEDGE_MIN_DELAY_MS: Never hedge sooner than this (default: 100)
+    """
+    if os.environ.get("HEDGING", "false").lower() not in {"1", "true", "yes"}:
+        return None
+
+    burst = float(os.environ.get("HEDGE_BURST", "5"))
+    budgets = _parse_budgets(os.environ.get("HEDGE_BUDGETS", "small:0.1,medium:0.05"))
+
+    return HedgePolicy(
+        tracker,
+        budgets={tier: HedgeBudget(ratio, burst) for tier, ratio in budgets.items()},
+        min_delay_ms=float(os.environ.get("HEDGE_MIN_DELAY_MS", "100")),
+    )
@@ -0,0 +1,484 @@
+"""
+Pooled HTTP backends for the Ollama-served small and medium tiers.
+
+Each tier can be served by several Ollama replicas (`endpoints` in
+models.yaml, or OLLAMA_BASE_URL for a single host). Every replica owns one
+long-lived httpx.AsyncClient, so generations reuse keep-alive connections
+instead of paying a TCP handshake per request. Requests go to the replica
+with the fewest in-flight requests (or the better of two random picks), and
+replicas that keep failing are ejected for a cool-down period.
+Configuration is read once, when the backend is built.
+"""
+
+import os
+import json
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from inference.pricing import actual_cost
+from inference.streaming import StreamUsage
+from metrics.prometheus import (
+    OLLAMA_CONNECTIONS,
+    OLLAMA_REPLICA_EJECTIONS,
+    OLLAMA_REPLICA_IN_FLIGHT,
+    OLLAMA_REPLICA_LATENCY,
+)
+
+
+# Per-tier defaults: model env var, generation cap and read timeout (seconds)
+_TIER_SPECS: Dict[str, dict] = {
+    "small": {
+        "model_env": "OLLAMA_SMALL_MODEL",
+        "num_predict": 150,
+        "read_timeout": 240.0,
+    },
+    "medium": {
+        "model_env": "OLLAMA_MEDIUM_MODEL",
+        "num_predict": 300,
+        "read_timeout": 300.0,
+    },
+}
+
+
+# Weight of the newest sample in a replica's latency moving average
+_LATENCY_EWMA_ALPHA = 0.2
+
+BALANCERS = {"least_outstanding", "p2c"}
+
+
+def _is_replica_failure(exc: Exception) -> bool:
+    """Transport errors and 5xx responses count against a replica's health."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.TransportError, ValueError))
+
+
+class OllamaReplica:
+    """One Ollama host with its own connection pool and live load stats."""
+
+    def __init__(
+        self,
+        *,
+        tier: str,
+        base_url: str,
+        pool_size: int,
+        connect_timeout: float,
+        read_timeout: float,
+        keepalive_expiry: float,
+    ):
+        self.tier = tier
+        self.base_url = base_url.rstrip("/")
+
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    def begin(self) -> float:
+        self.in_flight += 1
+        OLLAMA_REPLICA_IN_FLIGHT.labels(model_tier=self.tier, replica=self.base_url).set(self.in_flight)
+        return time.perf_counter()
+
+    def finish(
+        self,
+        started: float,
+        error: Optional[Exception],
+        eject_after: int,
+        eject_seconds: float,
+    ) -> None:
+        self._release()
+
+        if error is None or not _is_replica_failure(error):
+            latency = time.perf_counter() - started
+            OLLAMA_REPLICA_LATENCY.labels(model_tier=self.tier, replica=self.base_url).observe(latency)
+            self.latency_ewma = (
+                latency if self.latency_ewma == 0.0
+                else _LATENCY_EWMA_ALPHA * latency + (1 - _LATENCY_EWMA_ALPHA) * self.latency_ewma
+            )
+            self.consecutive_failures = 0
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= eject_after:
+            self.consecutive_failures = 0
+            self.ejected_until = time.monotonic() + eject_seconds
+            OLLAMA_REPLICA_EJECTIONS.labels(model_tier=self.tier, replica=self.base_url).inc()
+
+    def abandon(self) -> None:
+        """
+        End a request that was cancelled or closed before it finished.
+
+        Its elapsed time says nothing about the replica's speed, so only
+        the in-flight count is released.
+        """
+        self._release()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        OLLAMA_REPLICA_IN_FLIGHT.labels(model_tier=self.tier, replica=self.base_url).set(self.in_flight)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.base_url,
+            "in_flight": self.in_flight,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1),
+            "ejected": self.ejected_until > time.monotonic(),
+        }
+
+
+class OllamaBackend:
+    """
+    Connection-pooled client for a single Ollama-backed tier.
+
+    Balances requests over the tier's replicas and tracks whether each
+    request opened a new connection or reused a pooled one, so pools can be
+    sized against Ollama's parallel slots.
+    """
+
+    def __init__(
+        self,
+        *,
+        tier: str,
+        endpoints: List[str],
+        model_name: str,
+        num_predict: int,
+        pool_size: int,
+        connect_timeout: float,
+        read_timeout: float,
+        keepalive_expiry: float,
+        balancer: str = "least_outstanding",
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+    ):
+        if not endpoints:
+            raise RuntimeError(f"No Ollama endpoints configured for {tier}")
+        if balancer not in BALANCERS:
+            raise RuntimeError(f"Invalid OLLAMA_BALANCER value: {balancer}. Must be one of {BALANCERS}")
+
+        self.tier = tier
+        self.model_name = model_name
+        self.num_predict = num_predict
+        self.pool_size = pool_size
+        self.balancer = balancer
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+
+        self._opened = 0
+        self._reused = 0
+        self._next = 0
+
+        self.replicas = [
+            OllamaReplica(
+                tier=tier,
+                base_url=url,
+                pool_size=pool_size,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                keepalive_expiry=keepalive_expiry,
+            )
+            for url in endpoints
+        ]
+
+    @classmethod
+    def from_env(cls, tier: str) -> "OllamaBackend":
+        """
+        Build a backend for `tier` from models.yaml and environment variables.
+
+        Replica URLs come from the tier's `endpoints` in models.yaml; tiers
+        without endpoints use OLLAMA_BASE_URL as their only replica.
+
+        Environment variables:
+            OLLAMA_BASE_URL: Ollama server URL (required without endpoints)
+            OLLAMA_SMALL_MODEL / OLLAMA_MEDIUM_MODEL: Model name (required)
+            OLLAMA_POOL_SIZE: Max pooled connections per tier (default: 10)
+            OLLAMA_<TIER>_POOL_SIZE: Per-tier override of OLLAMA_POOL_SIZE
+            OLLAMA_CONNECT_TIMEOUT: Connect timeout in seconds (default: 5)
+            OLLAMA_<TIER>_READ_TIMEOUT: Read timeout in seconds (default: 240 small, 300 medium)
+            OLLAMA_KEEPALIVE_EXPIRY: Idle keep-alive lifetime in seconds (default: 60)
+            OLLAMA_BALANCER: least_outstanding or p2c (default: least_outstanding)
+            OLLAMA_EJECT_FAILURES: Consecutive failures that eject a replica (default: 3)
+            OLLAMA_EJECT_SECONDS: How long an ejected replica is skipped (default: 30)
+
+        Raises:
+            RuntimeError: If no endpoint or model name is configured
+        """
+        spec = _TIER_SPECS[tier]
+        prefix = f"OLLAMA_{tier.upper()}"
+
+        endpoints = _configured_endpoints(tier)
+        if not endpoints and os.environ.get("OLLAMA_BASE_URL"):
+            endpoints = [os.environ["OLLAMA_BASE_URL"]]
+        model_name = os.environ.get(spec["model_env"])
+
+        if not endpoints or not model_name:
+            raise RuntimeError(f"OLLAMA_BASE_URL or {spec['model_env']} not set")
+
+        pool_size = int(
+            os.environ.get(f"{prefix}_POOL_SIZE", os.environ.get("OLLAMA_POOL_SIZE", "10"))
+        )
+
+        return cls(
+            tier=tier,
+            endpoints=endpoints,
+            model_name=model_name,
+            num_predict=spec["num_predict"],
+            pool_size=pool_size,
+            connect_timeout=float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(
+                os.environ.get(f"{prefix}_READ_TIMEOUT", str(spec["read_timeout"]))
+            ),
+            keepalive_expiry=float(os.environ.get("OLLAMA_KEEPALIVE_EXPIRY", "60")),
+            balancer=os.environ.get("OLLAMA_BALANCER", "least_outstanding").lower(),
+            eject_after=int(os.environ.get("OLLAMA_EJECT_FAILURES", "3")),
+            eject_seconds=float(os.environ.get("OLLAMA_EJECT_SECONDS", "30")),
+        )
+
+    def pick_replica(self) -> OllamaReplica:
+        """
+        Choose the replica for the next request.
+
+        Ejected replicas are skipped unless every replica is ejected, in
+        which case the one whose ejection ends first is tried.
+        """
+        now = time.monotonic()
+        healthy = [r for r in self.replicas if r.ejected_until <= now]
+        if not healthy:
+            return min(self.replicas, key=lambda r: r.ejected_until)
+        if len(healthy) == 1:
+            return healthy[0]
+
+        if self.balancer == "p2c":
+            a, b = random.sample(healthy, 2)
+            return min((a, b), key=lambda r: (r.in_flight, r.latency_ewma))
+
+        # Rotate the starting point so idle replicas share ties
+        self._next = (self._next + 1) % len(healthy)
+        ordered = healthy[self._next:] + healthy[:self._next]
+        return min(ordered, key=lambda r: (r.in_flight, r.latency_ewma))
+
+    def _payload(self, prompt: str, context: List[str], stream: bool = False) -> dict:
+        full_prompt = prompt
+        if context:
+            full_prompt += "\n\n" + "\n".join(context)
+
+        return {
+            "model": self.model_name,
+            "prompt": full_prompt,
+            "stream": stream,
+            "options": {
+                "num_predict": self.num_predict
+            }
+        }
+
+    async def generate(self, prompt: str, context: List[str]) -> Tuple[str, int, int, float]:
+        opened = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+
+        replica = self.pick_replica()
+        started = replica.begin()
+        error: Optional[Exception] = None
+        finished = False
+
+        try:
+            resp = await replica.client.post(
+                "/api/generate",
+                json=self._payload(prompt, context),
+                extensions={"trace": trace},
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            finished = True
+        except Exception as e:
+            error = e
+            finished = True
+            raise RuntimeError(f"Ollama {self.tier} model execution failed: {e}")
+        finally:
+            # Cancelled calls (lost hedges, disconnects) leave no latency sample
+            if finished:
+                replica.finish(started, error, self.eject_after, self.eject_seconds)
+            else:
+                replica.abandon()
+            self._record_connection(opened)
+
+        input_tokens = data.get("prompt_eval_count", 0)
+        output_tokens = data.get("eval_count", 0)
+
+        return (
+            data.get("response", ""),
+            input_tokens,
+            output_tokens,
+            actual_cost(self.tier, input_tokens, output_tokens),
+        )
+
+    async def stream(
+        self, prompt: str, context: List[str]
+    ) -> AsyncIterator[Union[str, StreamUsage]]:
+        """
+        Stream a generation as text deltas followed by a final StreamUsage.
+
+        Ollama emits one JSON object per line; the last one (`done: true`)
+        carries the prompt and completion token counts.
+        """
+        opened = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+
+        replica = self.pick_replica()
+        started = replica.begin()
+        error: Optional[Exception] = None
+        finished = False
+
+        try:
+            async with replica.client.stream(
+                "POST",
+                "/api/generate",
+                json=self._payload(prompt, context, stream=True),
+                extensions={"trace": trace},
+            ) as resp:
+                self._record_connection(opened)
+                resp.raise_for_status()
+
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+
+                    if data.get("response"):
+                        yield data["response"]
+
+                    if data.get("done"):
+                        finished = True
+                        input_tokens = data.get("prompt_eval_count", 0)
+                        output_tokens = data.get("eval_count", 0)
+                        yield StreamUsage(
+                            input_tokens=input_tokens,
+                            output_tokens=output_tokens,
+                            cost=actual_cost(self.tier, input_tokens, output_tokens),
+                        )
+                        return
+
+                # A truncated stream is a replica failure, like a malformed line
+                raise ValueError("stream ended without a final frame")
+        except (httpx.HTTPError, ValueError) as e:
+            error = e
+            finished = True
+            raise RuntimeError(f"Ollama {self.tier} model streaming failed: {e}")
+        finally:
+            # Streams closed early (aborted cascades, disconnects) or
+            # cancelled leave no latency sample
+            if finished:
+                replica.finish(started, error, self.eject_after, self.eject_seconds)
+            else:
+                replica.abandon()
+
+    async def probe(self, timeout: float = 2.0) -> bool:
+        """True if any replica answers a cheap model-list request."""
+        for replica in self.replicas:
+            try:
+                resp = await replica.client.get("/api/tags", timeout=timeout)
+                if resp.status_code == 200:
+                    return True
+            except httpx.HTTPError:
+                continue
+        return False
+
+    def _record_connection(self, opened: bool) -> None:
+        outcome = "opened" if opened else "reused"
+        if opened:
+            self._opened += 1
+        else:
+            self._reused += 1
+        OLLAMA_CONNECTIONS.labels(model_tier=self.tier, outcome=outcome).inc()
+
+    def stats(self) -> dict:
+        """Connection reuse counters and replica load for this backend."""
+        return {
+            "tier": self.tier,
+            "pool_size": self.pool_size,
+            "connections_opened": self._opened,
+            "connections_reused": self._reused,
+            "balancer": self.balancer,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+    async def aclose(self) -> None:
+        for replica in self.replicas:
+            await replica.client.aclose()
+
+
+def _configured_endpoints(tier: str) -> List[str]:
+    """Replica URLs for `tier` from models.yaml, if the config is loadable."""
+    try:
+        from config import get_config
+        model = get_config().models.models.get(tier)
+    except Exception:
+        return []
+    return list(model.endpoints) if model is not None else []
+
+
+_backends: Dict[str, OllamaBackend] = {}
+
+
+def init_backends() -> Dict[str, OllamaBackend]:
+    """
+    Create the pooled backends for every Ollama tier that is configured.
+
+    Tiers with missing environment configuration are skipped here and raise
+    on first use instead, so the api tier keeps working without Ollama.
+    """
+    for tier in _TIER_SPECS:
+        if tier in _backends:
+            continue
+        try:
+            _backends[tier] = OllamaBackend.from_env(tier)
+        except RuntimeError:
+            continue
+    return _backends
+
+
+def get_backend(tier: str) -> OllamaBackend:
+    """
+    Get the pooled backend for `tier`, creating it on first use.
+
+    Raises:
+        RuntimeError: If the tier's environment configuration is missing
+    """
+    backend = _backends.get(tier)
+    if backend is None:
+        backend = OllamaBackend.from_env(tier)
+        _backends[tier] = backend
+    return backend
+
+
+def pool_stats() -> List[dict]:
+    """Connection reuse counters for all initialized backends."""
+    return [backend.stats() for backend in _backends.values()]
+
+
+async def close_backends() -> None:
+    for backend in list(_backends.values()):
+        try:
+            await backend.aclose()
+        except Exception:
+            pass
+    _backends.clear()
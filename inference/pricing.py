@@ -0,0 +1,14 @@
+"""
+Per-tier pricing for completed inference.
+
+Actual cost is priced with the same `cost_per_token` from models.yaml that
+routing uses to predict cost, so budgets and reported costs stay consistent.
+"""
+
+from config import get_config
+
+
+def actual_cost(model_tier: str, input_tokens: int, output_tokens: int) -> float:
+    """Cost in USD of a completed generation on a tier."""
+    tier_config = get_config().models.models[model_tier]
+    return (input_tokens + output_tokens) * tier_config.cost_per_token
@@ -0,0 +1,16 @@
+"""
+Shared types for streaming executors.
+
+Streaming executors are async generators that yield text deltas as `str`
+and finish with exactly one `StreamUsage` carrying token counts and cost.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class StreamUsage:
+    """Final accounting frame emitted at the end of a token stream."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
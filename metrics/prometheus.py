@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # ---- Request & Routing Metrics ----
 
@@ -14,6 +14,32 @@ ROUTING_DECISIONS = Counter(
     ["decision_type"],  # static | classifier | fallback
 )
 
+ROUTING_MEMO_LOOKUPS = Counter(
+    "llm_router_routing_memo_lookups_total",
+    "Routing memo lookups",
+    ["result"],  # hit | miss
+)
+
+CONTEXT_DIGEST_LOOKUPS = Counter(
+    "llm_router_context_digest_lookups_total",
+    "Context chunk digest memo lookups",
+    ["result"],  # hit | miss
+)
+
+# ---- Classifier Metrics ----
+
+CLASSIFIER_BATCH_SIZE = Histogram(
+    "llm_router_classifier_batch_size",
+    "Number of predictions served per micro-batched classifier call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+CLASSIFIER_QUEUE_WAIT = Histogram(
+    "llm_router_classifier_queue_wait_seconds",
+    "Time a prediction waited in the micro-batch queue",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025),
+)
+
 # ---- Inference Metrics ----
 
 INFERENCE_LATENCY = Histogram(
@@ -22,6 +48,12 @@ INFERENCE_LATENCY = Histogram(
     ["model_tier"],
 )
 
+TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_router_time_to_first_token_seconds",
+    "Time from request start to the first streamed token per model tier",
+    ["model_tier"],
+)
+
 TOKEN_USAGE = Counter(
     "llm_router_tokens_total",
     "Token usage per model tier",
@@ -34,6 +66,75 @@ COST_TOTAL = Counter(
     ["model_tier"],
 )
 
+COST_OVERRUNS = Counter(
+    "llm_router_cost_overruns_total",
+    "Requests whose actual cost exceeded the cost predicted at routing time",
+    ["model_tier"],
+)
+
+COST_PREDICTION_RATIO = Histogram(
+    "llm_router_cost_prediction_ratio",
+    "Actual cost divided by the cost predicted at routing time",
+    ["model_tier"],
+    buckets=(0.25, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25, 1.5, 2.0, 4.0),
+)
+
+HEDGED_REQUESTS = Counter(
+    "llm_router_hedged_requests_total",
+    "Hedge decisions per primary tier (won: backup answered first, lost: primary answered first)",
+    ["model_tier", "outcome"],
+)
+
+CASCADE_REQUESTS = Counter(
+    "llm_router_cascade_requests_total",
+    "Cascaded requests per routed tier (accepted: small tier answered, otherwise the escalation reason)",
+    ["target_tier", "outcome"],
+)
+
+# --- Admission Control Metrics ---
+ADMISSION_IN_FLIGHT = Gauge(
+    "llm_router_admission_in_flight",
+    "Backend calls currently admitted per model tier",
+    ["model_tier"],
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "llm_router_admission_queue_depth",
+    "Requests waiting for an admission slot per model tier",
+    ["model_tier"],
+)
+
+ADMISSION_LIMIT = Gauge(
+    "llm_router_admission_limit",
+    "Current adaptive concurrency limit per model tier",
+    ["model_tier"],
+)
+
+ADMISSION_SHED = Counter(
+    "llm_router_admission_shed_total",
+    "Requests shed by admission control per model tier and reason",
+    ["model_tier", "reason"],
+)
+
+# --- Circuit Breaker Metrics ---
+CIRCUIT_BREAKER_STATE = Gauge(
+    "llm_router_circuit_breaker_state",
+    "Backend circuit breaker state per model tier (0 closed, 1 half-open, 2 open)",
+    ["model_tier"],
+)
+
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "llm_router_circuit_breaker_transitions_total",
+    "Circuit breaker state changes per model tier and new state",
+    ["model_tier", "state"],
+)
+
+CIRCUIT_FAILOVERS = Counter(
+    "llm_router_circuit_failovers_total",
+    "Requests routed away from a backend with an open circuit",
+    ["from_tier", "to_tier"],
+)
+
 # --- Cache Metrics ---
 CACHE_HITS = Counter(
     "llm_router_cache_hits_total",
@@ -45,4 +146,66 @@ CACHE_MISSES = Counter(
     "llm_router_cache_misses_total",
     "Total cache misses per model tier",
     ["model_tier"],
-)
\ No newline at end of file
+)
+
+CACHE_LAYER_HITS = Counter(
+    "llm_router_cache_layer_hits_total",
+    "Cache hits per cache layer and model tier",
+    ["layer", "model_tier"],  # l1 | l2
+)
+
+CACHE_LAYER_MISSES = Counter(
+    "llm_router_cache_layer_misses_total",
+    "Cache misses per cache layer and model tier",
+    ["layer", "model_tier"],  # l1 | l2
+)
+
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "llm_router_semantic_cache_lookups_total",
+    "Semantic (near-duplicate) cache lookups",
+    ["result"],  # hit | miss
+)
+
+CACHE_BYTES_SAVED = Counter(
+    "llm_router_cache_bytes_saved_total",
+    "Bytes saved by the binary cache envelope versus JSON encoding",
+    ["model_tier"],
+)
+
+CACHE_DECODE_LATENCY = Histogram(
+    "llm_router_cache_decode_seconds",
+    "Time to decode a Redis cache value",
+    ["encoding"],  # binary | json
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
+
+COALESCED_REQUESTS = Counter(
+    "llm_router_coalesced_requests_total",
+    "Requests served by another request's in-flight inference",
+    ["model_tier", "scope"],  # local | remote
+)
+
+# --- Backend Connection Pool Metrics ---
+OLLAMA_CONNECTIONS = Counter(
+    "llm_router_ollama_connections_total",
+    "Ollama requests by whether they opened a new connection or reused a pooled one",
+    ["model_tier", "outcome"],  # opened | reused
+)
+
+OLLAMA_REPLICA_IN_FLIGHT = Gauge(
+    "llm_router_ollama_replica_in_flight",
+    "Requests currently in flight per Ollama replica",
+    ["model_tier", "replica"],
+)
+
+OLLAMA_REPLICA_LATENCY = Histogram(
+    "llm_router_ollama_replica_latency_seconds",
+    "Ollama request latency per replica",
+    ["model_tier", "replica"],
+)
+
+OLLAMA_REPLICA_EJECTIONS = Counter(
+    "llm_router_ollama_replica_ejections_total",
+    "Times an Ollama replica was ejected after consecutive failures",
+    ["model_tier", "replica"],
+)
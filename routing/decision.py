@@ -1,9 +1,13 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from types import SimpleNamespace
 
 from config import get_config
 from classifier.predict import Classifier
+from classifier.model import ClassifierPrediction
 from classifier.features import TaskType, estimate_output_tokens
+from classifier.analysis import PromptAnalysis, analyze_prompt
+from classifier.tokens import WHITESPACE, get_counter
+from routing.latency import LatencyTracker
 
 
 # --------------------------------------------------
@@ -12,6 +16,9 @@ from classifier.features import TaskType, estimate_output_tokens
 HIGH_CONFIDENCE = 0.70
 MEDIUM_CONFIDENCE = 0.45
 
+# Tiers from cheapest to most capable; escalation only moves right
+TIER_ORDER = ("small", "medium", "api")
+
 
 # --------------------------------------------------
 # Fallback policy
@@ -39,13 +46,14 @@ def context_dominance_ratio(context_tokens: int, total_tokens: int) -> float:
     return context_tokens / total_tokens
 
 
-def estimated_generation_weight(prompt: str) -> str:
-    p = prompt.lower()
+def estimated_generation_weight(prompt: str, analysis: Optional[PromptAnalysis] = None) -> str:
+    if analysis is None:
+        analysis = analyze_prompt(prompt)
 
-    if any(k in p for k in ["step by step", "in detail", "explain", "derive"]):
+    if analysis.has("heavy_generation"):
         return "heavy"
 
-    if any(k in p for k in ["summarize", "list", "compare"]):
+    if analysis.has("medium_generation"):
         return "medium"
 
     return "light"
@@ -54,27 +62,66 @@ def estimated_generation_weight(prompt: str) -> str:
 # --------------------------------------------------
 # B.3a — Context-window safety
 # --------------------------------------------------
-def enforce_context_window_safety(
-    *,
-    proposed_tier: str,
+def tier_token_counts(
+    tier_config,
     features: dict,
     prompt: str,
     context: list[str],
-    explanation: Dict[str, Any],
-) -> str:
-    config = get_config()
+) -> tuple[int, int]:
+    """
+    (input_tokens, context_tokens) as seen by a tier's tokenizer profile.
+
+    Whitespace tiers reuse the extracted features; other profiles recount
+    the prompt and (cached) context chunks with their approximation.
+    """
+    if tier_config.tokenizer == WHITESPACE:
+        return features.get("token_count", 0), features.get("context_length", 0)
 
-    input_tokens = features.get("token_count", 0)
-    context_tokens = features.get("context_length", 0)
+    counter = get_counter(tier_config.tokenizer)
+    context_tokens = counter.count_context(context)
+    return counter.count(prompt) + context_tokens, context_tokens
 
-    estimated_output = estimate_output_tokens(
+
+def _estimated_output(
+    features: dict,
+    prompt: str,
+    context: list[str],
+    analysis: Optional[PromptAnalysis],
+) -> int:
+    return estimate_output_tokens(
         prompt=prompt,
         context=context,
         predicted_task=features.get("task", TaskType.GENERATION),
+        analysis=analysis,
     )
 
-    total_tokens = input_tokens + context_tokens + estimated_output
-    max_allowed = config.models.models[proposed_tier].max_context_tokens
+
+def context_window_tokens(
+    tier_config,
+    features: dict,
+    prompt: str,
+    context: list[str],
+    analysis: Optional[PromptAnalysis] = None,
+) -> int:
+    """Tokens a request is expected to occupy in a tier's context window."""
+    input_tokens, context_tokens = tier_token_counts(tier_config, features, prompt, context)
+    return input_tokens + context_tokens + _estimated_output(features, prompt, context, analysis)
+
+
+def enforce_context_window_safety(
+    *,
+    proposed_tier: str,
+    features: dict,
+    prompt: str,
+    context: list[str],
+    explanation: Dict[str, Any],
+    analysis: Optional[PromptAnalysis] = None,
+) -> str:
+    config = get_config()
+    tier_config = config.models.models[proposed_tier]
+
+    total_tokens = context_window_tokens(tier_config, features, prompt, context, analysis)
+    max_allowed = tier_config.max_context_tokens
 
     if total_tokens <= max_allowed:
         explanation["context_window"] = {
@@ -82,6 +129,8 @@ def enforce_context_window_safety(
             "max_allowed": max_allowed,
             "overflow": False,
         }
+        if tier_config.tokenizer != WHITESPACE:
+            explanation["context_window"]["tokenizer"] = tier_config.tokenizer
         return proposed_tier
 
     explanation["context_window"] = {
@@ -90,6 +139,8 @@ def enforce_context_window_safety(
         "overflow": True,
         "escalated_from": proposed_tier,
     }
+    if tier_config.tokenizer != WHITESPACE:
+        explanation["context_window"]["tokenizer"] = tier_config.tokenizer
 
     if proposed_tier == "small":
         return enforce_context_window_safety(
@@ -98,6 +149,7 @@ def enforce_context_window_safety(
             prompt=prompt,
             context=context,
             explanation=explanation,
+            analysis=analysis,
         )
 
     if proposed_tier == "medium":
@@ -107,12 +159,167 @@ def enforce_context_window_safety(
             prompt=prompt,
             context=context,
             explanation=explanation,
+            analysis=analysis,
         )
 
     explanation["context_window"]["warning"] = "api_context_limit_exceeded"
     return "api"
 
 
+# --------------------------------------------------
+# B.3b — Cost budget
+# --------------------------------------------------
+def predicted_cost_usd(
+    tier_config,
+    features: dict,
+    prompt: str,
+    context: list[str],
+    analysis: Optional[PromptAnalysis] = None,
+) -> float:
+    """Input tokens plus estimated output tokens, priced at the tier's cost_per_token."""
+    input_tokens, _ = tier_token_counts(tier_config, features, prompt, context)
+    output_tokens = _estimated_output(features, prompt, context, analysis)
+    return (input_tokens + output_tokens) * tier_config.cost_per_token
+
+
+def enforce_cost_budget(
+    *,
+    proposed_tier: str,
+    features: dict,
+    prompt: str,
+    context: list[str],
+    risk_level: str,
+    max_cost_usd: float,
+    explanation: Dict[str, Any],
+    analysis: Optional[PromptAnalysis] = None,
+) -> str:
+    """
+    Reject a tier whose predicted cost exceeds the request's budget.
+
+    The most capable cheaper tier that fits both the budget and its context
+    window is used instead. High-risk requests are never downgraded; like
+    requests no tier can serve within budget, they keep the proposed tier
+    with a warning.
+    """
+    models = get_config().models.models
+    predicted = {
+        tier: predicted_cost_usd(models[tier], features, prompt, context, analysis)
+        for tier in TIER_ORDER
+    }
+
+    explanation["cost"] = {
+        "budget_usd": max_cost_usd,
+        "predicted_usd": {tier: round(cost, 8) for tier, cost in predicted.items()},
+    }
+
+    if predicted[proposed_tier] <= max_cost_usd:
+        return proposed_tier
+
+    if getattr(risk_level, "value", risk_level) != "high":
+        cheaper = TIER_ORDER[:TIER_ORDER.index(proposed_tier)]
+        for tier in reversed(cheaper):
+            fits_window = (
+                context_window_tokens(models[tier], features, prompt, context, analysis)
+                <= models[tier].max_context_tokens
+            )
+            if predicted[tier] <= max_cost_usd and fits_window:
+                explanation["cost"]["downgraded_from"] = proposed_tier
+                return tier
+
+    explanation["cost"]["warning"] = "cost_budget_unmet"
+    return proposed_tier
+
+
+# --------------------------------------------------
+# B.3c — Latency budget
+# --------------------------------------------------
+def enforce_latency_budget(
+    *,
+    proposed_tier: str,
+    max_latency_ms: int,
+    explanation: Dict[str, Any],
+    tracker: LatencyTracker,
+) -> str:
+    """
+    Escalate away from tiers whose predicted latency exceeds the budget.
+
+    Tiers without enough observations are assumed to fit. Only larger tiers
+    are considered, so context-window and rule decisions are never undone;
+    if none fits, the fastest known of the proposed and larger tiers wins.
+    Larger tiers that the cost step predicted to exceed the request's cost
+    budget are not escalated to.
+    """
+    cost = explanation.get("cost")
+    candidates = tuple(
+        tier for tier in TIER_ORDER[TIER_ORDER.index(proposed_tier):]
+        if tier == proposed_tier
+        or cost is None
+        or cost["predicted_usd"][tier] <= cost["budget_usd"]
+    )
+    predicted = {tier: tracker.predicted_ms(tier) for tier in candidates}
+
+    explanation["latency"] = {
+        "budget_ms": max_latency_ms,
+        "quantile": tracker.quantile,
+        "predicted_ms": {
+            tier: round(ms, 1) if ms is not None else None
+            for tier, ms in predicted.items()
+        },
+    }
+
+    for tier in candidates:
+        if predicted[tier] is None or predicted[tier] <= max_latency_ms:
+            if tier != proposed_tier:
+                explanation["latency"]["escalated_from"] = proposed_tier
+            return tier
+
+    fastest = min(candidates, key=lambda tier: predicted[tier])
+    explanation["latency"]["warning"] = "latency_budget_unmet"
+    if fastest != proposed_tier:
+        explanation["latency"]["escalated_from"] = proposed_tier
+    return fastest
+
+
+# --------------------------------------------------
+# B.3d — Backend health
+# --------------------------------------------------
+def enforce_backend_health(
+    *,
+    proposed_tier: str,
+    explanation: Dict[str, Any],
+    breakers: Any,
+) -> str:
+    """
+    Fail over from a tier whose backend circuit breaker is open.
+
+    The next larger tier with a healthy backend is used (small → medium →
+    api). If none is healthy, the proposed tier is kept and its call fails
+    fast instead of waiting for the backend to time out.
+    """
+    if breakers.healthy(proposed_tier):
+        return proposed_tier
+
+    explanation["circuit_breaker"] = {
+        "open": proposed_tier,
+        "reason": breakers.reason(proposed_tier),
+    }
+
+    for tier in TIER_ORDER[TIER_ORDER.index(proposed_tier) + 1:]:
+        if breakers.healthy(tier):
+            explanation["circuit_breaker"]["failed_over_to"] = tier
+            return tier
+
+    explanation["circuit_breaker"]["warning"] = "no_healthy_backend"
+    return proposed_tier
+
+
+def classifier_input(features: dict, prompt: str) -> SimpleNamespace:
+    """Shape request features the way classifier implementations expect."""
+    feature_obj = SimpleNamespace(**features)
+    setattr(feature_obj, "prompt", prompt)
+    return feature_obj
+
+
 # --------------------------------------------------
 # Main routing decision
 # --------------------------------------------------
@@ -125,7 +332,21 @@ def decide_model_tier(
     risk_level: str,
     max_latency_ms: int,
     classifier: Classifier,
+    prediction: Optional[ClassifierPrediction] = None,
+    analysis: Optional[PromptAnalysis] = None,
+    max_cost_usd: Optional[float] = None,
 ) -> tuple[str, Dict[str, Any]]:
+    """
+    Pick the model tier for a request and explain why.
+
+    `prediction` lets batch callers supply a classifier result computed for
+    many prompts in one call; when omitted the classifier is invoked here.
+    `analysis` shares the PromptAnalysis already built for feature
+    extraction; when omitted it is computed once here. With `max_cost_usd`
+    the chosen tier must also fit the request's cost budget.
+    """
+    if analysis is None:
+        analysis = analyze_prompt(prompt, context)
 
     explanation: Dict[str, Any] = {
         "static_rule": None,
@@ -134,53 +355,51 @@ def decide_model_tier(
         "fallback": None,
     }
 
+    def finalize(tier: str) -> str:
+        tier = enforce_context_window_safety(
+            proposed_tier=tier,
+            features=features,
+            prompt=prompt,
+            context=context,
+            explanation=explanation,
+            analysis=analysis,
+        )
+        if max_cost_usd is None:
+            return tier
+
+        return enforce_cost_budget(
+            proposed_tier=tier,
+            features=features,
+            prompt=prompt,
+            context=context,
+            risk_level=risk_level,
+            max_cost_usd=max_cost_usd,
+            explanation=explanation,
+            analysis=analysis,
+        )
+
     config = get_config()
-    rules = config.routing.rules
 
     # ---- 1. Static routing rules ----
-    for rule in rules:
-        matched = True
-
-        for key, expected in rule.condition.items():
-            if key == "risk_level" and risk_level != expected:
-                matched = False
-                break
-
-            if key == "min_context_tokens" and context_token_count < expected:
-                matched = False
-                break
-
-            if key == "max_tokens":
-                token_count = features.get("token_count")
-                if token_count is None or token_count > expected:
-                    matched = False
-                    break
-
-            if key not in {"risk_level", "min_context_tokens", "max_tokens"}:
-                if features.get(key) != expected:
-                    matched = False
-                    break
-
-        if matched:
-            explanation["static_rule"] = {
-                "rule_name": rule.name,
-                "matched_condition": rule.condition,
-                "route_to": rule.route_to,
-            }
-
-            safe_tier = enforce_context_window_safety(
-                proposed_tier=rule.route_to,
-                features=features,
-                prompt=prompt,
-                context=context,
-                explanation=explanation,
-            )
-            return safe_tier, explanation
+    rule = config.rule_engine.match(
+        risk_level=risk_level,
+        context_token_count=context_token_count,
+        features=features,
+    )
+
+    if rule is not None:
+        explanation["static_rule"] = {
+            "rule_name": rule.name,
+            "matched_condition": rule.condition,
+            "route_to": rule.route_to,
+        }
+
+        return finalize(rule.route_to), explanation
 
     # ---- 2. Heuristics ----
     total_tokens = features.get("token_count", 0)
     context_ratio = context_dominance_ratio(context_token_count, total_tokens)
-    gen_weight = estimated_generation_weight(prompt)
+    gen_weight = estimated_generation_weight(prompt, analysis)
 
     explanation["heuristics"] = {
         "context_ratio": round(context_ratio, 2),
@@ -189,29 +408,15 @@ def decide_model_tier(
 
     if context_ratio > 0.8:
         explanation["heuristics"]["override"] = "context_too_large"
-        return enforce_context_window_safety(
-            proposed_tier="api",
-            features=features,
-            prompt=prompt,
-            context=context,
-            explanation=explanation,
-        ), explanation
+        return finalize("api"), explanation
 
     if context_ratio > 0.6 and gen_weight == "heavy":
         explanation["heuristics"]["override"] = "heavy_context_generation"
-        return enforce_context_window_safety(
-            proposed_tier="medium",
-            features=features,
-            prompt=prompt,
-            context=context,
-            explanation=explanation,
-        ), explanation
+        return finalize("medium"), explanation
 
     # ---- 3. Classifier path (C.1.8) ----
-    feature_obj = SimpleNamespace(**features)
-    setattr(feature_obj, "prompt", prompt)
-
-    prediction = classifier.predict(feature_obj)
+    if prediction is None:
+        prediction = classifier.predict(classifier_input(features, prompt))
     confidence = prediction.confidence
     predicted_task = prediction.predicted_task
 
@@ -241,11 +446,4 @@ def decide_model_tier(
         explanation["classifier"]["confidence_band"] = "low_uncertainty"
         tier = "api"
 
-    safe_tier = enforce_context_window_safety(
-        proposed_tier=tier,
-        features=features,
-        prompt=prompt,
-        context=context,
-        explanation=explanation,
-    )
-    return safe_tier, explanation
+    return finalize(tier), explanation
@@ -0,0 +1,108 @@
+"""
+Online per-tier latency estimates for latency-aware routing.
+
+Every inference latency observed for INFERENCE_LATENCY is also fed here.
+Each tier keeps a sliding window of its most recent observations, and the
+configured quantile (p95 by default) of that window is the tier's predicted
+latency. Tiers with too few observations have no prediction, so a cold
+router behaves exactly as before.
+
+Observations older than `max_age_s` are dropped. A tier that routing skips
+for being slow gets no new observations, so without ageing its old p95
+would keep it skipped forever; instead it falls back to "unknown" and is
+tried again once its slow samples expire.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class LatencyTracker:
+    """Sliding-window latency quantiles per model tier."""
+
+    def __init__(
+        self,
+        window: int,
+        min_samples: int,
+        quantile: float,
+        max_age_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.max_age_s = max_age_s
+        self.clock = clock
+
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._cached: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model_tier: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model_tier)
+            if samples is None:
+                samples = self._samples[model_tier] = deque(maxlen=self.window)
+            samples.append((self.clock(), seconds))
+            self._cached.pop(model_tier, None)
+
+    def _expire(self, model_tier: str) -> None:
+        samples = self._samples.get(model_tier)
+        if self.max_age_s is None or not samples:
+            return
+
+        oldest_kept = self.clock() - self.max_age_s
+        if samples[0][0] >= oldest_kept:
+            return
+
+        while samples and samples[0][0] < oldest_kept:
+            samples.popleft()
+        self._cached.pop(model_tier, None)
+
+    def predicted_ms(self, model_tier: str) -> Optional[float]:
+        """Predicted latency quantile in milliseconds, or None if unknown."""
+        with self._lock:
+            self._expire(model_tier)
+            if model_tier in self._cached:
+                return self._cached[model_tier]
+
+            samples = self._samples.get(model_tier)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+
+            ordered = sorted(seconds for _, seconds in samples)
+            index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+            predicted = ordered[index] * 1000
+            self._cached[model_tier] = predicted
+            return predicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._cached.clear()
+
+
+def from_env() -> LatencyTracker:
+    """
+    Build the latency tracker from environment variables.
+
+    Environment variables:
+        LATENCY_WINDOW: Recent observations kept per tier (default: 200)
+        LATENCY_MIN_SAMPLES: Observations needed before predicting (default: 20)
+        LATENCY_QUANTILE: Quantile used as the predicted latency (default: 0.95)
+        LATENCY_MAX_AGE_S: Observations older than this are dropped (default: 300)
+    """
+    return LatencyTracker(
+        window=int(os.environ.get("LATENCY_WINDOW", "200")),
+        min_samples=int(os.environ.get("LATENCY_MIN_SAMPLES", "20")),
+        quantile=float(os.environ.get("LATENCY_QUANTILE", "0.95")),
+        max_age_s=float(os.environ.get("LATENCY_MAX_AGE_S", "300")),
+    )
+
+
+# Shared by the inference path (observations) and the router (predictions)
+tracker = from_env()
@@ -0,0 +1,112 @@
+"""
+Memoization of routing decisions for repeated requests.
+
+Routing depends only on the prompt and context text, the risk level and
+the cost budget, so the full decision pipeline — rules, heuristics,
+classifier and context-window checks — can be skipped for exact repeats
+that miss the response cache. The latency budget is applied to the
+memoized decision afterwards and is not part of the key. Keys hash the raw text: prompt
+length, constraint density and token counts depend on whitespace, so
+prompts that differ only in case or whitespace are routed separately.
+
+Entries are tagged with a fingerprint of the loaded configuration and
+classifier model; a new config generation or classifier clears the memo.
+"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from cache.digest import ContextDigest
+from metrics.prometheus import ROUTING_MEMO_LOOKUPS
+
+
+class RoutingMemo:
+    """LRU + TTL memo of (tier, explanation) by exact request fingerprint."""
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[str, Dict[str, Any], float]]" = OrderedDict()
+        self._fingerprint: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        prompt: str,
+        context: ContextDigest,
+        risk_level: str,
+        max_cost_usd: Optional[float] = None,
+    ) -> str:
+        h = hashlib.sha256(prompt.encode("utf-8"))
+        h.update(b"\x00")
+        h.update(context.raw_root)
+        h.update(f"\x01{getattr(risk_level, 'value', risk_level)}:{max_cost_usd}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str, fingerprint: Hashable) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                ROUTING_MEMO_LOOKUPS.labels(result="miss").inc()
+                return None
+
+            self._entries.move_to_end(key)
+            ROUTING_MEMO_LOOKUPS.labels(result="hit").inc()
+            tier, explanation, _ = entry
+
+        # Callers may annotate the explanation, so never hand out the stored one
+        return tier, copy.deepcopy(explanation)
+
+    def put(
+        self,
+        key: str,
+        fingerprint: Hashable,
+        tier: str,
+        explanation: Dict[str, Any],
+    ) -> None:
+        stored = copy.deepcopy(explanation)
+
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+
+            self._entries[key] = (tier, stored, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _check_fingerprint(self, fingerprint: Hashable) -> None:
+        if fingerprint != self._fingerprint:
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+
+def from_env() -> Optional[RoutingMemo]:
+    """
+    Build a RoutingMemo from environment variables.
+
+    Environment variables:
+        ROUTING_MEMO_SIZE: Max memoized decisions (default: 10000, 0 disables)
+        ROUTING_MEMO_TTL_S: Lifetime of a memoized decision in seconds (default: 300)
+    """
+    max_entries = int(os.environ.get("ROUTING_MEMO_SIZE", "10000"))
+    if max_entries <= 0:
+        return None
+
+    return RoutingMemo(
+        max_entries=max_entries,
+        ttl_s=float(os.environ.get("ROUTING_MEMO_TTL_S", "300")),
+    )
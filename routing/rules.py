@@ -0,0 +1,193 @@
+"""
+Compiled static routing rules.
+
+Rules from routing.yaml are compiled once, at config load, into decision
+tables of rule bitmasks: one table per condition dimension (risk level,
+context-token threshold, token threshold, and equality conditions on other
+feature keys). Matching a request ANDs one mask per dimension and takes the
+lowest set bit, which preserves first-match-wins ordering without walking
+every rule and every condition key.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Condition keys with dedicated semantics; every other key is an equality
+# check against the request's feature of the same name
+RISK_LEVEL = "risk_level"
+MIN_CONTEXT_TOKENS = "min_context_tokens"
+MAX_TOKENS = "max_tokens"
+_SPECIAL_KEYS = {RISK_LEVEL, MIN_CONTEXT_TOKENS, MAX_TOKENS}
+
+
+def _plain(value: Any) -> Any:
+    """Compare enums (e.g. RiskLevel, TaskType) by their raw value."""
+    return getattr(value, "value", value)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _EqualityTable:
+    """Rules constraining one feature key to a value, indexed by that value."""
+
+    def __init__(self, all_rules: int):
+        self.unconstrained = all_rules
+        self.by_value: Dict[Any, int] = {}
+
+    def add(self, bit: int, expected: Any) -> None:
+        self.unconstrained &= ~bit
+        key = _plain(expected)
+        self.by_value[key] = self.by_value.get(key, 0) | bit
+
+    def mask(self, actual: Any) -> int:
+        actual = _plain(actual)
+        if not _hashable(actual):
+            return self.unconstrained
+        return self.unconstrained | self.by_value.get(actual, 0)
+
+
+class CompiledRules:
+    """
+    Decision tables for an ordered list of routing rules.
+
+    `match` returns the first rule (in config order) whose conditions all
+    hold, exactly like evaluating the rules one by one.
+    """
+
+    def __init__(self, rules: Sequence[Any]):
+        self.rules = list(rules)
+        count = len(self.rules)
+        all_rules = (1 << count) - 1
+
+        # risk_level: rules without the condition match every risk level
+        self._risk_any = all_rules
+        self._risk_by_level: Dict[Any, int] = {}
+
+        # min_context_tokens: sorted thresholds with prefix masks
+        min_ctx: List[tuple] = []
+        # max_tokens: sorted thresholds with suffix masks
+        max_tok: List[tuple] = []
+
+        self._equality: Dict[str, _EqualityTable] = {}
+        # Conditions that cannot be indexed (unhashable expected values)
+        self._residual: Dict[int, List[Callable[[dict], bool]]] = {}
+
+        for index, rule in enumerate(self.rules):
+            bit = 1 << index
+
+            for key, expected in rule.condition.items():
+                if key == RISK_LEVEL:
+                    self._risk_any &= ~bit
+                    level = _plain(expected)
+                    self._risk_by_level[level] = self._risk_by_level.get(level, 0) | bit
+                elif key == MIN_CONTEXT_TOKENS:
+                    min_ctx.append((expected, bit))
+                elif key == MAX_TOKENS:
+                    max_tok.append((expected, bit))
+                elif _hashable(_plain(expected)):
+                    table = self._equality.setdefault(key, _EqualityTable(all_rules))
+                    table.add(bit, expected)
+                else:
+                    self._residual.setdefault(index, []).append(
+                        lambda features, k=key, e=expected: features.get(k) == e
+                    )
+
+        # Context: a rule matches when context_tokens >= threshold
+        min_ctx.sort(key=lambda t: t[0])
+        self._ctx_thresholds = [t for t, _ in min_ctx]
+        self._ctx_free = all_rules & ~sum(bit for _, bit in min_ctx)
+        self._ctx_prefix = [self._ctx_free]
+        for _, bit in min_ctx:
+            self._ctx_prefix.append(self._ctx_prefix[-1] | bit)
+
+        # Tokens: a rule matches when token_count <= threshold
+        max_tok.sort(key=lambda t: t[0])
+        self._tok_thresholds = [t for t, _ in max_tok]
+        self._tok_free = all_rules & ~sum(bit for _, bit in max_tok)
+        self._tok_suffix = [self._tok_free] * (len(max_tok) + 1)
+        for i in range(len(max_tok) - 1, -1, -1):
+            self._tok_suffix[i] = self._tok_suffix[i + 1] | max_tok[i][1]
+
+    def match(
+        self,
+        *,
+        risk_level: Any,
+        context_token_count: int,
+        features: dict,
+    ) -> Optional[Any]:
+        """Return the first matching rule, or None."""
+        mask = self._risk_any | self._risk_by_level.get(_plain(risk_level), 0)
+        if not mask:
+            return None
+
+        mask &= self._ctx_prefix[bisect_right(self._ctx_thresholds, context_token_count)]
+        if not mask:
+            return None
+
+        token_count = features.get("token_count")
+        if token_count is None:
+            mask &= self._tok_free
+        else:
+            mask &= self._tok_suffix[bisect_left(self._tok_thresholds, token_count)]
+
+        for key, table in self._equality.items():
+            if not mask:
+                return None
+            mask &= table.mask(features.get(key))
+
+        while mask:
+            lowest = mask & -mask
+            index = lowest.bit_length() - 1
+            checks = self._residual.get(index)
+            if checks is None or all(check(features) for check in checks):
+                return self.rules[index]
+            mask ^= lowest
+
+        return None
+
+
+def match_linear(
+    rules: Sequence[Any],
+    *,
+    risk_level: Any,
+    context_token_count: int,
+    features: dict,
+) -> Optional[Any]:
+    """
+    Reference rule evaluation: walk every rule and condition in order.
+
+    Kept as the executable specification that CompiledRules must agree with.
+    """
+    for rule in rules:
+        matched = True
+
+        for key, expected in rule.condition.items():
+            if key == RISK_LEVEL and risk_level != expected:
+                matched = False
+                break
+
+            if key == MIN_CONTEXT_TOKENS and context_token_count < expected:
+                matched = False
+                break
+
+            if key == MAX_TOKENS:
+                token_count = features.get("token_count")
+                if token_count is None or token_count > expected:
+                    matched = False
+                    break
+
+            if key not in _SPECIAL_KEYS:
+                if features.get(key) != expected:
+                    matched = False
+                    break
+
+        if matched:
+            return rule
+
+    return None
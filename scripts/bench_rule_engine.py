@@ -0,0 +1,84 @@
+"""
+Benchmark: compiled routing rules vs. walking every rule per request.
+
+Usage:
+    python scripts/bench_rule_engine.py
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config import RoutingRule
+from routing.rules import CompiledRules, match_linear
+
+RULE_COUNTS = [3, 10, 50, 100, 250, 500, 1000]
+REQUESTS = 5000
+SEED = 42
+
+
+def make_rules(rng: random.Random, count: int) -> list[RoutingRule]:
+    rules = []
+    for i in range(count):
+        condition = {}
+        if rng.random() < 0.8:
+            condition["risk_level"] = rng.choice(["low", "medium", "high"])
+        if rng.random() < 0.8:
+            condition["min_context_tokens"] = rng.randint(256, 4096)
+        if rng.random() < 0.8:
+            condition["max_tokens"] = rng.randint(16, 512)
+        if rng.random() < 0.8:
+            condition["task"] = rng.choice(["classification", "reasoning", "generation"])
+        rules.append(
+            RoutingRule(
+                name=f"rule_{i}",
+                condition=condition or {"risk_level": "high"},
+                route_to=rng.choice(["small", "medium", "api"]),
+            )
+        )
+    return rules
+
+
+def make_requests(rng: random.Random) -> list[dict]:
+    return [
+        {
+            "risk_level": rng.choice(["low", "medium", "high"]),
+            "context_token_count": rng.randint(0, 2048),
+            "features": {
+                "token_count": rng.randint(1, 4096),
+                "task": rng.choice(["classification", "reasoning", "generation"]),
+            },
+        }
+        for _ in range(REQUESTS)
+    ]
+
+
+def bench(fn, requests: list[dict]) -> float:
+    start = time.perf_counter()
+    for kwargs in requests:
+        fn(**kwargs)
+    return (time.perf_counter() - start) / len(requests) * 1e6
+
+
+def main():
+    rng = random.Random(SEED)
+    requests = make_requests(rng)
+
+    print(f"{'rules':>6} | {'linear us/req':>13} | {'compiled us/req':>15} | {'speedup':>7}")
+    print("-" * 52)
+
+    for count in RULE_COUNTS:
+        rules = make_rules(rng, count)
+        engine = CompiledRules(rules)
+
+        linear = bench(lambda **kw: match_linear(rules, **kw), requests)
+        compiled = bench(engine.match, requests)
+
+        print(f"{count:>6} | {linear:>13.2f} | {compiled:>15.2f} | {linear / compiled:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+from inference.admission import AdmissionController, AIMDLimit, Overloaded
+from inference.breaker import CircuitOpen
+from routing.latency import LatencyTracker
+
+
+def _controller(limit=1, max_queue=1, queue_timeout_s=5.0) -> AdmissionController:
+    return AdmissionController(
+        "small",
+        AIMDLimit(initial=limit, min_limit=1, max_limit=8, backoff=0.5, tolerance=2.0),
+        max_queue=max_queue,
+        queue_timeout_s=queue_timeout_s,
+        tracker=LatencyTracker(window=10, min_samples=1, quantile=0.95),
+    )
+
+
+def test_aimd_grows_when_fast_and_backs_off_when_slow_or_failing():
+    limit = AIMDLimit(initial=4, min_limit=1, max_limit=8, backoff=0.5, tolerance=2.0)
+
+    for _ in range(20):
+        limit.update(0.1, failed=False, in_flight=limit.value)
+    assert limit.value == 7
+
+    limit.update(1.0, failed=False, in_flight=0)
+    assert limit.value == 3
+
+    limit.update(0.1, failed=True, in_flight=0)
+    limit.update(0.1, failed=True, in_flight=0)
+    assert limit.value == 1
+
+
+def test_full_queue_sheds_and_release_admits_waiter():
+    async def main():
+        controller = _controller()
+        await controller.acquire()
+
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats() == {"limit": 1, "in_flight": 1, "queued": 1}
+        assert controller.saturated()
+
+        with pytest.raises(Overloaded) as shed:
+            await controller.acquire()
+        assert shed.value.reason == "queue_full"
+        assert shed.value.retry_after_s == 1
+
+        controller.release(None, failed=False)
+        await waiter
+        return controller.stats()
+
+    assert asyncio.run(main()) == {"limit": 1, "in_flight": 1, "queued": 0}
+
+
+def test_queue_timeout_sheds_and_frees_queue_slot():
+    async def main():
+        controller = _controller(queue_timeout_s=0.01)
+        await controller.acquire()
+
+        with pytest.raises(Overloaded) as shed:
+            await controller.acquire()
+        return shed.value.reason, controller.stats()
+
+    reason, stats = asyncio.run(main())
+    assert reason == "queue_timeout"
+    assert stats == {"limit": 1, "in_flight": 1, "queued": 0}
+
+
+def test_cancelled_slot_is_released_without_adapting():
+    async def main():
+        controller = _controller(limit=2)
+
+        async def hold():
+            async with controller.slot():
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return controller
+
+    controller = asyncio.run(main())
+    assert controller.in_flight == 0
+    assert controller.limit.baseline is None
+
+
+def test_circuit_open_rejection_does_not_shrink_limit():
+    async def main():
+        controller = _controller(limit=4)
+
+        with pytest.raises(CircuitOpen):
+            async with controller.slot():
+                raise CircuitOpen("small", retry_after_s=5)
+        return controller
+
+    controller = asyncio.run(main())
+    assert controller.in_flight == 0
+    assert controller.limit.value == 4
+    assert controller.limit.baseline is None
+
+
+def test_failed_backend_calls_leave_no_latency_sample(monkeypatch):
+    tracker = LatencyTracker(window=10, min_samples=1, quantile=0.95)
+    monkeypatch.setattr(api, "latency_tracker", tracker)
+
+    async def execute(prompt, context):
+        if "FAIL" in prompt:
+            raise RuntimeError("backend down")
+        return "ok", 1, 1, 0.0
+
+    monkeypatch.setattr(api, "_EXECUTORS", {tier: execute for tier in ("small", "medium", "api")})
+    app = FastAPI()
+    app.include_router(api.router)
+    client = TestClient(app, raise_server_exceptions=False)
+
+    assert client.post("/generate", json={"prompt": "latency sample check FAIL"}).status_code == 500
+    assert all(tracker.predicted_ms(tier) is None for tier in ("small", "medium", "api"))
+
+    tier = client.post("/generate", json={"prompt": "latency sample check"}).json()["model_used"]
+    assert tracker.predicted_ms(tier) is not None
@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+
+from app import main
+from inference import api, ollama
+from inference.medium import execute_medium
+from inference.small import execute_small
+
+
+def _ollama(request):
+    return httpx.Response(200, json={"response": "hi", "prompt_eval_count": 2, "eval_count": 1})
+
+
+def _groq(request):
+    return httpx.Response(200, json={
+        "id": "c",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "m",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "hi"},
+        }],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+    })
+
+
+def test_executors_reuse_clients_and_shutdown_closes_them(monkeypatch):
+    created = []
+    real_client = httpx.AsyncClient
+
+    # Subclasses, since the Groq SDK type-checks its client against httpx.AsyncClient
+    class OllamaClient(real_client):
+        handler = staticmethod(_ollama)
+
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(self.handler), **kwargs)
+            created.append(self)
+
+    class GroqClient(OllamaClient):
+        handler = staticmethod(_groq)
+
+    monkeypatch.setattr(ollama.httpx, "AsyncClient", OllamaClient)
+    monkeypatch.setattr(ollama, "_backends", {})
+    monkeypatch.setattr(api, "DefaultAsyncHttpxClient", lambda **kwargs: GroqClient())
+    monkeypatch.setattr(api, "_client", None)
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama")
+    monkeypatch.setenv("OLLAMA_SMALL_MODEL", "s")
+    monkeypatch.setenv("OLLAMA_MEDIUM_MODEL", "m")
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+
+    async def run():
+        for _ in range(3):
+            await asyncio.gather(
+                execute_small("p", []),
+                execute_medium("p", []),
+                api.execute_api("p", []),
+            )
+        await main.shutdown_event()
+
+    asyncio.run(run())
+
+    # One client per Ollama tier and one Groq client, all closed on shutdown
+    assert len(created) == 3
+    assert all(client.is_closed for client in created)
+    assert ollama._backends == {}
+    assert api._client is None
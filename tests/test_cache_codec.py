@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from cache import codec
+
+
+def _payload(text: str) -> dict:
+    return {"response": text, "input_tokens": 12, "output_tokens": 345, "cost": 0.00123}
+
+
+def test_round_trip_small_and_compressed():
+    for text in ("short answer é", "a long repetitive answer. " * 200):
+        encoded = codec.encode(_payload(text))
+
+        assert codec.is_envelope(encoded)
+        assert codec.decode(encoded) == _payload(text)
+
+    long_text = "a long repetitive answer. " * 200
+    assert len(codec.encode(_payload(long_text))) < len(json.dumps(_payload(long_text))) // 10
+
+
+def test_serving_tier_round_trips():
+    hedged = dict(_payload("answered by the backup tier"), model_tier="medium")
+    encoded = codec.encode(hedged)
+
+    assert encoded[2] == codec.VERSION
+    assert codec.decode(encoded) == hedged
+
+    # Entries served by their routed tier stay readable by version-1 workers
+    assert codec.encode(_payload("x"))[2] == 1
+
+
+def test_legacy_json_values_still_decode():
+    legacy = json.dumps(_payload("from before the rollout"))
+
+    assert codec.decode(legacy) == _payload("from before the rollout")
+    assert codec.decode(legacy.encode("utf-8")) == _payload("from before the rollout")
+
+
+def test_unknown_version_is_rejected():
+    encoded = bytearray(codec.encode(_payload("x")))
+    encoded[2] = codec.VERSION + 1
+
+    with pytest.raises(ValueError):
+        codec.decode(bytes(encoded))
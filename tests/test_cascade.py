@@ -0,0 +1,120 @@
+import asyncio
+
+from inference.cascade import CascadeOutcome, CascadePolicy, assess
+from inference.streaming import StreamUsage
+from routing.latency import LatencyTracker
+
+
+def _policy(probe_tokens=6) -> CascadePolicy:
+    return CascadePolicy(
+        LatencyTracker(window=100, min_samples=5, quantile=0.95),
+        bands={"medium_uncertainty"},
+        max_risk="medium",
+        probe_tokens=probe_tokens,
+        min_distinct_trigrams=0.5,
+    )
+
+
+def _streamers(small_text, calls, small_fails=False):
+    def streamer(tier, text):
+        async def stream(prompt, context):
+            calls.append(tier)
+            for word in text.split(" "):
+                yield word + " "
+                if small_fails and tier == "small":
+                    raise RuntimeError("small down")
+            yield StreamUsage(input_tokens=3, output_tokens=len(text.split()), cost=0.0)
+        return stream
+
+    return {
+        "small": streamer("small", small_text),
+        "medium": streamer("medium", "a careful medium answer"),
+    }
+
+
+def _run(policy, streamers):
+    outcome = CascadeOutcome(target_tier="medium")
+    result = asyncio.run(policy.execute(streamers, "prompt", [], outcome))
+    return result, outcome
+
+
+def test_good_opening_is_answered_by_small_tier():
+    calls = []
+    (text, _, output_tokens, _), outcome = _run(
+        _policy(), _streamers("binary search halves the interval on every step", calls)
+    )
+
+    assert text.split() == "binary search halves the interval on every step".split()
+    assert output_tokens == 8
+    assert outcome.served_by == "small" and outcome.escalated is None
+    assert calls == ["small"]
+
+
+def test_bad_openings_escalate_to_routed_tier():
+    for small_text, reason, fails in [
+        ("I'm sorry, but I cannot answer that question", "refusal", False),
+        ("the the the the the the the the the the the the", "repetition", False),
+        ("partial answer", "error", True),
+    ]:
+        calls = []
+        (text, _, _, _), outcome = _run(
+            _policy(probe_tokens=12), _streamers(small_text, calls, small_fails=fails)
+        )
+
+        assert text.split() == ["a", "careful", "medium", "answer"]
+        assert outcome.escalated == reason
+        assert outcome.served_by == "medium"
+        assert calls == ["small", "medium"]
+
+        # The aborted attempt is accounted separately from the routed tier
+        assert outcome.escalated_at is not None
+        assert outcome.aborted.input_tokens > 0
+        assert outcome.aborted.output_tokens > 0
+        assert outcome.explain()["aborted_cost_usd"] == outcome.aborted.cost
+
+
+def test_small_tier_failing_before_any_output_has_no_aborted_cost():
+    calls = []
+    streamers = _streamers("", calls)
+
+    async def refused(prompt, context):
+        calls.append("small")
+        raise RuntimeError("small down")
+        yield
+
+    streamers["small"] = refused
+    (text, _, _, _), outcome = _run(_policy(), streamers)
+
+    assert text.split() == ["a", "careful", "medium", "answer"]
+    assert outcome.escalated == "error" and calls == ["small", "medium"]
+    assert outcome.aborted is None and outcome.escalated_at is not None
+    assert "aborted_cost_usd" not in outcome.explain()
+
+
+def test_accepted_opening_has_no_aborted_attempt():
+    _, outcome = _run(_policy(), _streamers("binary search halves the interval on every step", []))
+
+    assert outcome.aborted is None and outcome.escalated_at is None
+    assert "aborted_cost_usd" not in outcome.explain()
+
+
+def test_assess_ignores_refusal_phrases_past_the_opening():
+    opening = "Here is the plan. " * 12 + "I don't know why it fails."
+    assert assess(opening, finished=False, min_distinct_trigrams=0.0) is None
+    assert assess("", finished=True, min_distinct_trigrams=0.5) == "empty"
+
+
+def test_only_cautious_escalations_cascade():
+    policy = _policy()
+    explanation = {"classifier": {"confidence_band": "medium_uncertainty"}}
+
+    assert policy.applies("medium", explanation, "low", 10000)
+    assert not policy.applies("small", explanation, "low", 10000)
+    assert not policy.applies("medium", explanation, "high", 10000)
+    assert not policy.applies("medium", {"classifier": {"confidence": 0.9}}, "low", 10000)
+    assert not policy.applies(
+        "medium",
+        dict(explanation, context_window={"total_tokens": 3000, "escalated_from": "small"}),
+        "low",
+        10000,
+    )
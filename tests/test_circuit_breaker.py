@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from inference.breaker import Breakers, CircuitBreaker, CircuitOpen
+from routing.decision import enforce_backend_health
+
+
+def _breaker(tier="small", open_s=60.0, probe=None) -> CircuitBreaker:
+    return CircuitBreaker(
+        tier,
+        window=4,
+        min_calls=4,
+        failure_rate=0.5,
+        open_s=open_s,
+        slow_call_s=60.0,
+        probe=probe,
+    )
+
+
+def test_opens_at_failure_rate_and_fails_fast():
+    async def main():
+        breaker = _breaker()
+
+        async def failing(prompt, context):
+            raise RuntimeError("connection refused")
+
+        execute = Breakers({"small": breaker}).wrap_executors({"small": failing})["small"]
+
+        for _ in range(4):
+            with pytest.raises(RuntimeError, match="connection refused"):
+                await execute("hi", [])
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpen) as open_circuit:
+            await execute("hi", [])
+        return open_circuit.value
+
+    open_circuit = asyncio.run(main())
+    assert open_circuit.model_tier == "small"
+    assert open_circuit.retry_after_s >= 59
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = _breaker(open_s=0.0)
+    for ok in (True, True, False, False):
+        breaker.record(ok)
+    assert breaker.state == "open"
+
+    # Without a probe, the breaker lets one trial call through after open_s
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    assert not breaker.available()
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert breaker.reason == "trial_error"
+
+    breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.reason is None
+
+
+def test_probe_moves_open_breaker_to_half_open():
+    async def main():
+        probes = []
+
+        async def probe():
+            probes.append(True)
+            return len(probes) > 1
+
+        breaker = _breaker(open_s=0.01, probe=probe)
+        for _ in range(4):
+            breaker.record(False)
+        assert not breaker.available()
+
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if breaker.state == "half_open":
+                break
+        return breaker, len(probes)
+
+    breaker, probes = asyncio.run(main())
+    assert breaker.state == "half_open"
+    assert probes == 2
+
+
+def test_routing_fails_over_to_next_healthy_tier():
+    small = _breaker("small")
+    medium = _breaker("medium")
+    breakers = Breakers({"small": small, "medium": medium})
+    for _ in range(4):
+        small.record(False)
+
+    explanation = {}
+    assert enforce_backend_health(proposed_tier="small", explanation=explanation, breakers=breakers) == "medium"
+    assert explanation["circuit_breaker"] == {"open": "small", "reason": "error", "failed_over_to": "medium"}
+
+    for _ in range(4):
+        medium.record(False)
+    explanation = {}
+    assert enforce_backend_health(proposed_tier="small", explanation=explanation, breakers=breakers) == "api"
+
+    assert enforce_backend_health(proposed_tier="api", explanation={}, breakers=breakers) == "api"
+
+
+def test_hedges_and_reroutes_skip_open_tiers(monkeypatch):
+    from app import api
+    from inference.admission import Admission, Overloaded
+    from inference.hedging import HedgeBudget, HedgePolicy
+    from inference.scheduler import Scheduler
+    from routing.latency import LatencyTracker
+
+    medium = _breaker("medium")
+    breakers = Breakers({"medium": medium, "api": _breaker("api")})
+    monkeypatch.setattr(api, "_breakers", breakers)
+    monkeypatch.setattr(api, "_hedging", HedgePolicy(
+        LatencyTracker(window=10, min_samples=1, quantile=0.95),
+        budgets={"small": HedgeBudget(1.0, 5.0)},
+        min_delay_ms=0,
+    ))
+    monkeypatch.setattr(api, "_admission", Admission(
+        {}, reroute=True, request_scheduler=Scheduler("fifo", {}, {}, interactive_ms=2000)
+    ))
+    shed = Overloaded("small", "queue_full", retry_after_s=1)
+
+    assert api._hedge_backup("small", {}) == "medium"
+    assert api._overflow_tier(shed, {}) == "medium"
+
+    for _ in range(4):
+        medium.record(False)
+    explanation = {}
+    assert api._hedge_backup("small", {}) == "api"
+    assert api._overflow_tier(shed, explanation) == "api"
+    assert explanation["admission"]["rerouted_to"] == "api"
+
+    for _ in range(4):
+        breakers.breakers["api"].record(False)
+    assert api._hedge_backup("small", {}) is None
+    assert api._overflow_tier(shed, {}) is None
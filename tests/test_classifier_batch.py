@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from classifier import real, train
+from classifier.features import extract_features
+from classifier.predict import Classifier
+from routing.decision import classifier_input
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "classifier" / "data" / "training.jsonl"
+
+PROMPTS = [
+    "Classify this email as spam or not",
+    "Explain step by step why the sky is blue",
+    "Write a short poem about autumn",
+    "Tag the sentiment of this tweet",
+]
+
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    monkeypatch.setattr(train, "DATA_PATH", DATA_PATH)
+    monkeypatch.setattr(train, "MODEL_PATH", tmp_path / "model.pkl")
+    monkeypatch.setattr(real, "MODEL_PATH", tmp_path / "model.pkl")
+    train.train()
+    return Classifier(real.RealClassifier())
+
+
+def _inputs(contexts):
+    inputs = []
+    for prompt, context in zip(PROMPTS, contexts):
+        features = extract_features(
+            prompt=prompt,
+            context=context,
+            constraints={"risk_level": "low", "max_latency_ms": 2000},
+        )
+        inputs.append(classifier_input(features.model_dump(), prompt))
+    return inputs
+
+
+def test_predict_batch_matches_per_item_predict(classifier):
+    inputs = _inputs([[], ["some retrieved context " * 20], [], ["a"]])
+
+    batched = classifier.predict_batch(inputs)
+    single = [classifier.predict(i) for i in inputs]
+
+    assert len(batched) == len(inputs)
+    for b, s in zip(batched, single):
+        assert b.predicted_task == s.predicted_task
+        assert b.confidence == pytest.approx(s.confidence)
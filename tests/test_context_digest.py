@@ -0,0 +1,44 @@
+from cache import digest
+from cache.digest import digest_context
+
+
+def test_equivalent_chunks_share_normalized_digest():
+    a = digest_context(["Some  Document\ntext", "second"])
+    b = digest_context(["some document text", "SECOND "])
+
+    assert a.chunk_digests == b.chunk_digests
+    assert a.root == b.root
+    assert a.raw_root != b.raw_root
+    assert a.chunk_tokens == (3, 1)
+
+
+def test_chunk_boundaries_change_root():
+    assert digest_context(["some", "context"]).root != digest_context(["some context"]).root
+    assert digest_context([]).root != digest_context([""]).root
+
+
+def test_repeated_chunks_hit_memo():
+    digest._memo.clear()
+    chunk = "retrieved passage " * 100
+
+    first = digest.digest_chunk(chunk)
+    entry_count = len(digest._memo._entries)
+    assert digest.digest_chunk(chunk) == first
+    assert len(digest._memo._entries) == entry_count == 1
+
+
+def test_memo_hits_skip_hashing_and_confirm_the_chunk(monkeypatch):
+    digest._memo.clear()
+    chunk = "head " * 20 + "middle" + " tail" * 20
+    first = digest.digest_chunk(chunk)
+
+    def no_hashing(data):
+        raise AssertionError("memo hit hashed the chunk")
+
+    with monkeypatch.context() as m:
+        m.setattr(digest.hashlib, "sha256", no_hashing)
+        assert digest.digest_chunk("".join(list(chunk))) == first
+
+    # Same length, head and tail but different bytes: a miss, not a false hit
+    other = chunk.replace("middle", "MIDDLE")
+    assert digest.digest_chunk(other)[0] != first[0]
@@ -0,0 +1,96 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+from routing.decision import enforce_cost_budget, enforce_latency_budget
+from routing.latency import LatencyTracker
+
+PROMPT = "Write a detailed essay about the history of distributed databases. " * 5
+
+
+def _enforce(proposed_tier, max_cost_usd, risk_level="low"):
+    explanation = {}
+    tier = enforce_cost_budget(
+        proposed_tier=proposed_tier,
+        features={},
+        prompt=PROMPT,
+        context=[],
+        risk_level=risk_level,
+        max_cost_usd=max_cost_usd,
+        explanation=explanation,
+    )
+    return tier, explanation
+
+
+def test_within_budget_keeps_tier_and_records_prediction():
+    tier, explanation = _enforce("api", max_cost_usd=1.0)
+
+    assert tier == "api"
+    predicted = explanation["cost"]["predicted_usd"]
+    assert predicted["small"] < predicted["medium"] < predicted["api"] <= 1.0
+    assert "downgraded_from" not in explanation["cost"]
+
+
+def test_over_budget_downgrades_to_most_capable_affordable_tier():
+    tier, explanation = _enforce("api", max_cost_usd=0.001)
+
+    assert tier == "medium"
+    assert explanation["cost"]["downgraded_from"] == "api"
+
+
+def test_high_risk_and_unaffordable_requests_keep_tier_with_warning():
+    tier, explanation = _enforce("api", max_cost_usd=0.001, risk_level="high")
+    assert tier == "api"
+    assert explanation["cost"]["warning"] == "cost_budget_unmet"
+
+    tier, explanation = _enforce("medium", max_cost_usd=0.0)
+    assert tier == "medium"
+    assert explanation["cost"]["warning"] == "cost_budget_unmet"
+
+
+def test_latency_budget_does_not_escalate_past_cost_budget():
+    _, explanation = _enforce("small", max_cost_usd=0.001)
+
+    tracker = LatencyTracker(window=100, min_samples=5, quantile=0.95)
+    for _ in range(20):
+        tracker.observe("small", 20.0)
+        tracker.observe("medium", 10.0)
+        tracker.observe("api", 0.2)
+
+    tier = enforce_latency_budget(
+        proposed_tier="small",
+        max_latency_ms=500,
+        explanation=explanation,
+        tracker=tracker,
+    )
+
+    assert tier == "medium"
+    assert "api" not in explanation["latency"]["predicted_ms"]
+
+
+def test_cost_budget_only_applies_when_client_sets_one(monkeypatch):
+    async def execute(prompt, context):
+        return "ok", 3, 4, 0.0
+
+    monkeypatch.setattr(api, "_EXECUTORS", {tier: execute for tier in ("small", "medium", "api")})
+    app = FastAPI()
+    app.include_router(api.router)
+    client = TestClient(app)
+
+    # Context dominates the prompt, so routing picks api (~$0.02 predicted)
+    context = [" ".join(f"record{i}" for i in range(300))]
+
+    res = client.post("/generate", json={"prompt": "cost default check: summarize", "context": context})
+    assert res.status_code == 200
+    assert res.json()["model_used"] == "api"
+
+    res = client.post(
+        "/generate",
+        json={
+            "prompt": "cost budget check: summarize",
+            "context": context,
+            "constraints": {"max_cost_usd": 0.01},
+        },
+    )
+    assert res.status_code == 200
+    assert res.json()["model_used"] == "medium"
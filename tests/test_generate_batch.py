@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+
+
+def _client(monkeypatch, executor) -> TestClient:
+    monkeypatch.setattr(api, "_EXECUTORS", {tier: executor(tier) for tier in ("small", "medium", "api")})
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def test_batch_streams_lines_in_input_order_with_per_item_errors(monkeypatch):
+    prompts = [f"batch order check {i}: tag the sentiment of this tweet" for i in range(5)]
+    prompts[2] = "batch order check FAIL: tag the sentiment of this tweet"
+
+    def executor(tier):
+        async def execute(prompt, context):
+            if "FAIL" in prompt:
+                raise RuntimeError("backend down")
+            # Later items finish first
+            await asyncio.sleep(0.01 * (5 - int(prompt.split()[3][:-1])))
+            return f"answer to {prompt}", 3, 4, 0.0
+        return execute
+
+    client = _client(monkeypatch, executor)
+    res = client.post("/generate/batch", json={"requests": [{"prompt": p} for p in prompts]})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+
+    assert lines[2]["result"] is None
+    assert "backend down" in lines[2]["error"]
+
+    for i in (0, 1, 3, 4):
+        assert lines[i]["error"] is None
+        assert lines[i]["result"]["response"] == f"answer to {prompts[i]}"
+        assert lines[i]["result"]["tokens_used"] == {"input": 3, "output": 4}
@@ -0,0 +1,82 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import api
+from inference.streaming import StreamUsage
+
+TIERS = ("small", "medium", "api")
+
+
+def _client(monkeypatch, streamer) -> TestClient:
+    monkeypatch.setattr(api, "_STREAMERS", {tier: streamer(tier) for tier in TIERS})
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def _events(res):
+    events = []
+    for frame in res.text.split("\n\n"):
+        if not frame:
+            continue
+        event, data = frame.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _ttft_count(tier):
+    return REGISTRY.get_sample_value(
+        "llm_router_time_to_first_token_seconds_count", {"model_tier": tier}
+    ) or 0.0
+
+
+def test_stream_frames_tokens_and_ends_with_usage(monkeypatch):
+    def streamer(tier):
+        async def stream(prompt, context):
+            for delta in ("Hello", ", ", "world"):
+                yield delta
+            yield StreamUsage(input_tokens=5, output_tokens=3, cost=0.002)
+        return stream
+
+    client = _client(monkeypatch, streamer)
+    before = {tier: _ttft_count(tier) for tier in TIERS}
+
+    res = client.post("/generate/stream", json={"prompt": "stream framing check: say hello"})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(res)
+    assert events[:-1] == [("token", {"text": t}) for t in ("Hello", ", ", "world")]
+
+    name, summary = events[-1]
+    assert name == "done"
+    assert summary["tokens_used"] == {"input": 5, "output": 3}
+    assert summary["estimated_cost_usd"] == 0.002
+    assert summary["cache_hit"] is False
+
+    # One time-to-first-token sample, for the tier that served the stream
+    after = {tier: _ttft_count(tier) for tier in TIERS}
+    assert after[summary["model_used"]] == before[summary["model_used"]] + 1
+    assert sum(after.values()) == sum(before.values()) + 1
+
+
+def test_stream_failure_after_first_token_ends_with_error_event(monkeypatch):
+    def streamer(tier):
+        async def stream(prompt, context):
+            yield "partial"
+            raise RuntimeError("backend dropped the connection")
+        return stream
+
+    client = _client(monkeypatch, streamer)
+    res = client.post("/generate/stream", json={"prompt": "stream error check: say hello"})
+
+    assert res.status_code == 200
+    assert _events(res) == [
+        ("token", {"text": "partial"}),
+        ("error", {"detail": "backend dropped the connection"}),
+    ]
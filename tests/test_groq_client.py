@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from inference import api
+
+
+def _completion(request):
+    return httpx.Response(200, json={
+        "id": "c",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "m",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "hi"},
+        }],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+    })
+
+
+def test_groq_client_is_shared_until_closed(monkeypatch):
+    created = []
+    served = []
+
+    def handler(request):
+        served.append(request.url.path)
+        return _completion(request)
+
+    def http_client(**kwargs):
+        created.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return created[-1]
+
+    monkeypatch.setattr(api, "DefaultAsyncHttpxClient", http_client)
+    monkeypatch.setattr(api, "_client", None)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+
+    async def main():
+        client = api.get_client()
+        assert (await api.execute_api("p", []))[0] == "hi"
+        assert (await api.execute_api("p", []))[0] == "hi"
+        assert api.get_client() is client
+
+        await api.close_client()
+
+    asyncio.run(main())
+
+    assert len(served) == 2
+    assert len(created) == 1
+    assert created[0].is_closed
+    assert api._client is None
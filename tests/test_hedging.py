@@ -0,0 +1,78 @@
+import asyncio
+
+from inference.hedging import HedgeBudget, HedgePolicy
+from routing.latency import LatencyTracker
+
+
+def _policy(small_latency_s=0.02, ratio=1.0, burst=5.0) -> HedgePolicy:
+    tracker = LatencyTracker(window=100, min_samples=5, quantile=0.95)
+    for _ in range(20):
+        tracker.observe("small", small_latency_s)
+    return HedgePolicy(tracker, budgets={"small": HedgeBudget(ratio, burst)}, min_delay_ms=0)
+
+
+def _backend(delays_s, calls, failing=()):
+    async def call(tier):
+        calls.append(tier)
+        await asyncio.sleep(delays_s[tier])
+        if tier in failing:
+            raise RuntimeError(f"{tier} failed")
+        return tier + " answer"
+    return call
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    policy = _policy()
+    calls = []
+
+    result, tier = asyncio.run(
+        policy.run("small", "medium", _backend({"small": 5.0, "medium": 0.01}, calls))
+    )
+
+    assert (result, tier) == ("medium answer", "medium")
+    assert calls == ["small", "medium"]
+    # The cancelled primary's elapsed time is kept in its latency window
+    assert len(policy.tracker._samples["small"]) == 21
+
+
+def test_fast_primary_and_cold_tier_are_not_hedged():
+    calls = []
+    result, tier = asyncio.run(
+        _policy().run("small", "medium", _backend({"small": 0.0, "medium": 0.0}, calls))
+    )
+    assert tier == "small"
+
+    cold = HedgePolicy(
+        LatencyTracker(window=100, min_samples=5, quantile=0.95),
+        budgets={"small": HedgeBudget(1.0, 5.0)},
+        min_delay_ms=0,
+    )
+    result, tier = asyncio.run(
+        cold.run("small", "medium", _backend({"small": 0.05, "medium": 0.0}, calls))
+    )
+    assert tier == "small"
+    assert calls == ["small", "small"]
+
+
+def test_budget_caps_hedges_and_failed_primary_falls_back():
+    policy = _policy(ratio=0.5)
+    calls = []
+    backend = _backend({"small": 0.05, "medium": 0.0}, calls, failing={"small"})
+
+    # The first request only earns half a hedge, so the primary's error surfaces
+    try:
+        asyncio.run(policy.run("small", "medium", backend))
+        assert False, "expected the primary to fail"
+    except RuntimeError:
+        pass
+
+    result, tier = asyncio.run(policy.run("small", "medium", backend))
+    assert tier == "medium"
+    assert calls == ["small", "small", "medium"]
+
+
+def test_backup_is_the_next_larger_hedged_tier():
+    policy = _policy()
+    assert policy.backup_for("small") == "medium"
+    assert policy.backup_for("medium") is None
+    assert policy.backup_for("api") is None
@@ -0,0 +1,35 @@
+import random
+import string
+
+from classifier.keywords import KeywordMatcher
+
+ALPHABET = "abcd "
+
+
+def _substring_scan(table, text):
+    return {name for name, keywords in table.items() if any(k and k in text for k in keywords)}
+
+
+def test_matches_substring_scan_on_overlapping_keywords():
+    rng = random.Random(11)
+
+    for _ in range(200):
+        table = {
+            f"class_{i}": [
+                "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            for i in range(rng.randint(1, 6))
+        }
+        matcher = KeywordMatcher(table)
+
+        for _ in range(20):
+            text = "".join(rng.choice(ALPHABET + string.ascii_lowercase[4:8]) for _ in range(rng.randint(0, 30)))
+            assert matcher.match(text) == _substring_scan(table, text)
+
+
+def test_suffix_keywords_are_reported():
+    matcher = KeywordMatcher({"outer": ["abcd"], "inner": ["bc"], "tail": ["d"]})
+
+    assert matcher.match("xabcdx") == {"outer", "inner", "tail"}
+    assert matcher.match("abx") == frozenset()
@@ -0,0 +1,79 @@
+from routing.decision import enforce_latency_budget
+from routing.latency import LatencyTracker
+
+
+def _tracker(**latencies_s) -> LatencyTracker:
+    tracker = LatencyTracker(window=100, min_samples=5, quantile=0.95)
+    for tier, seconds in latencies_s.items():
+        for _ in range(20):
+            tracker.observe(tier, seconds)
+    return tracker
+
+
+def test_quantile_needs_min_samples_and_tracks_window():
+    tracker = LatencyTracker(window=20, min_samples=5, quantile=0.95)
+    for i in range(4):
+        tracker.observe("small", 0.1)
+    assert tracker.predicted_ms("small") is None
+
+    for i in range(20):
+        tracker.observe("small", (i + 1) / 10)
+    assert tracker.predicted_ms("small") == 1900.0
+
+
+def test_old_observations_expire_so_skipped_tier_returns():
+    now = [0.0]
+    tracker = LatencyTracker(window=100, min_samples=5, quantile=0.95, max_age_s=60, clock=lambda: now[0])
+    for _ in range(20):
+        tracker.observe("small", 20.0)
+
+    route = lambda: enforce_latency_budget(
+        proposed_tier="small",
+        max_latency_ms=500,
+        explanation={},
+        tracker=tracker,
+    )
+    assert route() == "medium"
+
+    # Small got no traffic while skipped; its slow samples age out
+    now[0] = 61.0
+    assert tracker.predicted_ms("small") is None
+    assert route() == "small"
+
+    for _ in range(20):
+        tracker.observe("small", 0.1)
+    assert route() == "small"
+
+
+def test_slow_tier_escalates_to_first_fitting_tier():
+    explanation = {}
+    tier = enforce_latency_budget(
+        proposed_tier="small",
+        max_latency_ms=500,
+        explanation=explanation,
+        tracker=_tracker(small=20.0, medium=0.3, api=0.2),
+    )
+
+    assert tier == "medium"
+    assert explanation["latency"]["escalated_from"] == "small"
+    assert explanation["latency"]["predicted_ms"] == {"small": 20000.0, "medium": 300.0, "api": 200.0}
+
+
+def test_unknown_tiers_fit_and_unmet_budget_picks_fastest():
+    explanation = {}
+    assert enforce_latency_budget(
+        proposed_tier="medium",
+        max_latency_ms=500,
+        explanation=explanation,
+        tracker=_tracker(),
+    ) == "medium"
+    assert "escalated_from" not in explanation["latency"]
+
+    explanation = {}
+    assert enforce_latency_budget(
+        proposed_tier="small",
+        max_latency_ms=100,
+        explanation=explanation,
+        tracker=_tracker(small=5.0, medium=9.0, api=2.0),
+    ) == "api"
+    assert explanation["latency"]["warning"] == "latency_budget_unmet"
@@ -0,0 +1,36 @@
+import time
+
+from cache.memory import MemoryCache
+
+
+def test_evicts_least_recently_used_when_over_byte_budget():
+    cache = MemoryCache(max_bytes=1000)
+
+    cache.set("a", {"v": 1}, size=200, ttl=60)
+    cache.set("b", {"v": 2}, size=200, ttl=60)
+    assert cache.get("a") == {"v": 1}  # refresh "a"
+
+    cache.set("c", {"v": 3}, size=200, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+    assert cache.stats()["bytes"] <= 1000
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = MemoryCache(max_bytes=10_000)
+    cache.set("k", "value", size=10, ttl=5)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_oversized_entries_are_not_stored():
+    cache = MemoryCache(max_bytes=500)
+    cache.set("big", "x", size=10_000, ttl=60)
+
+    assert cache.get("big") is None
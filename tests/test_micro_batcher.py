@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from classifier.batching import MicroBatcher
+from classifier.features import TaskType
+from classifier.predict import Classifier
+from classifier.real import RealClassifier
+
+
+class _CountingModel:
+    classes_ = np.array(["classification", "generation"])
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def predict_proba(self, X):
+        self.calls += 1
+        if self.fail:
+            raise ValueError("model exploded")
+        # Confidence depends on the row, so results must not be mixed up
+        return np.array([[row[0], 1 - row[0]] for row in X])
+
+
+class _Vectorizer:
+    def transform(self, prompts, numeric_features):
+        return np.array([[0.1 * (len(p) % 5)] for p in prompts])
+
+
+def _batcher(model, max_batch_size=32, max_wait_ms=50.0) -> MicroBatcher:
+    real = RealClassifier.__new__(RealClassifier)
+    real.model = model
+    real.vectorizer = _Vectorizer()
+    return MicroBatcher(Classifier(real), max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+
+def _features(prompt):
+    return SimpleNamespace(prompt=prompt, context_length=0, token_count=len(prompt.split()))
+
+
+def test_concurrent_predictions_share_one_predict_proba():
+    model = _CountingModel()
+    prompts = ["a", "bb", "ccc", "dddd"]
+
+    async def main():
+        batcher = _batcher(model)
+        return await asyncio.gather(*(batcher.predict(_features(p)) for p in prompts))
+
+    predictions = asyncio.run(main())
+
+    assert model.calls == 1
+    for prompt, prediction in zip(prompts, predictions):
+        assert prediction.confidence == pytest.approx(max(0.1 * len(prompt), 1 - 0.1 * len(prompt)))
+        assert prediction.predicted_task == TaskType.GENERATION
+
+
+def test_size_cap_flushes_without_waiting():
+    model = _CountingModel()
+
+    async def main():
+        batcher = _batcher(model, max_batch_size=2, max_wait_ms=10_000)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.predict(_features("a")), batcher.predict(_features("b"))),
+            timeout=1,
+        )
+
+    assert len(asyncio.run(main())) == 2
+    assert model.calls == 1
+
+
+def test_model_error_reaches_every_waiter():
+    model = _CountingModel(fail=True)
+
+    async def main():
+        batcher = _batcher(model)
+        return await asyncio.gather(
+            *(batcher.predict(_features(p)) for p in ("a", "b", "c")),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert model.calls == 1
+    assert len(results) == 3
+    assert all(isinstance(r, ValueError) and str(r) == "model exploded" for r in results)
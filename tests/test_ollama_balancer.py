@@ -0,0 +1,157 @@
+import asyncio
+import json
+
+import httpx
+
+from inference.ollama import OllamaBackend
+
+
+def _backend(handlers: dict, **kwargs) -> OllamaBackend:
+    backend = OllamaBackend(
+        tier="small",
+        endpoints=list(handlers),
+        model_name="m",
+        num_predict=10,
+        pool_size=4,
+        connect_timeout=1,
+        read_timeout=1,
+        keepalive_expiry=1,
+        **kwargs,
+    )
+    for replica in backend.replicas:
+        replica.client = httpx.AsyncClient(
+            base_url=replica.base_url,
+            transport=httpx.MockTransport(handlers[replica.base_url]),
+        )
+    return backend
+
+
+def test_requests_avoid_the_busy_replica():
+    gate = asyncio.Event()
+    served = []
+
+    def handler(name):
+        async def handle(request):
+            served.append(name)
+            if len(served) == 1:
+                await gate.wait()
+            return httpx.Response(200, json={"response": name, "eval_count": 1})
+        return handle
+
+    async def main():
+        backend = _backend({"http://a": handler("a"), "http://b": handler("b")})
+        first = asyncio.ensure_future(backend.generate("p", []))
+        await asyncio.sleep(0.01)
+        busy = [r.in_flight for r in backend.replicas]
+
+        # The first request is still in flight, so the next ones avoid its replica
+        await backend.generate("p", [])
+        await backend.generate("p", [])
+        gate.set()
+        await first
+        return backend, busy
+
+    backend, busy = asyncio.run(main())
+
+    assert sorted(busy) == [0, 1]
+    assert served[1] == served[2] != served[0]
+    assert all(r.in_flight == 0 for r in backend.replicas)
+
+
+def test_failing_replica_is_ejected():
+    async def broken(request):
+        return httpx.Response(500)
+
+    async def healthy(request):
+        return httpx.Response(200, json={"response": "ok"})
+
+    async def main():
+        backend = _backend(
+            {"http://bad": broken, "http://good": healthy},
+            eject_after=2,
+            eject_seconds=60,
+        )
+        for _ in range(2):
+            # Make the rotation start at the broken replica
+            backend._next = 1
+            try:
+                await backend.generate("p", [])
+            except RuntimeError:
+                pass
+        return backend
+
+    backend = asyncio.run(main())
+
+    assert backend.replicas[0].stats()["ejected"]
+    assert all(backend.pick_replica() is backend.replicas[1] for _ in range(10))
+
+
+def test_truncated_stream_counts_as_replica_failure():
+    async def truncated(request):
+        return httpx.Response(200, content=json.dumps({"response": "tok"}))
+
+    async def main():
+        backend = _backend({"http://a": truncated}, eject_after=1, eject_seconds=60)
+        stream = backend.stream("p", [])
+        assert await stream.__anext__() == "tok"
+        try:
+            await stream.__anext__()
+        except RuntimeError as e:
+            assert "without a final frame" in str(e)
+        else:
+            raise AssertionError("truncated stream did not fail")
+        return backend
+
+    backend = asyncio.run(main())
+
+    assert backend.replicas[0].stats()["ejected"]
+
+
+def test_failed_stream_still_records_its_connection():
+    async def broken(request):
+        return httpx.Response(500)
+
+    async def main():
+        backend = _backend({"http://a": broken})
+        try:
+            async for _ in backend.stream("p", []):
+                pass
+        except RuntimeError:
+            pass
+        return backend.stats()
+
+    stats = asyncio.run(main())
+
+    assert stats["connections_opened"] + stats["connections_reused"] == 1
+
+
+def test_cancelled_and_closed_calls_leave_no_latency_sample():
+    gate = asyncio.Event()
+
+    async def slow(request):
+        await gate.wait()
+        return httpx.Response(200, json={"response": "late"})
+
+    async def streaming(request):
+        lines = [json.dumps({"response": "tok"}), json.dumps({"done": True, "eval_count": 1})]
+        return httpx.Response(200, content="\n".join(lines))
+
+    async def main():
+        backend = _backend({"http://a": slow})
+        call = asyncio.ensure_future(backend.generate("p", []))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        cancelled = backend.replicas[0]
+
+        streamer = _backend({"http://b": streaming})
+        stream = streamer.stream("p", [])
+        assert await stream.__anext__() == "tok"
+        await stream.aclose()
+        return cancelled, streamer.replicas[0]
+
+    cancelled, closed = asyncio.run(main())
+
+    for replica in (cancelled, closed):
+        assert replica.in_flight == 0
+        assert replica.latency_ewma == 0.0
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import httpx
+
+from inference import ollama
+
+
+def _patch_clients(monkeypatch, handler) -> list:
+    """Route every AsyncClient the backends create to `handler`; return the created clients."""
+    created = []
+    real_client = httpx.AsyncClient
+
+    def client(**kwargs):
+        created.append(real_client(transport=httpx.MockTransport(handler), **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(ollama.httpx, "AsyncClient", client)
+    monkeypatch.setattr(ollama, "_backends", {})
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama")
+    monkeypatch.setenv("OLLAMA_SMALL_MODEL", "m")
+    return created
+
+
+def test_backend_and_connection_pool_are_reused_until_closed(monkeypatch):
+    served = []
+
+    def handler(request):
+        served.append(request.url.path)
+        if json.loads(request.content)["stream"]:
+            lines = [{"response": "hi", "done": False}, {"response": "", "done": True, "eval_count": 1}]
+            return httpx.Response(200, text="\n".join(json.dumps(line) for line in lines))
+        return httpx.Response(200, json={"response": "hi", "eval_count": 1})
+
+    created = _patch_clients(monkeypatch, handler)
+
+    async def main():
+        backend = ollama.get_backend("small")
+        await backend.generate("p", [])
+        await ollama.get_backend("small").generate("p", [])
+        async for _ in ollama.get_backend("small").stream("p", []):
+            pass
+
+        assert ollama.get_backend("small") is backend
+        await ollama.close_backends()
+
+    asyncio.run(main())
+
+    assert served == ["/api/generate"] * 3
+    assert len(created) == 1
+    assert created[0].is_closed
+    assert ollama._backends == {}
@@ -0,0 +1,38 @@
+import random
+
+from classifier.analysis import KEYWORD_CLASSES, analyze_prompt
+
+WORDS = ["Explain", "why", "step", "by", "the", "LIST", "show", "tagged", "\n", "  ", "derive", "x"]
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(WORDS) + rng.choice([" ", "", "\t"]) for _ in range(rng.randint(0, 15)))
+
+
+def test_token_counts_match_joined_split():
+    rng = random.Random(3)
+
+    for _ in range(500):
+        prompt = _random_text(rng)
+        context = [_random_text(rng) for _ in range(rng.randint(0, 4))]
+
+        analysis = analyze_prompt(prompt, context)
+        context_text = " ".join(context)
+
+        assert analysis.total_tokens == len(f"{prompt} {context_text}".strip().split())
+        assert analysis.context_tokens == len(context_text.split())
+        assert analysis.prompt_tokens == len(prompt.split())
+
+
+def test_keyword_classes_match_substring_scan():
+    rng = random.Random(5)
+
+    for _ in range(500):
+        prompt = _random_text(rng)
+        lower = prompt.lower()
+        expected = {
+            name for name, keywords in KEYWORD_CLASSES.items()
+            if any(k in lower for k in keywords)
+        }
+
+        assert analyze_prompt(prompt).keyword_classes == expected
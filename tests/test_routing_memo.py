@@ -0,0 +1,33 @@
+from cache.digest import digest_context
+from routing.memo import RoutingMemo
+
+
+def test_key_is_exact_in_prompt_and_context():
+    a = RoutingMemo.key("classify this email", digest_context(["some context"]), "low")
+
+    assert a == RoutingMemo.key("classify this email", digest_context(["some context"]), "low")
+    # Whitespace changes prompt length and token counts, so it changes the key
+    assert a != RoutingMemo.key("classify  this email", digest_context(["some context"]), "low")
+    assert a != RoutingMemo.key("classify this email", digest_context(["some\n   context"]), "low")
+    assert a != RoutingMemo.key("classify this email", digest_context(["some context"]), "high")
+    assert a != RoutingMemo.key("classify this email", digest_context(["some", "context"]), "low")
+    assert a != RoutingMemo.key("classify this email", digest_context(["some context"]), "low", 0.01)
+
+
+def test_fingerprint_change_clears_memo():
+    memo = RoutingMemo(max_entries=10, ttl_s=60)
+    memo.put("k", (1, "model"), "small", {"static_rule": None})
+
+    assert memo.get("k", (1, "model")) == ("small", {"static_rule": None})
+    assert memo.get("k", (2, "model")) is None
+    assert memo.get("k", (1, "model")) is None
+
+
+def test_returned_explanation_is_a_copy():
+    memo = RoutingMemo(max_entries=10, ttl_s=60)
+    memo.put("k", 1, "medium", {"heuristics": {"context_ratio": 0.1}})
+
+    _, explanation = memo.get("k", 1)
+    explanation["heuristics"]["override"] = "mutated"
+
+    assert memo.get("k", 1) == ("medium", {"heuristics": {"context_ratio": 0.1}})
@@ -0,0 +1,61 @@
+import random
+
+from config import RoutingRule
+from routing.rules import CompiledRules, match_linear
+
+
+def _random_rule(rng: random.Random, index: int) -> RoutingRule:
+    condition = {}
+    if rng.random() < 0.4:
+        condition["risk_level"] = rng.choice(["low", "medium", "high"])
+    if rng.random() < 0.4:
+        condition["min_context_tokens"] = rng.randint(0, 2000)
+    if rng.random() < 0.4:
+        condition["max_tokens"] = rng.randint(0, 2000)
+    if rng.random() < 0.4:
+        condition["task"] = rng.choice(["classification", "reasoning", "generation"])
+    if rng.random() < 0.1:
+        condition["risk_flag"] = rng.choice([True, False])
+
+    return RoutingRule(
+        name=f"rule_{index}",
+        condition=condition,
+        route_to=rng.choice(["small", "medium", "api"]),
+    )
+
+
+def test_compiled_rules_agree_with_linear_evaluation():
+    rng = random.Random(7)
+
+    for _ in range(20):
+        rules = [_random_rule(rng, i) for i in range(rng.randint(0, 60))]
+        engine = CompiledRules(rules)
+
+        for _ in range(200):
+            features = {
+                "token_count": rng.choice([None, rng.randint(0, 2500)]),
+                "task": rng.choice(["classification", "reasoning", "generation"]),
+                "risk_flag": rng.choice([True, False]),
+            }
+            kwargs = dict(
+                risk_level=rng.choice(["low", "medium", "high"]),
+                context_token_count=rng.randint(0, 2500),
+                features=features,
+            )
+
+            assert engine.match(**kwargs) is match_linear(rules, **kwargs)
+
+
+def test_first_matching_rule_wins():
+    rules = [
+        RoutingRule(name="narrow", condition={"risk_level": "high", "max_tokens": 10}, route_to="small"),
+        RoutingRule(name="broad", condition={"risk_level": "high"}, route_to="api"),
+    ]
+    engine = CompiledRules(rules)
+
+    features = {"token_count": 5}
+    assert engine.match(risk_level="high", context_token_count=0, features=features).name == "narrow"
+
+    features = {"token_count": 50}
+    assert engine.match(risk_level="high", context_token_count=0, features=features).name == "broad"
+    assert engine.match(risk_level="low", context_token_count=0, features=features) is None
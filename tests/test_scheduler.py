@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+
+from app import api
+from contracts.request import GenerateRequest
+from inference.admission import Admission, AdmissionController, AIMDLimit
+from inference.scheduler import FairQueue, RequestClass, Scheduler, current_class
+from routing.latency import LatencyTracker
+
+RISK_WEIGHTS = {"high": 8, "medium": 4, "low": 2}
+LANE_WEIGHTS = {"interactive": 4, "standard": 1, "batch": 0.25}
+
+URGENT = RequestClass(risk_level="high", lane="interactive")
+BULK = RequestClass(risk_level="low", lane="batch")
+
+
+def _drain(queue):
+    order = []
+    while len(queue):
+        order.append(queue.pop())
+    return order
+
+
+def test_urgent_requests_overtake_queued_bulk_requests():
+    queue = FairQueue(RISK_WEIGHTS, LANE_WEIGHTS)
+    for i in range(3):
+        queue.push(f"bulk-{i}", BULK)
+    queue.push("urgent", URGENT)
+
+    assert _drain(queue)[0] == "urgent"
+
+
+def test_low_weight_flows_keep_a_share_and_tenants_alternate():
+    queue = FairQueue(RISK_WEIGHTS, LANE_WEIGHTS)
+    standard = RequestClass(risk_level="low", lane="standard")
+    for i in range(100):
+        queue.push(("urgent", i), URGENT)
+        queue.push(("standard", i), standard)
+
+    first = _drain(queue)[:40]
+    assert 1 <= sum(flow == "standard" for flow, _ in first) <= 3
+
+    queue = FairQueue(RISK_WEIGHTS, LANE_WEIGHTS)
+    for i in range(3):
+        queue.push(("a", i), RequestClass(tenant="a"))
+    for i in range(3):
+        queue.push(("b", i), RequestClass(tenant="b"))
+
+    assert [tenant for tenant, _ in _drain(queue)] == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_removed_waiters_are_skipped():
+    queue = FairQueue(RISK_WEIGHTS, LANE_WEIGHTS)
+    queue.push("gone", URGENT)
+    queue.push("kept", BULK)
+    queue.remove("gone")
+
+    assert len(queue) == 1
+    assert _drain(queue) == ["kept"]
+
+
+def test_classify_lanes():
+    scheduler = Scheduler("wfq", RISK_WEIGHTS, LANE_WEIGHTS, interactive_ms=2000)
+
+    assert scheduler.classify("high", 500, None) == URGENT
+    assert scheduler.classify("low", 10000, "acme").lane == "standard"
+    # No client latency budget: the request is not interactive
+    assert scheduler.classify("low", None, "acme").lane == "standard"
+    assert scheduler.classify("low", 500, "acme", batch=True) == RequestClass("low", "batch", "acme")
+
+
+def test_requests_without_latency_budget_are_not_interactive(monkeypatch):
+    scheduler = Scheduler("wfq", RISK_WEIGHTS, LANE_WEIGHTS, interactive_ms=2000)
+    monkeypatch.setattr(api, "_admission", Admission({}, reroute=False, request_scheduler=scheduler))
+
+    def lane(payload):
+        ctx = contextvars.copy_context()
+        ctx.run(api._schedule_as, GenerateRequest(**payload))
+        return ctx[current_class].lane
+
+    # The default max_latency_ms (2000) is not a budget
+    assert lane({"prompt": "hi"}) == "standard"
+    assert lane({"prompt": "hi", "constraints": {"max_latency_ms": 2000}}) == "interactive"
+
+
+def test_controller_admits_waiters_in_scheduler_order():
+    async def main():
+        controller = AdmissionController(
+            "small",
+            AIMDLimit(initial=1, min_limit=1, max_limit=1, backoff=0.5, tolerance=2.0),
+            max_queue=10,
+            queue_timeout_s=5.0,
+            tracker=LatencyTracker(window=10, min_samples=1, quantile=0.95),
+            queue=FairQueue(RISK_WEIGHTS, LANE_WEIGHTS),
+        )
+        admitted = []
+
+        async def call(name, request_class):
+            current_class.set(request_class)
+            async with controller.slot():
+                admitted.append(name)
+                await asyncio.sleep(0)
+
+        await controller.acquire()
+        tasks = [
+            asyncio.ensure_future(call("bulk", BULK)),
+            asyncio.ensure_future(call("urgent", URGENT)),
+        ]
+        await asyncio.sleep(0)
+
+        controller.release(None, failed=False)
+        await asyncio.gather(*tasks)
+        return admitted
+
+    assert asyncio.run(main()) == ["urgent", "bulk"]
@@ -0,0 +1,49 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from cache.semantic import SemanticCache
+
+CORPUS = [
+    "summarize the quarterly revenue report for the board",
+    "explain how photosynthesis converts light into chemical energy",
+    "list the main causes of the first world war",
+    "classify this support ticket as billing or technical",
+    "compare python and rust for systems programming",
+]
+
+
+def _cache(**kwargs) -> SemanticCache:
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words="english").fit(CORPUS)
+    return SemanticCache(vectorizer, ttl_s=60, **{"max_entries": 100, "threshold": 0.8, **kwargs})
+
+
+def test_embed_matches_vectorizer_transform():
+    cache = _cache()
+
+    for prompt in CORPUS + ["Explain photosynthesis, explain it twice", "nothing known"]:
+        row = cache._vectorizer.transform([prompt])
+        expected = dict(zip(row.indices.tolist(), row.data.tolist()))
+        embedded = cache.embed(prompt)
+
+        assert embedded.keys() == expected.keys()
+        assert all(abs(embedded[k] - expected[k]) < 1e-9 for k in expected)
+
+
+def test_reworded_prompt_hits_within_partition_only():
+    cache = _cache()
+    cache.add(CORPUS[1], ("api", b"ctx"), {"response": "chlorophyll"})
+
+    payload, score = cache.lookup("Explain how photosynthesis converts light into chemical energy!", ("api", b"ctx"))
+    assert payload == {"response": "chlorophyll"} and score > 0.99
+
+    assert cache.lookup(CORPUS[1], ("api", b"other")) is None
+    assert cache.lookup(CORPUS[2], ("api", b"ctx")) is None
+
+
+def test_index_is_bounded():
+    cache = _cache(max_entries=2)
+    for i, prompt in enumerate(CORPUS):
+        cache.add(prompt, "api", {"response": str(i)})
+
+    assert len(cache) == 2
+    assert cache.lookup(CORPUS[0], "api") is None
+    assert cache.lookup(CORPUS[4], "api")[0] == {"response": "4"}
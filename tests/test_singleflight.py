@@ -0,0 +1,49 @@
+import asyncio
+
+from cache.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight(lease_ms=1000, poll_interval_ms=10)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"response": "ok"}
+
+    async def lookup():
+        return None
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.run("key", compute, lookup) for _ in range(5)]
+        )
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert [role for _, role in results].count("leader") == 1
+    assert all(value == {"response": "ok"} for value, _ in results)
+    assert flight.inflight() == 0
+
+
+def test_failures_propagate_to_followers():
+    flight = SingleFlight(lease_ms=1000, poll_interval_ms=10)
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def lookup():
+        return None
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.run("key", compute, lookup) for _ in range(3)],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+from contracts.request import GenerateRequest
+from inference.streaming import StreamUsage
+
+TIERS = ("small", "medium", "api")
+
+
+def _client(monkeypatch, executor, streamer) -> TestClient:
+    monkeypatch.setattr(api, "_EXECUTORS", {tier: executor for tier in TIERS})
+    monkeypatch.setattr(api, "_STREAMERS", {tier: streamer for tier in TIERS})
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def _events(res):
+    events = []
+    for frame in res.text.split("\n\n"):
+        if frame:
+            event, data = frame.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+async def fresh_execute(prompt, context):
+    return "fresh answer", 2, 2, 0.0
+
+
+async def failing_execute(prompt, context):
+    raise RuntimeError("backend must not be called")
+
+
+async def failing_stream(prompt, context):
+    raise RuntimeError("backend must not be called")
+    yield
+
+
+async def complete_stream(prompt, context):
+    yield "streamed "
+    yield "answer"
+    yield StreamUsage(input_tokens=4, output_tokens=2, cost=0.001)
+
+
+def test_completed_stream_is_cached_under_the_generate_key(monkeypatch):
+    prompt = "stream cache check: completed stream"
+
+    client = _client(monkeypatch, failing_execute, complete_stream)
+    assert _events(client.post("/generate/stream", json={"prompt": prompt}))[-1][0] == "done"
+
+    # /generate finds the streamed answer without calling the backend
+    res = client.post("/generate", json={"prompt": prompt})
+    assert res.status_code == 200
+    assert res.json()["cache_hit"] is True
+    assert res.json()["response"] == "streamed answer"
+    assert res.json()["tokens_used"] == {"input": 4, "output": 2}
+
+
+def test_errored_stream_is_not_cached(monkeypatch):
+    prompt = "stream cache check: errored stream"
+
+    async def broken_stream(prompt, context):
+        yield "half an "
+        raise RuntimeError("backend dropped the connection")
+
+    client = _client(monkeypatch, fresh_execute, broken_stream)
+    assert _events(client.post("/generate/stream", json={"prompt": prompt}))[-1][0] == "error"
+
+    res = client.post("/generate", json={"prompt": prompt})
+    assert res.json()["cache_hit"] is False
+    assert res.json()["response"] == "fresh answer"
+
+
+def test_aborted_stream_is_not_cached(monkeypatch):
+    prompt = "stream cache check: aborted stream"
+    client = _client(monkeypatch, fresh_execute, complete_stream)
+
+    async def abort_after_first_token():
+        response = await api.generate_stream(GenerateRequest(prompt=prompt))
+        body = response.body_iterator
+        first = await body.__anext__()
+        # The client disconnects: Starlette closes the body iterator
+        await body.aclose()
+        return first
+
+    assert asyncio.run(abort_after_first_token()).startswith("event: token")
+
+    res = client.post("/generate", json={"prompt": prompt})
+    assert res.json()["cache_hit"] is False
+    assert res.json()["response"] == "fresh answer"
+
+
+def test_cache_hit_is_replayed_as_sse(monkeypatch):
+    prompt = "stream cache check: replayed answer"
+
+    client = _client(monkeypatch, fresh_execute, failing_stream)
+    assert client.post("/generate", json={"prompt": prompt}).json()["cache_hit"] is False
+
+    res = client.post("/generate/stream", json={"prompt": prompt})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(res)
+    assert events[0] == ("token", {"text": "fresh answer"})
+    name, summary = events[-1]
+    assert name == "done"
+    assert summary["cache_hit"] is True
+    assert summary["tokens_used"] == {"input": 2, "output": 2}
@@ -0,0 +1,50 @@
+import random
+
+from classifier.tokens import PROFILES, TokenCounter, approximate_bpe_count, whitespace_count
+
+PIECES = ["hello", "world", "antidisestablishment", "12345", ",", "!", "(x)", " ", "  ", "\n", "\t", "a"]
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+
+
+def test_bpe_approximation_never_below_whitespace_count():
+    rng = random.Random(7)
+
+    for _ in range(1000):
+        text = _random_text(rng)
+        for chars_per_token in (3.5, 4.0):
+            assert approximate_bpe_count(text, chars_per_token) >= whitespace_count(text)
+
+
+def test_whitespace_count_matches_str_split():
+    rng = random.Random(7)
+
+    for _ in range(1000):
+        text = _random_text(rng) + rng.choice(["", "\x0b", "\u00a0", "\u3000"])
+        assert whitespace_count(text) == len(text.split())
+
+
+def test_bpe_approximation_splits_long_words_and_punctuation():
+    assert approximate_bpe_count("", 4.0) == 0
+    assert approximate_bpe_count("antidisestablishmentarianism", 4.0) == 7
+    assert approximate_bpe_count("hi, there!", 4.0) == 4
+
+
+def test_whitespace_runs_count_as_one_separator():
+    assert approximate_bpe_count("a" + " " * 1000 + "b", 3.5) == 2
+
+    lines = ["def f(x):", "    if x > 1:", "        return x * 2", "    return None"]
+    code = "\n".join("        " + line for line in lines * 20)
+
+    words = whitespace_count(code)
+    assert words <= approximate_bpe_count(code, 3.5) < 2 * words
+
+
+def test_chunk_counts_are_cached():
+    counter = TokenCounter(PROFILES["sentencepiece"], cache_size=2)
+    chunk = "repeated context " * 50
+
+    assert counter.count_context([chunk, chunk]) == 2 * counter.count(chunk)
+    assert counter.cache_info().hits == 1